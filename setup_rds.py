@@ -1,7 +1,10 @@
 from dotenv import load_dotenv
 import os
+import sys
 import pg8000
-import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from csv_reader import read_source_csv
 
 load_dotenv()
 
@@ -39,7 +42,9 @@ def create_table(conn):
 
 def insert_data(conn):
     try:
-        df = pd.read_csv("data/raw/local/customer_churn_dataset_local.csv", nrows=10000)
+        # Columns are taken in table order; the reader stops after the first 10000 rows.
+        df = read_source_csv("data/raw/local/customer_churn_dataset_local.csv", "rds_seed",
+                             max_rows=10000, positional=True)
         print("Csv file loaded")
 
     except Exception as e:
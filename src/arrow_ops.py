@@ -0,0 +1,336 @@
+import ast
+import sys
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from exception import CustomException
+from logger import logging
+from dtype_policy import CATEGORY_MAX_UNIQUE_RATIO, log_memory_report
+from preprocessing import PreprocessingArtifact, TARGET_COL, ID_COL, normalize_column_name
+from sparse_encoding import code_column
+from streaming_stats import scaler_from_moments
+
+# Raw label spellings seen across sources, as mapped by the pandas merger.
+CHURN_LABELS = {"0": "No", "1": "Yes", "No": "No", "Yes": "Yes"}
+SENIOR_LABELS = {"0": "No", "1": "Yes"}
+# What pd.to_numeric(errors="coerce") accepts; anything else (e.g. " ") becomes null.
+NUMERIC_PATTERN = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+
+_BINARY_OPS = {ast.Add: "add", ast.Sub: "subtract", ast.Mult: "multiply", ast.Div: "divide"}
+_COMPARE_OPS = {ast.Eq: "equal", ast.NotEq: "not_equal", ast.Lt: "less", ast.LtE: "less_equal",
+                ast.Gt: "greater", ast.GtE: "greater_equal"}
+
+
+def read_csv_table(source):
+    '''
+    Multithreaded CSV read straight into a pyarrow Table. Empty strings and the usual NA
+    spellings are read as nulls, as pandas.read_csv does.
+    '''
+    return pacsv.read_csv(source, read_options=pacsv.ReadOptions(use_threads=True),
+                          convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+
+
+def write_csv_table(table, destination):
+    pacsv.write_csv(table, destination)
+
+
+def is_numeric_type(data_type):
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+
+def is_string_type(data_type):
+    return (pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+            or pa.types.is_dictionary(data_type))
+
+
+def as_strings(column):
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    return pc.cast(column, pa.string())
+
+
+def map_labels(column, labels):
+    '''
+    Map values through a label dictionary; values not in it become null (like Series.map).
+    '''
+    keys = pa.array(list(labels.keys()), type=pa.string())
+    values = pa.array(list(labels.values()), type=pa.string())
+    return pc.take(values, pc.index_in(as_strings(column), value_set=keys))
+
+
+def coerce_numeric(column):
+    '''
+    Arrow equivalent of pd.to_numeric(errors="coerce") for string columns.
+    '''
+    if is_numeric_type(column.type):
+        return pc.cast(column, pa.float64())
+    strings = as_strings(column)
+    valid = pc.match_substring_regex(strings, NUMERIC_PATTERN)
+    cleaned = pc.if_else(valid, pc.utf8_trim_whitespace(strings), pa.scalar(None, pa.string()))
+    return pc.cast(cleaned, pa.float64())
+
+
+def standardize_raw_table(table):
+    '''
+    Same label and type clean-up the merger applies to each raw source, on a Table.
+    '''
+    try:
+        names = table.column_names
+        if "Churn" in names:
+            table = table.set_column(names.index("Churn"), "Churn", map_labels(table["Churn"], CHURN_LABELS))
+        if "SeniorCitizen" in names and is_numeric_type(table.schema.field("SeniorCitizen").type):
+            table = table.set_column(names.index("SeniorCitizen"), "SeniorCitizen",
+                                     map_labels(table["SeniorCitizen"], SENIOR_LABELS))
+        if "TotalCharges" in names:
+            table = table.set_column(names.index("TotalCharges"), "TotalCharges", coerce_numeric(table["TotalCharges"]))
+        return table
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def concat_sources(tables):
+    '''
+    Vertical concat keeping the first table's column order; columns missing from a source
+    are null-filled and numeric types are widened where sources disagree. A column that is
+    dictionary-encoded in one source and plain text in another is concatenated as text.
+    '''
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, set()).add(field.type)
+    mixed = {name for name, seen in types.items()
+             if len(seen) > 1 and any(pa.types.is_dictionary(t) for t in seen)}
+    if mixed:
+        tables = [table.cast(pa.schema(
+            [pa.field(f.name, f.type.value_type) if f.name in mixed and pa.types.is_dictionary(f.type) else f
+             for f in table.schema])) for table in tables]
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def _smallest_int_type(low, high):
+    for data_type in (pa.int8(), pa.int16(), pa.int32()):
+        info = np.iinfo(data_type.to_pandas_dtype())
+        if info.min <= low and high <= info.max:
+            return data_type
+    return pa.int64()
+
+
+def apply_table_dtype_policy(table, stage, exclude=()):
+    '''
+    dtype_policy.apply_dtype_policy for pyarrow Tables: 0/1 integer flags -> uint8, other
+    integers -> smallest signed type, floats -> float32, low-cardinality strings -> dictionary.
+    '''
+    try:
+        before = table.nbytes / 1024 ** 2
+        for i, field in enumerate(table.schema):
+            if field.name in exclude:
+                continue
+            column = table[field.name]
+            target = None
+            if pa.types.is_integer(field.type) or pa.types.is_boolean(field.type):
+                bounds = pc.min_max(column)
+                low, high = bounds["min"].as_py(), bounds["max"].as_py()
+                if low is None:
+                    continue
+                target = pa.uint8() if int(low) >= 0 and int(high) <= 1 else _smallest_int_type(int(low), int(high))
+            elif pa.types.is_floating(field.type):
+                target = pa.float32()
+            elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                if pc.count_distinct(column).as_py() < CATEGORY_MAX_UNIQUE_RATIO * max(table.num_rows, 1):
+                    table = table.set_column(i, field.name, pc.dictionary_encode(column))
+                continue
+            if target is not None and target != field.type:
+                table = table.set_column(i, field.name, pc.cast(column, target))
+        log_memory_report(stage, before, table.nbytes / 1024 ** 2, (table.num_rows, table.num_columns))
+        return table
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def split_columns(schema):
+    numeric_cols = [f.name for f in schema if is_numeric_type(f.type) and f.name not in (TARGET_COL, ID_COL)]
+    categorical_cols = [f.name for f in schema if is_string_type(f.type) and f.name not in (TARGET_COL, ID_COL)]
+    base_cols = [f.name for f in schema if f.name not in categorical_cols]
+    return base_cols, numeric_cols, categorical_cols
+
+
+def column_mode(column):
+    '''
+    Most frequent non-null value; ties go to the smallest value, as in Series.mode()[0].
+    '''
+    counts = pc.value_counts(pc.drop_null(as_strings(column)))
+    if len(counts) == 0:
+        return None
+    values, freq = counts.field("values"), counts.field("counts")
+    top = pc.filter(values, pc.equal(freq, pc.max(freq)))
+    return pc.min(top).as_py()
+
+
+def fit_preprocessor_table(table, sparse_threshold=None, dense_cols=()):
+    '''
+    Arrow version of preprocessing.fit_preprocessor: median/mode fill values, mean and
+    population variance for the scaler and sorted vocabularies, all from compute kernels.
+    Produces the same PreprocessingArtifact, so either engine can apply it.
+    '''
+    try:
+        base_cols, numeric_cols, categorical_cols = split_columns(table.schema)
+        fill_values, means, variances = {}, [], []
+        for col in numeric_cols:
+            values = pc.cast(table[col], pa.float64())
+            median = pc.quantile(values, q=0.5, interpolation="linear")[0].as_py()
+            fill_values[col] = median
+            filled = pc.fill_null(values, median) if median is not None else values
+            means.append(pc.mean(filled).as_py())
+            variances.append(pc.variance(filled, ddof=0).as_py())
+        scaler = scaler_from_moments(numeric_cols, means, variances, table.num_rows)
+
+        vocabularies = {}
+        for col in categorical_cols:
+            fill_values[col] = column_mode(table[col])
+            values = as_strings(table[col])
+            if fill_values[col] is not None:
+                values = pc.fill_null(values, fill_values[col])
+            vocabularies[col] = sorted(pc.unique(pc.drop_null(values)).to_pylist())
+
+        sparse_cols = []
+        if sparse_threshold:
+            sparse_cols = [c for c in categorical_cols
+                           if len(vocabularies[c]) > sparse_threshold and c not in dense_cols]
+        artifact = PreprocessingArtifact(base_cols, numeric_cols, categorical_cols, fill_values, scaler,
+                                         vocabularies, sparse_cols)
+        logging.info(f"Preprocessor fitted on Arrow table: {len(numeric_cols)} numeric, "
+                     f"{len(categorical_cols)} categorical ({len(sparse_cols)} sparse), "
+                     f"{len(artifact.output_columns)} output columns.")
+        return artifact
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def category_codes_table(column, artifact, col):
+    '''
+    Vocabulary positions for a column (-1 for unseen values, nulls take the fill value).
+    '''
+    values = as_strings(column)
+    fill_value = artifact.fill_values[col]
+    if fill_value is not None:
+        values = pc.fill_null(values, fill_value)
+    vocab = pa.array(artifact.vocabularies[col], type=pa.string())
+    return pc.fill_null(pc.index_in(values, value_set=vocab), -1)
+
+
+def transform_table_with_artifact(table, artifact):
+    '''
+    Arrow version of preprocessing.transform_with_artifact. Numeric columns are filled and
+    standardized to float32, categoricals become uint8 flags in artifact.output_columns
+    order. Sparse columns are emitted directly in their collapsed form (one int32
+    <col>__code column, 0 for the dropped level or unseen values), which is what the
+    preparation step writes anyway.
+    '''
+    try:
+        missing = [c for c in artifact.base_cols + artifact.categorical_cols if c not in table.column_names]
+        if missing:
+            raise ValueError(f"Columns missing for preprocessing artifact v{artifact.version}: {missing}")
+
+        scaler = artifact.scaler
+        position = {col: i for i, col in enumerate(artifact.numeric_cols)}
+        names, columns = [], []
+        for col in artifact.base_cols:
+            values = table[col]
+            if col in position:
+                i = position[col]
+                values = pc.cast(values, pa.float64())
+                if artifact.fill_values[col] is not None:
+                    values = pc.fill_null(values, artifact.fill_values[col])
+                values = pc.divide(pc.subtract(values, scaler.mean_[i]), scaler.scale_[i])
+                values = pc.cast(values, pa.float32())
+            names.append(normalize_column_name(col))
+            columns.append(values)
+
+        for col in artifact.categorical_cols:
+            codes = category_codes_table(table[col], artifact, col)
+            unseen = pc.sum(pc.equal(codes, -1)).as_py() or 0
+            if unseen:
+                logging.info(f"{unseen} rows of {col} have categories not in the artifact vocabulary.")
+            if col in artifact.sparse_cols:
+                names.append(code_column(col))
+                columns.append(pc.cast(pc.max_element_wise(codes, 0), pa.int32()))
+                continue
+            for position_in_vocab, flag in enumerate(artifact.dummy_columns[col], start=1):
+                names.append(flag)
+                columns.append(pc.cast(pc.equal(codes, position_in_vocab), pa.uint8()))
+        return pa.table(columns, names=names)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _arrow_operand(values):
+    # Same promotion as feature_engine._as_array: no small/unsigned integer arithmetic.
+    if pa.types.is_integer(values.type):
+        return pc.cast(values, pa.int32())
+    return values
+
+
+def _evaluate_node(node, columns):
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body, columns)
+    if isinstance(node, ast.Name):
+        return columns[node.id]
+    if isinstance(node, ast.Constant):
+        return pa.scalar(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return pc.negate(_evaluate_node(node.operand, columns))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        left, right = _evaluate_node(node.left, columns), _evaluate_node(node.right, columns)
+        if isinstance(node.op, ast.Div):
+            # true division, as in NumPy/numexpr
+            left, right = pc.cast(left, pa.float64()), pc.cast(right, pa.float64())
+        return pc.call_function(_BINARY_OPS[type(node.op)], [left, right])
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARE_OPS:
+        left, right = _evaluate_node(node.left, columns), _evaluate_node(node.comparators[0], columns)
+        return pc.call_function(_COMPARE_OPS[type(node.ops[0])], [left, right])
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "where":
+        cond, a, b = (_evaluate_node(arg, columns) for arg in node.args)
+        return pc.if_else(cond, a, b)
+    raise ValueError(f"Expression construct not supported by the Arrow engine: {ast.dump(node)}")
+
+
+def evaluate_features_table(plan, table):
+    '''
+    Arrow version of feature_engine.evaluate_features: each compiled expression is
+    evaluated with pyarrow.compute kernels and appended to the table.
+    Returns (table, cost_report).
+    '''
+    try:
+        columns = {col: _arrow_operand(table[col]) for col in plan.source_columns}
+        outputs, report = {}, []
+        for spec in plan.steps:
+            start = time.perf_counter()
+            result = _evaluate_node(ast.parse(spec["expression"], mode="eval"), columns)
+            result = pc.cast(result, pa.from_numpy_dtype(np.dtype(spec["dtype"])))
+            columns[spec["name"]] = _arrow_operand(result)
+            outputs[spec["name"]] = result
+            report.append({"feature": spec["name"], "seconds": time.perf_counter() - start, "bytes": result.nbytes})
+
+        for name, values in outputs.items():
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, values)
+            else:
+                table = table.append_column(name, values)
+        for row in report:
+            logging.info(f"[features] {row['feature']}: {row['seconds'] * 1000:.2f} ms, {row['bytes']} bytes")
+        return table, report
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def sample_table(table, sample_size, seed=42):
+    '''
+    Uniform sample of rows without replacement, in original row order.
+    '''
+    if table.num_rows <= sample_size:
+        return table
+    rows = np.sort(np.random.default_rng(seed).choice(table.num_rows, size=sample_size, replace=False))
+    return table.take(pa.array(rows))
@@ -0,0 +1,233 @@
+"""
+End-to-end benchmark of the pandas and Arrow execution engines on a scaled synthetic
+Telco dataset (no S3 access needed). The Dask preparation path is timed as well and its
+processed CSV is checked value for value against the single-process one.
+
+Stages timed for each engine:
+  merge      - read the two raw CSV sources, clean labels/types and concatenate
+               (IterativeImputer is sklearn on pandas in both engines and is left out)
+  prepare    - fit the preprocessing artifact, apply it and write the processed CSV
+  transform  - read the processed CSV, apply the dtype policy and derived features and
+               write the partitioned Parquet dataset
+
+Usage:
+    python src/benchmarks/engine_benchmark.py --rows 1000000
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "components"))
+from logger import setup_logging
+from preprocessing import fit_preprocessor, transform_with_artifact
+from sparse_encoding import collapse_sparse_columns
+from dtype_policy import apply_dtype_policy
+from feature_engine import compile_features, evaluate_features
+from incremental import PARTITION_COLUMN, customer_buckets
+from parquet_writer import write_partitioned_dataset
+from dask_backend import (read_csv_partitions, global_dtype_plan, collect_global_stats, artifact_from_global_stats,
+                          prepare_partitions)
+from arrow_ops import (read_csv_table, write_csv_table, standardize_raw_table, concat_sources,
+                       fit_preprocessor_table, transform_table_with_artifact, apply_table_dtype_policy,
+                       evaluate_features_table)
+from data_transformation import FEATURE_SPECS
+
+logger = setup_logging("engine_benchmark")
+
+benchmark_folder = os.path.join(project_root, '..', "artifacts", "benchmarks")
+
+YES_NO = ["Yes", "No"]
+SERVICE = ["Yes", "No", "No internet service"]
+
+
+def make_raw_sources(n_rows, seed=42):
+    """
+    Synthetic Kaggle-like and rds-like sources with the same quirks as the real ones:
+    numeric 0/1 SeniorCitizen and Churn in one source, blank TotalCharges strings and
+    missing values.
+    """
+    rng = np.random.default_rng(seed)
+    n = n_rows
+    df = pd.DataFrame({
+        "customerID": [f"{i:07d}-SYN" for i in range(n)],
+        "gender": rng.choice(["Male", "Female"], n),
+        "SeniorCitizen": rng.integers(0, 2, n),
+        "Partner": rng.choice(YES_NO, n), "Dependents": rng.choice(YES_NO, n),
+        "tenure": rng.integers(0, 72, n).astype(float),
+        "PhoneService": rng.choice(YES_NO, n),
+        "MultipleLines": rng.choice(["Yes", "No", "No phone service"], n),
+        "InternetService": rng.choice(["DSL", "Fiber optic", "No"], n),
+        "OnlineSecurity": rng.choice(SERVICE, n), "OnlineBackup": rng.choice(SERVICE, n),
+        "DeviceProtection": rng.choice(SERVICE, n), "TechSupport": rng.choice(SERVICE, n),
+        "StreamingTV": rng.choice(SERVICE, n), "StreamingMovies": rng.choice(SERVICE, n),
+        "Contract": rng.choice(["Month-to-month", "One year", "Two year"], n),
+        "PaperlessBilling": rng.choice(YES_NO, n),
+        "PaymentMethod": rng.choice(["Electronic check", "Mailed check", "Bank transfer (automatic)",
+                                     "Credit card (automatic)"], n),
+        "MonthlyCharges": np.round(rng.uniform(18, 120, n), 2),
+        "TotalCharges": np.round(rng.uniform(18, 8700, n), 2).astype(str),
+        "Churn": rng.integers(0, 2, n),
+    })
+    df.loc[rng.random(n) < 0.01, "TotalCharges"] = " "
+    df.loc[rng.random(n) < 0.02, "tenure"] = np.nan
+    df.loc[rng.random(n) < 0.02, "Contract"] = np.nan
+    split = int(n * 0.8)
+    kaggle = df.iloc[:split]
+    rds = df.iloc[split:].assign(Churn=lambda d: d["Churn"].map({0: "No", 1: "Yes"})).drop(columns=["PaymentMethod"])
+    return kaggle, rds
+
+
+def merge_pandas(paths):
+    # Mirrors the pandas path of components/merger.py up to the imputation step.
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        df["Churn"] = df["Churn"].map({0: "No", 1: "Yes", "0": "No", "1": "Yes", "No": "No", "Yes": "Yes"})
+        if pd.api.types.is_numeric_dtype(df["SeniorCitizen"]):
+            df["SeniorCitizen"] = df["SeniorCitizen"].map({0: "No", 1: "Yes"})
+        df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce")
+        frames.append(df)
+    merged = pd.concat(frames, axis=0, ignore_index=True, sort=False)
+    return merged[list(frames[0].columns)]
+
+
+def merge_arrow(paths):
+    return concat_sources([standardize_raw_table(read_csv_table(path)) for path in paths])
+
+
+def prepare_pandas(merged, out_path):
+    artifact = fit_preprocessor(merged, sparse_threshold=50)
+    processed = transform_with_artifact(merged, artifact)
+    processed = apply_dtype_policy(processed, "benchmark:prepare", exclude=("customerid",))
+    collapse_sparse_columns(processed, artifact).to_csv(out_path, index=False)
+
+
+def load_merged(path):
+    # Mirrors load_latest_merged in components/data_preparation.py.
+    return apply_dtype_policy(pd.read_csv(path), "benchmark:load_merged", exclude=("customerID",))
+
+
+def prepare_dask(merged_path, out_path, partitions=8):
+    # Mirrors preprocess_dask in components/data_preparation.py on the local process pool.
+    ddf = read_csv_partitions(merged_path, blocksize=os.path.getsize(merged_path) // partitions + 1)
+    ddf = ddf.astype(global_dtype_plan(ddf, exclude=("customerID",)))
+    artifact = artifact_from_global_stats(collect_global_stats(ddf), sparse_threshold=50)
+    prepare_partitions(ddf, artifact).to_csv(out_path, single_file=True, index=False,
+                                             compute_kwargs={"scheduler": "processes"})
+
+
+def prepare_arrow(merged, out_path):
+    artifact = fit_preprocessor_table(merged, sparse_threshold=50)
+    write_csv_table(transform_table_with_artifact(merged, artifact), out_path)
+
+
+def transform_pandas(processed_path, out_dir):
+    df = apply_dtype_policy(pd.read_csv(processed_path), "benchmark:load", exclude=("customerid",))
+    df, _ = evaluate_features(compile_features(FEATURE_SPECS, df.columns), df)
+    df = apply_dtype_policy(df, "benchmark:write", exclude=("customerid",))
+    write_partitioned_dataset(df, out_dir, customer_buckets(df["customerid"].to_numpy()), PARTITION_COLUMN)
+    return df
+
+
+def transform_arrow(processed_path, out_dir):
+    table = apply_table_dtype_policy(read_csv_table(processed_path), "benchmark:load", exclude=("customerid",))
+    table, _ = evaluate_features_table(compile_features(FEATURE_SPECS, table.column_names), table)
+    table = apply_table_dtype_policy(table, "benchmark:write", exclude=("customerid",))
+    write_partitioned_dataset(table, out_dir, customer_buckets(table["customerid"].to_numpy()), PARTITION_COLUMN)
+    return table
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def csv_outputs_equal(path, other_path):
+    return pd.read_csv(path, dtype=str).equals(pd.read_csv(other_path, dtype=str))
+
+
+def outputs_match(df, table):
+    other = table.to_pandas()
+    if list(df.columns) != list(other.columns):
+        return False
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            if not np.allclose(df[col].to_numpy(np.float64), other[col].to_numpy(np.float64), rtol=1e-5, equal_nan=True):
+                return False
+        elif not df[col].astype(str).equals(other[col].astype(str)):
+            return False
+    return True
+
+
+def run_benchmark(n_rows, seed=42):
+    work_dir = tempfile.mkdtemp(prefix="engine_benchmark_")
+    try:
+        kaggle, rds = make_raw_sources(n_rows, seed)
+        paths = [os.path.join(work_dir, "kaggle.csv"), os.path.join(work_dir, "rds.csv")]
+        kaggle.to_csv(paths[0], index=False)
+        rds.to_csv(paths[1], index=False)
+
+        timings = {}
+        merged_df, timings[("pandas", "merge")] = timed(merge_pandas, paths)
+        merged_table, timings[("arrow", "merge")] = timed(merge_arrow, paths)
+
+        processed = {engine: os.path.join(work_dir, f"processed_{engine}.csv") for engine in ("pandas", "arrow", "dask")}
+        _, timings[("pandas", "prepare")] = timed(prepare_pandas, merged_df, processed["pandas"])
+        _, timings[("arrow", "prepare")] = timed(prepare_arrow, merged_table, processed["arrow"])
+
+        # The Dask path starts from the merged file, as the component does; the reference is
+        # the pandas component path on the same file.
+        merged_path = os.path.join(work_dir, "merged.csv")
+        merged_df.to_csv(merged_path, index=False)
+        _, timings[("dask", "prepare")] = timed(prepare_dask, merged_path, processed["dask"])
+        reference = os.path.join(work_dir, "processed_reference.csv")
+        prepare_pandas(load_merged(merged_path), reference)
+
+        df, timings[("pandas", "transform")] = timed(transform_pandas, processed["pandas"],
+                                                     os.path.join(work_dir, "dataset_pandas"))
+        table, timings[("arrow", "transform")] = timed(transform_arrow, processed["arrow"],
+                                                       os.path.join(work_dir, "dataset_arrow"))
+
+        results = {"rows": n_rows, "seed": seed, "seconds": {},
+                   "outputs_match": {"arrow": outputs_match(df, table),
+                                     "dask": csv_outputs_equal(processed["dask"], reference)}}
+        for engine in ("pandas", "arrow"):
+            stages = {stage: timings[(engine, stage)] for stage in ("merge", "prepare", "transform")}
+            stages["total"] = sum(stages.values())
+            results["seconds"][engine] = stages
+        results["seconds"]["dask"] = {"prepare": timings[("dask", "prepare")]}
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pandas and Arrow execution engines.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.seed)
+    print(f"{'stage':<10} {'pandas (s)':>11} {'arrow (s)':>10} {'speed-up':>9}")
+    for stage in ("merge", "prepare", "transform", "total"):
+        p, a = results["seconds"]["pandas"][stage], results["seconds"]["arrow"][stage]
+        print(f"{stage:<10} {p:>11.2f} {a:>10.2f} {p / a:>8.1f}x")
+    print(f"{'prepare':<10} {'dask (s)':>11} {results['seconds']['dask']['prepare']:>10.2f}")
+    print(f"Outputs match: arrow {results['outputs_match']['arrow']}, dask {results['outputs_match']['dask']}")
+
+    os.makedirs(benchmark_folder, exist_ok=True)
+    out_path = os.path.join(benchmark_folder, f"engine_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Engine benchmark over {args.rows} rows written to {out_path}")
+    print(f"Results written to {out_path}")
@@ -0,0 +1,143 @@
+"""
+Startup-time benchmark of the pipeline components: how long a fresh interpreter takes to
+get through each component's module-level imports (and its environment check) before any
+pipeline work starts. Every stage of the orchestrator runs in its own process, so this
+cost is paid once per stage and run.
+
+For each component, measured in a new interpreter and repeated --repeat times (median):
+  interpreter  - `python -c pass`, the floor every stage pays
+  startup      - wall time of running the component's top-level imports and
+                 ensure_environment call (nothing else of the module is executed)
+  imports      - time inside those statements, with the slowest ones listed
+Statements that fail (e.g. a package not installed here) are reported, not fatal.
+
+Usage:
+    python src/benchmarks/startup_benchmark.py --repeat 5
+    python src/benchmarks/startup_benchmark.py --components validation_GE Models_MLflow
+"""
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from logger import setup_logging
+
+logger = setup_logging("startup_benchmark")
+
+benchmark_folder = os.path.join(project_root, '..', "artifacts", "benchmarks")
+components_folder = os.path.join(project_root, "components")
+
+# Components in pipeline order (paths relative to src/components).
+COMPONENTS = {
+    "ingestion": "ingestion.py",
+    "upload_ingested_file": "upload_ingested_file.py",
+    "validation_manual": "validation_manual.py",
+    "validation_GE": "validation_GE.py",
+    "merger": "merger.py",
+    "data_preparation": "data_preparation.py",
+    "data_transformation": "data_transformation.py",
+    "upload_transformed_file": "upload_transformed_file.py",
+    "feature_store": os.path.join("feature_store", "features.py"),
+    "Models_MLflow": "Models_MLflow.py",
+}
+
+# Runs in the fresh interpreter: executes the statements one by one and reports their times.
+PROBE = """
+import sys, json, time
+spec = json.load(sys.stdin)
+sys.path[:0] = spec["path"]
+timings, failures, namespace = [], {}, {}
+for statement in spec["statements"]:
+    start = time.perf_counter()
+    try:
+        exec(statement, namespace)
+    except BaseException as e:
+        failures[statement] = f"{type(e).__name__}: {e}"
+    timings.append([statement, time.perf_counter() - start])
+json.dump({"timings": timings, "failures": failures}, sys.stdout)
+"""
+
+
+def startup_statements(path):
+    """
+    The module-level import statements of a component, plus its ensure_environment call,
+    in source order.
+    """
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), filename=path)
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.unparse(node))
+        elif (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+              and isinstance(node.value.func, ast.Name) and node.value.func.id == "ensure_environment"):
+            statements.append(ast.unparse(node))
+    return statements
+
+
+def timed_run(args, stdin=None):
+    start = time.perf_counter()
+    completed = subprocess.run(args, input=stdin, capture_output=True, text=True,
+                               cwd=os.path.join(project_root, ".."))
+    return completed, time.perf_counter() - start
+
+
+def measure_component(path, repeat):
+    statements = startup_statements(path)
+    spec = json.dumps({"path": [project_root, os.path.dirname(path)], "statements": statements})
+    walls, per_statement, failures = [], {statement: [] for statement in statements}, {}
+    for _ in range(repeat):
+        completed, wall = timed_run([sys.executable, "-c", PROBE], spec)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Probe for {path} failed: {completed.stderr[-500:]}")
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        walls.append(wall)
+        for statement, seconds in probe["timings"]:
+            per_statement[statement].append(seconds)
+        failures.update(probe["failures"])
+    medians = {statement: statistics.median(times) for statement, times in per_statement.items()}
+    slowest = sorted(medians.items(), key=lambda item: item[1], reverse=True)
+    return {"startup": statistics.median(walls), "imports": sum(medians.values()),
+            "statements": dict(slowest), "failed": failures}
+
+
+def run_benchmark(components, repeat=3):
+    interpreter = statistics.median(timed_run([sys.executable, "-c", "pass"])[1] for _ in range(repeat))
+    results = {"python": sys.version.split()[0], "repeat": repeat, "interpreter": interpreter, "components": {}}
+    for name in components:
+        path = os.path.join(components_folder, COMPONENTS[name])
+        results["components"][name] = measure_component(path, repeat)
+        logger.info(f"{name}: startup {results['components'][name]['startup']:.2f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup (interpreter and import) time of the components.")
+    parser.add_argument("--components", nargs="+", choices=list(COMPONENTS), default=list(COMPONENTS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3, help="slowest statements to print per component")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.components, args.repeat)
+    print(f"interpreter: {results['interpreter']:.3f}s")
+    print(f"{'component':<24} {'startup (s)':>11} {'imports (s)':>11}  slowest")
+    for name, result in results["components"].items():
+        slowest = ", ".join(f"{statement} {seconds:.2f}s"
+                            for statement, seconds in list(result["statements"].items())[:args.top])
+        print(f"{name:<24} {result['startup']:>11.2f} {result['imports']:>11.2f}  {slowest}")
+        for statement, error in result["failed"].items():
+            print(f"{'':<24} failed: {statement} ({error})")
+
+    os.makedirs(benchmark_folder, exist_ok=True)
+    out_path = os.path.join(benchmark_folder, f"startup_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Startup benchmark of {len(results['components'])} component(s) written to {out_path}")
+    print(f"Results written to {out_path}")
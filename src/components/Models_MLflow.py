@@ -1,6 +1,18 @@
-import subprocess
+import os
 import sys
-subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements_mlFlow.txt"])
+
+# ------------------ SETUP ------------------
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.append(project_root)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+from logger import setup_logging
+from environment_check import ensure_environment
+# Ensure the logs folder exists
+logger = setup_logging("Models_MLflow")
+
+# The environment is checked against the requirements once (see environment_check)
+# instead of being reinstalled on every run.
+ensure_environment("requirements_mlFlow.txt")
 
 import pandas as pd
 from sklearn.model_selection import train_test_split
@@ -8,21 +20,15 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from sklearn.preprocessing import LabelEncoder
-import os
 import mlflow
 import mlflow.sklearn
 from feast import FeatureStore
 
-
-# ------------------ SETUP ------------------
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
-sys.path.append(project_root)
-current_dir = os.path.dirname(os.path.abspath(__file__))
-from logger import setup_logging
 from utils import connect_to_s3
 from exception import CustomException
-# Ensure the logs folder exists
-logger = setup_logging("Models_MLflow")
+from dtype_policy import apply_dtype_policy
+from preprocessing import load_preprocessing_artifact
+from sparse_encoding import to_model_matrix, code_columns
 
 # -------------------------------------------------------------------
 # 1. MLflow Setup
@@ -46,7 +52,9 @@ rf_model_name = "Churn_RFModel"
 # -------------------------------------------------------------------
 # 2. Load and Prepare Data
 # -------------------------------------------------------------------
-def fetch_offline_features(fs: FeatureStore):
+def fetch_offline_features(fs: FeatureStore, code_features=()):
+    # code_features: the <col>__code columns of high-cardinality categoricals (see
+    # sparse_encoding), registered in the feature view from the same artifact.
     # Define entity query to fetch all distinct customer IDs from Redshift
     entity_query = "SELECT DISTINCT dm4ml_assignment_transformd_data.customerid, dm4ml_assignment_transformd_data.event_timestamp FROM public.dm4ml_assignment_transformd_data"
 
@@ -90,7 +98,7 @@ def fetch_offline_features(fs: FeatureStore):
             "customer_features:totalcharges",
             "customer_features:monthlycharges",
             "customer_features:churn",
-        ]
+        ] + [f"customer_features:{code}" for code in code_features]
     ).to_df()
 
     return entity_df
@@ -101,13 +109,21 @@ logger.info(f"Initializing FeatureStore at '{repo_path}'")
 fs = FeatureStore(repo_path=repo_path)
 logger.info("FeatureStore initialized successfully.")
 
-data_original = fetch_offline_features(fs)
+# High-cardinality one-hot columns (if any) are stored as <col>__code features and
+# trained on as a CSR matrix
+try:
+    preprocessing_artifact = load_preprocessing_artifact(os.path.join(project_root, "..", "artifacts", "preprocessing"))
+except CustomException as e:
+    logger.info(f"No preprocessing artifact available, training on dense features only: {e}")
+    preprocessing_artifact = None
+
+data_original = fetch_offline_features(fs, code_columns(preprocessing_artifact))
 
 # Dropping Datetime field
 data = data_original.drop(['event_timestamp'], axis=1)
 
-# Convert integer columns to float64
-data = data.astype({col: 'float64' for col in data.select_dtypes(include=['int64']).columns})
+# Shrink to the pipeline dtype policy (uint8 flags, float32 numerics)
+data = apply_dtype_policy(data, "Models_MLflow:load", exclude=("customerid", "churn"))
 
 # Drop 'customerid' and separate features/target
 X = data.drop(['churn', 'customerid'], axis=1)
@@ -118,13 +134,15 @@ label_encoder = LabelEncoder()
 y = label_encoder.fit_transform(y)
 
 # Fill missing values (simple approach)
-X = X.fillna(0)
+X = X.fillna(0).astype("float32")
+
+X = to_model_matrix(X, preprocessing_artifact)
 
 # Split data
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
 
-# Prepare an example input for logging
-input_example = X_test.iloc[0].to_dict()
+# Prepare an example input for logging (not supported by MLflow for sparse matrices)
+input_example = X_test.iloc[0].to_dict() if isinstance(X_test, pd.DataFrame) else None
 
 # -------------------------------------------------------------------
 # 3. Logistic Regression: Train, Log, and Register
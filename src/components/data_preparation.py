@@ -6,10 +6,8 @@ import boto3
 import warnings
 from io import StringIO
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler, LabelEncoder
 import sys
+from itertools import chain
 
 # ------------------ WARNING SUPPRESSION ------------------
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -19,22 +17,51 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 sys.path.append(project_root)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 from logger import setup_logging
+from csv_reader import SOURCE_SCHEMAS, NUMERIC_KINDS
 from utils import connect_to_s3
 from exception import CustomException
+from eda import start_eda, reservoir_sample
+from streaming_stats import PreparationStats, artifact_from_stats
+from dtype_policy import apply_dtype_policy
+from preprocessing import (fit_preprocessor, transform_with_artifact,
+                           save_preprocessing_artifact, load_preprocessing_artifact)
+from sparse_encoding import FEAST_BOUND_COLUMNS, collapse_sparse_columns
 
 # Setup logging
 logger = setup_logging("data_preparation")
 
-# Folder paths for EDA and processed outputs
+# Folder paths for EDA, processed outputs and the preprocessing artifact
 eda_folder = os.path.join(project_root, '..', "artifacts", "eda")
 processed_folder = os.path.join(project_root, "data", "processed")
+preprocessing_artifact_dir = os.path.join(project_root, '..', "artifacts", "preprocessing")
 os.makedirs(eda_folder, exist_ok=True)
 os.makedirs(processed_folder, exist_ok=True)
 
-# Initialize S3 client (for upload later)
-s3_client, aws_s3_bucket_name, contetnt_present_flag = connect_to_s3()
-
-def get_latest_s3_object(prefix):
+# EDA mode: off, sampled or full. Plots render in a process pool while preprocessing runs.
+eda_mode = os.getenv("EDA_MODE", "full").lower()
+eda_sample_size = int(os.getenv("EDA_SAMPLE_SIZE", "100000"))
+eda_seed = int(os.getenv("EDA_SEED", "42"))
+eda_stratify_col = os.getenv("EDA_STRATIFY_COL") or None  # e.g. "Churn"
+eda_workers = int(os.getenv("EDA_WORKERS", "0")) or None
+
+# Preprocessing mode: fit (learn and save the artifact), transform (reuse the saved artifact)
+# or chunked (two streaming passes for data that does not fit in memory).
+preprocessing_mode = os.getenv("PREPROCESSING_MODE", "fit").lower()
+preprocessing_chunk_size = int(os.getenv("PREPROCESSING_CHUNK_SIZE", "200000"))
+# Categoricals with more levels than this are one-hot encoded sparse (0 disables sparse encoding).
+sparse_cardinality_threshold = int(os.getenv("SPARSE_CARDINALITY_THRESHOLD", "50"))
+
+# Execution engine: pandas (default), arrow (pyarrow Tables and compute kernels end to end;
+# pandas is only built for the EDA sample) or dask (partitioned, multi-process).
+execution_engine = os.getenv("EXECUTION_ENGINE", "pandas").lower()
+# Dask: local process pool by default; DASK_SCHEDULER_ADDRESS selects a dask.distributed scheduler
+# whose workers run on this machine (input and output are staged on the local disk).
+dask_scheduler_address = os.getenv("DASK_SCHEDULER_ADDRESS") or None
+dask_workers = int(os.getenv("DASK_WORKERS", "0")) or None
+dask_blocksize = os.getenv("DASK_BLOCKSIZE") or None  # None: dask_backend.DEFAULT_BLOCKSIZE
+
+
+def get_latest_s3_object(s3_client, aws_s3_bucket_name, prefix):
     response = s3_client.list_objects_v2(Bucket=aws_s3_bucket_name, Prefix=prefix)
     objects = response.get("Contents", [])
     if not objects:
@@ -44,146 +71,269 @@ def get_latest_s3_object(prefix):
 
 
 # ------------------ STEP 1: LOAD THE LATEST MERGED FILE FROM S3 ------------------
-try:
-    latest_merge_key = get_latest_s3_object("merged/")
-    print(f"Latest merged file for processing: s3://{aws_s3_bucket_name}/{latest_merge_key}")
-    obj_merged = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=latest_merge_key)
-    df = pd.read_csv(StringIO(obj_merged['Body'].read().decode('utf-8')))
-except Exception as e:
-    print(f"Error loading merged file from S3: {e}")
-    raise
-
-# ------------------ STEP 2: EDA ON RAW MERGED DATA ------------------
-df_original = df.copy()  # Preserve a copy for EDA
-
-eda_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-plots_dir = os.path.join(eda_folder, f"eda_plots_raw_{eda_timestamp}")
-os.makedirs(plots_dir, exist_ok=True)
-
-print("\n--- EDA on Raw Merged Data ---")
-logger.info("\n--- EDA on Raw Merged Data ---")
-summary_stats = df_original.describe(include="all")
-print("\nSummary Statistics:")
-print(summary_stats)
-
-logger.info("\nSummary Statistics:")
-logger.info(summary_stats)
-summary_stats.to_csv(os.path.join(plots_dir, f"summary_statistics_{eda_timestamp}.csv"))
-
-# Identify numeric columns (assume "SeniorCitizen" is already categorical)
-num_columns = df_original.select_dtypes(include=[np.number]).columns.tolist()
-if "SeniorCitizen" in num_columns:
-    num_columns.remove("SeniorCitizen")
-
-
-def is_binary(series):
-    return len(series.dropna().unique()) == 2
-
-
-binary_cols = [col for col in num_columns if is_binary(df_original[col])]
-non_binary_cols = [col for col in num_columns if col not in binary_cols]
-target_var = "Churn"  # target column
-
-# Generate plots for non-binary numeric columns
-for col in non_binary_cols:
-    plt.figure(figsize=(6, 4))
-    sns.histplot(data=df_original, x=col, hue=target_var, kde=True)
-    plt.title(f"Histogram of {col} by {target_var}")
-    plt.tight_layout()
-    plt.savefig(os.path.join(plots_dir, f"hist_{col}.png"))
-    plt.close()
-
-    plt.figure(figsize=(6, 4))
-    sns.boxplot(x=target_var, y=col, data=df_original)
-    plt.title(f"Box Plot of {col} by {target_var}")
-    plt.tight_layout()
-    plt.savefig(os.path.join(plots_dir, f"box_{col}.png"))
-    plt.close()
-
-# Generate count plots for binary numeric columns
-for col in binary_cols:
-    plt.figure(figsize=(6, 4))
-    sns.countplot(data=df_original, x=col, hue=target_var)
-    plt.title(f"Count Plot of {col} by {target_var}")
-    plt.tight_layout()
-    plt.savefig(os.path.join(plots_dir, f"count_{col}.png"))
-    plt.close()
-
-print(f"EDA plots saved in: {plots_dir}")
-logger.info(f"EDA plots saved in: {plots_dir}")
-
-# ------------------ STEP 3: DATA PREPROCESSING ------------------
-# Start with the merged DataFrame 'df' (which already has "Churn", "SeniorCitizen", and "TotalCharges" handled)
-
-df_proc = df.copy()
-
-# Drop the identifier column "customerID" (we drop it here before encoding)
-# if "customerID" in df_proc.columns:
-#     df_proc = df_proc.drop(columns=["customerID"])
-#     print("Dropped customerID column.")
-#     logger.info("Dropped customerID column.")
-
-# Separate numeric and categorical columns.
-numeric_cols = df_proc.select_dtypes(include=[np.number]).columns.tolist()
-categorical_cols = df_proc.select_dtypes(include=["object", "category"]).columns.tolist()
+def load_latest_merged(s3_client, aws_s3_bucket_name):
+    try:
+        latest_merge_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "merged/")
+        print(f"Latest merged file for processing: s3://{aws_s3_bucket_name}/{latest_merge_key}")
+        obj_merged = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=latest_merge_key)
+        df = pd.read_csv(StringIO(obj_merged['Body'].read().decode('utf-8')))
+        return apply_dtype_policy(df, "data_preparation:load", exclude=("customerID",))
+    except Exception as e:
+        print(f"Error loading merged file from S3: {e}")
+        raise
 
-# Exclude target "Churn" from encoding.
-if "Churn" in categorical_cols:
-    categorical_cols.remove("Churn")
 
-if "customerID" in categorical_cols:
-    categorical_cols.remove("customerID")
-
-# (Assuming missing values are already imputed from previous steps; if not, fill them here.)
-for col in numeric_cols:
-    if df_proc[col].isnull().sum() > 0:
-        df_proc[col].fillna(df_proc[col].median(), inplace=True)
-for col in categorical_cols:
-    if df_proc[col].isnull().sum() > 0:
-        df_proc[col].fillna(df_proc[col].mode()[0], inplace=True)
-
-# Scale numeric columns (excluding Churn if it's in numeric)
-if "Churn" in numeric_cols:
-    numeric_cols.remove("Churn")
-
-
-# Standardize (normalize) numeric attributes.
-scaler = StandardScaler()
-df_proc[numeric_cols] = scaler.fit_transform(df_proc[numeric_cols])
-
-df_proc = pd.get_dummies(df_proc, columns=categorical_cols, drop_first=True)
-df_proc.columns = df_proc.columns.str.replace(" ", "_", regex=True)
-df_proc.rename(columns={"PaymentMethod_Credit_card_(automatic)": "PaymentMethod_Credit_card_automatic"}, inplace=True)
-df_proc.columns = df_proc.columns.str.lower()
+# ------------------ STEP 3: DATA PREPROCESSING ------------------
+def preprocess(df):
+    """
+    Clean, scale and one-hot encode the merged data.
+
+    PREPROCESSING_MODE=fit learns the scaler, category vocabularies and column order and
+    saves them as a versioned artifact; PREPROCESSING_MODE=transform reuses the latest
+    saved artifact so the output columns stay the same between runs.
+    Returns the processed frame and the artifact used.
+    """
+    if preprocessing_mode == "transform":
+        artifact = load_preprocessing_artifact(preprocessing_artifact_dir)
+    else:
+        artifact = fit_preprocessor(df, sparse_threshold=sparse_cardinality_threshold, dense_cols=FEAST_BOUND_COLUMNS)
+        save_preprocessing_artifact(artifact, preprocessing_artifact_dir)
+
+    df_proc = transform_with_artifact(df, artifact)
+    df_proc = apply_dtype_policy(df_proc, "data_preparation:write", exclude=("customerid",))
+
+    print("Data preprocessing (cleaning, scaling, encoding) completed.")
+    logger.info(f"Data preprocessing ({preprocessing_mode}) completed with artifact v{artifact.version}_{artifact.created_at}.")
+    logger.info(f"Processed DataFrame shape: {df_proc.shape}")
+    print("Processed DataFrame shape:", df_proc.shape)
+    return df_proc, artifact
+
+
+# ------------------ STEP 3 (CHUNKED): OUT-OF-CORE PREPROCESSING ------------------
+MERGED_NUMERIC_COLUMNS = [c for c, kind in SOURCE_SCHEMAS["merged"].items() if kind in NUMERIC_KINDS]
+
+
+def read_merged_chunks(s3_client, aws_s3_bucket_name, key):
+    """
+    The merged file in chunks of PREPROCESSING_CHUNK_SIZE rows, with the pinned numeric
+    columns coerced (a blank chunk stays float) and the load dtype policy applied, as
+    load_latest_merged does for the whole file.
+    """
+    body = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=key)['Body']
+    for chunk in pd.read_csv(body, chunksize=preprocessing_chunk_size):
+        for col in MERGED_NUMERIC_COLUMNS:
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+        yield apply_dtype_policy(chunk, "data_preparation:load", exclude=("customerID",))
+
+
+def preprocess_chunked(s3_client, aws_s3_bucket_name):
+    """
+    Two streaming passes over the latest merged file. Pass 1 accumulates Welford mean/variance
+    and category counts (and the EDA reservoir sample in the same pass); pass 2 standardizes
+    and encodes batch by batch into a local file. Memory stays bounded by the chunk size.
+    Returns the local processed file path, the artifact used and the EDA handle (or None).
+    """
+    latest_merge_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "merged/")
+    logger.info(f"Chunked preprocessing of s3://{aws_s3_bucket_name}/{latest_merge_key}")
+
+    # Pass 1: statistics (+ EDA sample)
+    chunks = read_merged_chunks(s3_client, aws_s3_bucket_name, latest_merge_key)
+    first = next(chunks)
+    # Kinds come from the pinned schema, not from the first chunk's dtypes.
+    stats = PreparationStats.for_columns(list(first.columns), MERGED_NUMERIC_COLUMNS)
+    stream = stats.track(chain([first], chunks))
+    eda_run = None
+    if eda_mode == "off":
+        for _ in stream:
+            pass
+    else:
+        sample, population = reservoir_sample(stream, eda_sample_size, seed=eda_seed, stratify_col=eda_stratify_col)
+        sample_info = {"mode": "sampled", "sample_rows": len(sample), "requested_sample_size": eda_sample_size,
+                       "seed": eda_seed, "stratify_col": eda_stratify_col, "population_rows": population}
+        eda_run = start_eda(sample, eda_folder, mode="full", max_workers=eda_workers, sample_info=sample_info)
+    artifact = artifact_from_stats(stats, sparse_threshold=sparse_cardinality_threshold, dense_cols=FEAST_BOUND_COLUMNS)
+    save_preprocessing_artifact(artifact, preprocessing_artifact_dir)
+
+    # Pass 2: transform batch by batch
+    upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    local_path = os.path.join(processed_folder, f"processed_churn_data_{upload_timestamp}.csv")
+    rows = 0
+    for i, chunk in enumerate(read_merged_chunks(s3_client, aws_s3_bucket_name, latest_merge_key)):
+        out = collapse_sparse_columns(transform_with_artifact(chunk, artifact), artifact)
+        out.to_csv(local_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows += len(out)
+    logger.info(f"Chunked preprocessing wrote {rows} rows to {local_path}")
+    return local_path, artifact, eda_run
+
+
+# ------------------ STEP 3 (ARROW): PREPROCESSING ON PYARROW TABLES ------------------
+def preprocess_arrow(s3_client, aws_s3_bucket_name):
+    """
+    Read the latest merged file into a pyarrow Table, fit (or load) the artifact and apply it
+    with compute kernels, then write the processed CSV locally with the Arrow CSV writer.
+    Returns the local processed file path, the artifact used and the EDA handle (or None).
+    """
+    # Engine modules are imported only on their own path to keep the default startup light.
+    from arrow_ops import (read_csv_table, write_csv_table, fit_preprocessor_table, transform_table_with_artifact,
+                           sample_table)
+
+    latest_merge_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "merged/")
+    logger.info(f"Arrow preprocessing of s3://{aws_s3_bucket_name}/{latest_merge_key}")
+    table = read_csv_table(s3_client.get_object(Bucket=aws_s3_bucket_name, Key=latest_merge_key)['Body'])
+
+    eda_run = None
+    if eda_mode == "sampled" and not eda_stratify_col:
+        sample = sample_table(table, eda_sample_size, seed=eda_seed).to_pandas()
+        sample_info = {"mode": "sampled", "sample_rows": len(sample), "requested_sample_size": eda_sample_size,
+                       "seed": eda_seed, "stratify_col": None, "population_rows": table.num_rows}
+        eda_run = start_eda(sample, eda_folder, mode="full", max_workers=eda_workers, sample_info=sample_info)
+    elif eda_mode != "off":
+        eda_run = start_eda(table.to_pandas(), eda_folder, mode=eda_mode, sample_size=eda_sample_size, seed=eda_seed,
+                            stratify_col=eda_stratify_col, max_workers=eda_workers)
+
+    if preprocessing_mode == "transform":
+        artifact = load_preprocessing_artifact(preprocessing_artifact_dir)
+    else:
+        artifact = fit_preprocessor_table(table, sparse_threshold=sparse_cardinality_threshold,
+                                          dense_cols=FEAST_BOUND_COLUMNS)
+        save_preprocessing_artifact(artifact, preprocessing_artifact_dir)
+
+    processed = transform_table_with_artifact(table, artifact)
+    upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    local_path = os.path.join(processed_folder, f"processed_churn_data_{upload_timestamp}.csv")
+    write_csv_table(processed, local_path)
+    logger.info(f"Arrow preprocessing wrote {processed.num_rows} rows x {processed.num_columns} columns to {local_path}")
+    return local_path, artifact, eda_run
+
+
+# ------------------ STEP 3 (DASK): PARTITIONED PREPROCESSING ------------------
+def preprocess_dask(s3_client, aws_s3_bucket_name):
+    """
+    Partitioned preprocessing with dask.dataframe. Scaler moments, medians, category modes
+    and vocabularies are computed once over all partitions, the artifact is broadcast to the
+    workers and applied partition by partition. The partitions get the load dtype policy
+    of load_latest_merged, decided once from global min/max, so the output matches the
+    single-process fit/transform modes column for column.
+    Returns the local processed file path, the artifact used and the EDA handle (or None).
+    """
+    from dask_backend import (get_client, compute, read_csv_partitions, collect_global_stats,
+                              artifact_from_global_stats, prepare_partitions, global_dtype_plan)
+
+    latest_merge_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "merged/")
+    local_input = os.path.join(processed_folder, "merged_input.csv")
+    s3_client.download_file(aws_s3_bucket_name, latest_merge_key, local_input)
+    logger.info(f"Dask preprocessing of s3://{aws_s3_bucket_name}/{latest_merge_key}")
+
+    client = get_client(dask_scheduler_address)
+    ddf = read_csv_partitions(local_input, blocksize=dask_blocksize)
+    ddf = ddf.astype(global_dtype_plan(ddf, exclude=("customerID",), client=client, num_workers=dask_workers))
+    if preprocessing_mode == "transform":
+        artifact = load_preprocessing_artifact(preprocessing_artifact_dir)
+        population = None
+    else:
+        global_stats = collect_global_stats(ddf, client=client, num_workers=dask_workers)
+        artifact = artifact_from_global_stats(global_stats, sparse_threshold=sparse_cardinality_threshold,
+                                              dense_cols=FEAST_BOUND_COLUMNS)
+        save_preprocessing_artifact(artifact, preprocessing_artifact_dir)
+        population = global_stats.stats.rows
+
+    eda_run = None
+    if eda_mode != "off":
+        # Only a sample is ever collected to the driver for plotting.
+        population = population or len(ddf)
+        fraction = min(1.0, eda_sample_size / max(population, 1))
+        (sample,) = compute(ddf.sample(frac=fraction, random_state=eda_seed), client=client, num_workers=dask_workers)
+        sample_info = {"mode": "sampled", "sample_rows": len(sample), "requested_sample_size": eda_sample_size,
+                       "seed": eda_seed, "stratify_col": None, "population_rows": population}
+        eda_run = start_eda(sample.reset_index(drop=True), eda_folder, mode="full", max_workers=eda_workers,
+                            sample_info=sample_info)
+
+    processed = prepare_partitions(ddf, artifact, client=client)
+    upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    local_path = os.path.join(processed_folder, f"processed_churn_data_{upload_timestamp}.csv")
+    compute_kwargs = {} if client is not None else {"scheduler": "processes", "num_workers": dask_workers}
+    processed.to_csv(local_path, single_file=True, index=False, compute_kwargs=compute_kwargs)
+    logger.info(f"Dask preprocessing wrote {ddf.npartitions} partitions to {local_path}")
+    return local_path, artifact, eda_run
 
-print("Data preprocessing (cleaning, scaling, encoding) completed.")
-logger.info("Data preprocessing (cleaning, scaling, encoding) completed.")
-logger.info(f"Processed DataFrame shape: {df_proc.shape}")
-print("Processed DataFrame shape:", df_proc.shape)
 
 # ------------------ STEP 4: UPLOAD PROCESSED FILE TO S3 ------------------
-print("Starting upload of processed file...")
-logger.info("Starting upload of processed file...")
-try:
-    csv_str = df_proc.to_csv(index=False)
-    print("CSV conversion completed.")
-    logger.info("CSV conversion completed.")
-except Exception as e:
-    print(f"Error during CSV conversion: {e}")
-    logger.info(f"Error during CSV conversion: {e}")
-    raise
-
-csv_buffer = StringIO(csv_str)
-upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-processed_s3_key = f"processed/{upload_timestamp}/processed_churn_data.csv"
-
-try:
-    s3_client.put_object(Bucket=aws_s3_bucket_name, Key=processed_s3_key, Body=csv_buffer.getvalue())
-    print(f"Processed file uploaded to s3://{aws_s3_bucket_name}/{processed_s3_key}")
-    logger.info(f"Processed file uploaded to s3://{aws_s3_bucket_name}/{processed_s3_key}")
-except Exception as e:
-    print(f"Error uploading processed file to S3: {e}")
-    logger.info(f"Error uploading processed file to S3: {e}")
-
-print("\nAll steps completed.")
-logger.info("\nAll steps completed.")
+def upload_processed(s3_client, aws_s3_bucket_name, df_proc):
+    print("Starting upload of processed file...")
+    logger.info("Starting upload of processed file...")
+    try:
+        csv_str = df_proc.to_csv(index=False)
+        print("CSV conversion completed.")
+        logger.info("CSV conversion completed.")
+    except Exception as e:
+        print(f"Error during CSV conversion: {e}")
+        logger.info(f"Error during CSV conversion: {e}")
+        raise
+
+    csv_buffer = StringIO(csv_str)
+    upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    processed_s3_key = f"processed/{upload_timestamp}/processed_churn_data.csv"
+
+    try:
+        s3_client.put_object(Bucket=aws_s3_bucket_name, Key=processed_s3_key, Body=csv_buffer.getvalue())
+        print(f"Processed file uploaded to s3://{aws_s3_bucket_name}/{processed_s3_key}")
+        logger.info(f"Processed file uploaded to s3://{aws_s3_bucket_name}/{processed_s3_key}")
+    except Exception as e:
+        print(f"Error uploading processed file to S3: {e}")
+        logger.info(f"Error uploading processed file to S3: {e}")
+
+
+def upload_processed_file(s3_client, aws_s3_bucket_name, local_path):
+    upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    processed_s3_key = f"processed/{upload_timestamp}/processed_churn_data.csv"
+    try:
+        # upload_file streams from disk with multipart uploads, so the file is never held in memory.
+        s3_client.upload_file(local_path, aws_s3_bucket_name, processed_s3_key)
+        print(f"Processed file uploaded to s3://{aws_s3_bucket_name}/{processed_s3_key}")
+        logger.info(f"Processed file uploaded to s3://{aws_s3_bucket_name}/{processed_s3_key}")
+    except Exception as e:
+        print(f"Error uploading processed file to S3: {e}")
+        logger.info(f"Error uploading processed file to S3: {e}")
+
+
+def main():
+    # Initialize S3 client (for upload later)
+    s3_client, aws_s3_bucket_name, contetnt_present_flag = connect_to_s3()
+
+    if preprocessing_mode == "chunked" or execution_engine in ("arrow", "dask"):
+        if preprocessing_mode == "chunked":
+            local_path, artifact, eda_run = preprocess_chunked(s3_client, aws_s3_bucket_name)
+        elif execution_engine == "dask":
+            local_path, artifact, eda_run = preprocess_dask(s3_client, aws_s3_bucket_name)
+        else:
+            local_path, artifact, eda_run = preprocess_arrow(s3_client, aws_s3_bucket_name)
+        upload_processed_file(s3_client, aws_s3_bucket_name, local_path)
+        if eda_run is not None:
+            eda_run.wait()
+        logger.info("\nAll steps completed.")
+        return
+
+    df = load_latest_merged(s3_client, aws_s3_bucket_name)
+
+    # ------------------ STEP 2: EDA ON RAW MERGED DATA (BACKGROUND) ------------------
+    print(f"\n--- EDA on Raw Merged Data ({eda_mode}) ---")
+    logger.info(f"\n--- EDA on Raw Merged Data ({eda_mode}) ---")
+    eda_run = start_eda(df, eda_folder, mode=eda_mode, sample_size=eda_sample_size, seed=eda_seed,
+                        stratify_col=eda_stratify_col, max_workers=eda_workers)
+
+    df_proc, artifact = preprocess(df)
+    # Sparse one-hot blocks are written as one code column each; the artifact expands them again.
+    upload_processed(s3_client, aws_s3_bucket_name, collapse_sparse_columns(df_proc, artifact))
+
+    # Plots are not on the critical path; only wait so the workers finish before exit.
+    if eda_run is not None:
+        eda_run.wait()
+        print(f"EDA plots saved in: {eda_run.plots_dir}")
+
+    print("\nAll steps completed.")
+    logger.info("\nAll steps completed.")
+
+
+if __name__ == "__main__":
+    main()
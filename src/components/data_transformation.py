@@ -1,4 +1,5 @@
 import os
+import shutil
 import pandas as pd
 import numpy as np
 import yaml
@@ -6,10 +7,8 @@ import boto3
 import warnings
 from io import StringIO
 from datetime import datetime
-import pyarrow as pa
-import pyarrow.parquet as pq
-from io import BytesIO
 import sys
+from functools import partial
 
 # ------------------ WARNING SUPPRESSION ------------------
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -21,18 +20,46 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 from logger import setup_logging
 from utils import connect_to_s3
 from exception import CustomException
+from dtype_policy import apply_dtype_policy
+from feature_engine import compile_features, evaluate_features
+from incremental import (DEFAULT_BUCKETS, PARTITION_COLUMN, STATE_KEY, customer_buckets, load_state,
+                         find_changed_rows, apply_delta, write_parquet_object)
+from parquet_writer import (DEFAULT_COMPRESSION, DEFAULT_ROW_GROUP_SIZE, write_partitioned_dataset,
+                            upload_dataset)
+from feature_relevance import feature_relevance_report, save_relevance_report
 
 # Folder paths for transformation outputs
 transformation_folder = os.path.join(project_root, "components", "data", "transformation")
 os.makedirs(transformation_folder, exist_ok=True)
+relevance_folder = os.path.join(project_root, '..', "artifacts", "feature_relevance")
 
 # Setup logging
 logger = setup_logging("data_transformation")
 
-# Initialize S3 client (for upload later)
-s3_client, aws_s3_bucket_name, contetnt_present_flag = connect_to_s3()
+# Transformation mode: full (recompute everything into a new Parquet dataset) or incremental
+# (recompute only new/changed customers and rewrite the customer_bucket partitions they fall in).
+transformation_mode = os.getenv("TRANSFORMATION_MODE", "full").lower()
+transformation_buckets = int(os.getenv("TRANSFORMATION_BUCKETS", str(DEFAULT_BUCKETS)))
 
-def get_latest_s3_object(prefix):
+# Execution engine: pandas (default), arrow (pyarrow Tables and compute kernels) or dask
+# (partitioned, multi-process; DASK_SCHEDULER_ADDRESS for a local dask.distributed scheduler).
+# arrow and dask apply to full mode only.
+execution_engine = os.getenv("EXECUTION_ENGINE", "pandas").lower()
+dask_scheduler_address = os.getenv("DASK_SCHEDULER_ADDRESS") or None
+dask_workers = int(os.getenv("DASK_WORKERS", "0")) or None
+dask_blocksize = os.getenv("DASK_BLOCKSIZE") or None  # None: dask_backend.DEFAULT_BLOCKSIZE
+
+# Parquet output tuning for the full dataset (incremental partitions use the writer defaults).
+parquet_row_group_size = int(os.getenv("PARQUET_ROW_GROUP_SIZE", str(DEFAULT_ROW_GROUP_SIZE)))
+parquet_compression = os.getenv("PARQUET_COMPRESSION", DEFAULT_COMPRESSION)
+
+# Feature relevance report: off, corr (target correlations) or mi (also mutual information on a sample).
+relevance_mode = os.getenv("FEATURE_RELEVANCE_MODE", "corr").lower()
+relevance_sample_size = int(os.getenv("FEATURE_RELEVANCE_SAMPLE_SIZE", "50000"))
+relevance_seed = int(os.getenv("FEATURE_RELEVANCE_SEED", "42"))
+
+
+def get_latest_s3_object(s3_client, aws_s3_bucket_name, prefix):
     response = s3_client.list_objects_v2(Bucket=aws_s3_bucket_name, Prefix=prefix)
     objects = response.get("Contents", [])
     if not objects:
@@ -41,112 +68,211 @@ def get_latest_s3_object(prefix):
     return latest_obj["Key"]
 
 # ------------------ STEP 1: LOAD THE LATEST MERGED FILE FROM S3 ------------------
-try:
-    latest_processed_key = get_latest_s3_object("processed/")
-    print(f"Latest processed file for tranformation: s3://{aws_s3_bucket_name}/{latest_processed_key}")
-    obj_processed = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=latest_processed_key)
-    df = pd.read_csv(StringIO(obj_processed['Body'].read().decode('utf-8')))
-except Exception as e:
-    print(f"Error loading processed file from S3: {e}")
-    raise
+def load_latest_processed(s3_client, aws_s3_bucket_name):
+    try:
+        latest_processed_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "processed/")
+        print(f"Latest processed file for tranformation: s3://{aws_s3_bucket_name}/{latest_processed_key}")
+        obj_processed = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=latest_processed_key)
+        df = pd.read_csv(StringIO(obj_processed['Body'].read().decode('utf-8')))
+        return apply_dtype_policy(df, "data_transformation:load", exclude=("customerid",))
+    except Exception as e:
+        print(f"Error loading processed file from S3: {e}")
+        raise
 
-def transform_processed_data(df):
-    """Transforms the processed Telco Churn dataset."""
+def load_latest_processed_table(s3_client, aws_s3_bucket_name):
+    # Engine modules are imported only on their own path to keep the default startup light.
+    from arrow_ops import read_csv_table, apply_table_dtype_policy
+
+    try:
+        latest_processed_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "processed/")
+        print(f"Latest processed file for tranformation: s3://{aws_s3_bucket_name}/{latest_processed_key}")
+        table = read_csv_table(s3_client.get_object(Bucket=aws_s3_bucket_name, Key=latest_processed_key)['Body'])
+        return apply_table_dtype_policy(table, "data_transformation:load", exclude=("customerid",))
+    except Exception as e:
+        print(f"Error loading processed file from S3: {e}")
+        raise
+
+# ------------------ DERIVED FEATURE SPEC ------------------
+SERVICE_COLS = ['onlinesecurity_yes', 'onlinebackup_yes', 'deviceprotection_yes', 'techsupport_yes',
+                'streamingtv_yes', 'streamingmovies_yes']
+
+FEATURE_SPECS = [
     # Service usage aggregation
-    service_cols = ['onlinesecurity_yes', 'onlinebackup_yes', 'onlinebackup_yes',  'techsupport_yes', 'streamingtv_yes', 'streamingmovies_yes']
-    df['total_services'] = df[service_cols].sum(axis=1)
-    # Charge ratio
-    df['monthly_total_ratio'] = df['monthlycharges'] / (df['totalcharges'] + 1e-9) #added small number to avoid divide by zero.
-    #Dependents Encoded.
-    df['dependents_label'] = np.where(df['dependents_yes'] == True,1,0)
-    #Partner Encoded.
-    df['partner_label'] = np.where(df['partner_yes'] == True,1,0)
-    #Family aggregation.
-    df['family_label'] = df['partner_label'] + df['dependents_label']
+    {"name": "total_services", "expression": " + ".join(SERVICE_COLS), "inputs": SERVICE_COLS, "dtype": "uint8"},
+    # Charge ratio (small number added to avoid divide by zero)
+    {"name": "monthly_total_ratio", "expression": "monthlycharges / (totalcharges + 1e-9)",
+     "inputs": ["monthlycharges", "totalcharges"], "dtype": "float32"},
+    # Dependents encoded
+    {"name": "dependents_label", "expression": "dependents_yes != 0", "inputs": ["dependents_yes"], "dtype": "uint8"},
+    # Partner encoded
+    {"name": "partner_label", "expression": "partner_yes != 0", "inputs": ["partner_yes"], "dtype": "uint8"},
+    # Family aggregation
+    {"name": "family_label", "expression": "partner_label + dependents_label",
+     "inputs": ["partner_label", "dependents_label"], "dtype": "uint8"},
+]
+
+
+def transform_processed_data(df):
+    """Transforms the processed Telco Churn dataset with the compiled FEATURE_SPECS plan."""
+    plan = compile_features(FEATURE_SPECS, df.columns)
+    df, feature_costs = evaluate_features(plan, df)
     return df
 
-# Load the prepared data
-df_new = transform_processed_data(df)
-
-# ------------------ STEP 4: UPLOAD TRANSFORMED FILE TO S3 ------------------
-print("Starting upload of transformed file...")
-try:
-    csv_str = df_new.to_csv(index=False)
-    print("CSV conversion completed.")
-except Exception as e:
-    print(f"Error during CSV conversion: {e}")
-    raise
-
-try:
-    # Convert DataFrame to Parquet using pyarrow
-    table = pa.Table.from_pandas(df)
-    print("Parquet conversion completed.")
-except Exception as e:
-    print(f"Error during Parquet conversion: {e}")
-    raise
-
-upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-# Create a StringIO buffer to store the modified df in memory
-csv_buffer = StringIO(csv_str)
-transformed_s3_key_s3 = f"transformed/{upload_timestamp}/transformed_churn_data.csv"
-
-# Create a BytesIO buffer to store the Parquet file in memory
-parquet_buffer = BytesIO()
-transformed_s3_key_parquet = f"transformed/{upload_timestamp}/transformed_churn_data.parquet"
-# Write the Parquet file to the buffer
-pq.write_table(table, parquet_buffer)
-# Move the cursor back to the start of the buffer
-parquet_buffer.seek(0)
-
-try:
-    #s3_client.put_object(Bucket=aws_s3_bucket_name, Key=transformed_s3_key_s3, Body=csv_buffer.getvalue())
-    #print(f"Transformed file uploaded to s3://{aws_s3_bucket_name}/{transformed_s3_key_s3}")
-    s3_client.put_object(Bucket=aws_s3_bucket_name, Key=transformed_s3_key_parquet, Body=parquet_buffer.getvalue())
-    print(f"Parquet file successfully uploaded to s3://{aws_s3_bucket_name}/{transformed_s3_key_parquet}")
-    logger.info(f"Parquet file successfully uploaded to s3://{aws_s3_bucket_name}/{transformed_s3_key_parquet}")
-except Exception as e:
-    print(f"Error uploading transformed file to S3: {e}")
-    logger.info(f"Error uploading transformed file to S3: {e}")
-
-print("\nAll steps completed.")
-logger.info("\nAll steps completed.")
-
-
-#--------------- Check before and after df correlation values --------------
-# Correlation analysis
-# Convert 'Churn' to numerical (0/1)
-df['churn'] = df['churn'].map({'Yes': 1, 'No': 0})
-# Convert column 'A' from float to int
-df['churn'] = df['churn'].astype(int)
-# Ensure all columns are numeric
-for col in df.columns:
-    if df[col].dtype == 'object':
-        try:
-            df[col] = pd.to_numeric(df[col], errors='coerce')  # Convert to numeric, coerce errors to NaN)
-        except ValueError:
-            print(f"Column '{col}' cannot be converted to numeric.")
-            logger.info("Uploading parquet file in the S3 Completed")
-            # Handle non-numeric columns (e.g., drop or encode further)
-            df = df.drop(col, axis=1) # Drop the column that cannot be converted.
-
-
-correlation_matrix_old = df.corr()
-churn_correlations_old = correlation_matrix_old['churn'].sort_values(ascending=False)
-print(churn_correlations_old)
-
-for col in df_new.columns:
-    if df_new[col].dtype == 'object':
-        try:
-            df_new[col] = pd.to_numeric(df_new[col], errors='coerce')  # Convert to numeric, coerce errors to NaN)
-        except ValueError:
-            print(f"Column '{col}' cannot be converted to numeric.")
-            logger.info(f"Column '{col}' cannot be converted to numeric.")
-            # Handle non-numeric columns (e.g., drop or encode further)
-            df_new = df_new.drop(col, axis=1) # Drop the column that cannot be converted.
-
-
-correlation_matrix_new = df_new.corr()
-churn_correlations_new = correlation_matrix_new['churn'].sort_values(ascending=False)
-print(churn_correlations_new)
-logger.info("Uploading parquet file in the S3 Completed")
\ No newline at end of file
+
+def transform_processed_table(table):
+    """Same FEATURE_SPECS plan evaluated with pyarrow.compute kernels on a Table."""
+    from arrow_ops import evaluate_features_table
+
+    plan = compile_features(FEATURE_SPECS, table.column_names)
+    table, feature_costs = evaluate_features_table(plan, table)
+    return table
+
+# ------------------ STEP 4: UPLOAD TRANSFORMED DATASET TO S3 ------------------
+def new_staging_folder():
+    upload_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return upload_timestamp, os.path.join(transformation_folder, upload_timestamp)
+
+
+def upload_staged_dataset(s3_client, aws_s3_bucket_name, upload_timestamp, local_root, paths):
+    """
+    Upload the Parquet files staged under local_root to transformed/<timestamp>/, then
+    remove the staging folder. It is kept when the upload fails.
+    """
+    transformed_prefix = f"transformed/{upload_timestamp}/"
+    try:
+        upload_dataset(s3_client, aws_s3_bucket_name, local_root, transformed_prefix, paths)
+        print(f"Parquet dataset successfully uploaded to s3://{aws_s3_bucket_name}/{transformed_prefix}")
+        logger.info(f"Parquet dataset ({len(paths)} files) successfully uploaded to s3://{aws_s3_bucket_name}/{transformed_prefix}")
+    except Exception as e:
+        print(f"Error uploading transformed file to S3: {e}")
+        logger.info(f"Error uploading transformed file to S3: {e}")
+        return
+    shutil.rmtree(local_root, ignore_errors=True)
+
+
+def upload_transformed(s3_client, aws_s3_bucket_name, df_new):
+    """
+    Write df_new as a customer_bucket-partitioned Parquet dataset (zstd, dictionary encoding,
+    column statistics, bounded row groups) to a local staging folder, streaming one row
+    group at a time, then upload the parts under transformed/<timestamp>/.
+    df_new may be a DataFrame or, with the Arrow engine, a pyarrow Table.
+    """
+    print("Starting upload of transformed file...")
+    upload_timestamp, local_root = new_staging_folder()
+    try:
+        buckets = customer_buckets(df_new["customerid"].to_numpy(), transformation_buckets)
+        paths = write_partitioned_dataset(df_new, local_root, buckets, PARTITION_COLUMN,
+                                          row_group_size=parquet_row_group_size, compression=parquet_compression)
+        print("Parquet conversion completed.")
+    except Exception as e:
+        print(f"Error during Parquet conversion: {e}")
+        raise
+
+    upload_staged_dataset(s3_client, aws_s3_bucket_name, upload_timestamp, local_root, paths)
+
+
+# ------------------ STEPS 1-4 (DASK): PARTITIONED TRANSFORMATION ------------------
+def transform_dask(s3_client, aws_s3_bucket_name):
+    """
+    Evaluate FEATURE_SPECS partition by partition with dask.dataframe. The compiled plan and
+    the dtype policy (from one global min/max pass) are decided once and broadcast, so every
+    Parquet part has the single-process schema. Each Dask partition writes its own part
+    file into the customer_bucket partitions it touches; the parts are then uploaded.
+    """
+    from dask_backend import get_client, read_csv_partitions, transform_partitions, write_partitions
+
+    latest_processed_key = get_latest_s3_object(s3_client, aws_s3_bucket_name, "processed/")
+    local_input = os.path.join(transformation_folder, "processed_input.csv")
+    s3_client.download_file(aws_s3_bucket_name, latest_processed_key, local_input)
+    logger.info(f"Dask transformation of s3://{aws_s3_bucket_name}/{latest_processed_key}")
+
+    client = get_client(dask_scheduler_address)
+    ddf = read_csv_partitions(local_input, blocksize=dask_blocksize)
+    plan = compile_features(FEATURE_SPECS, ddf.columns)
+    transformed = transform_partitions(ddf, plan, client=client, num_workers=dask_workers)
+
+    upload_timestamp, local_root = new_staging_folder()
+    paths = write_partitions(transformed, local_root, PARTITION_COLUMN,
+                             partial(customer_buckets, n_buckets=transformation_buckets),
+                             parquet_row_group_size, parquet_compression, client=client, num_workers=dask_workers)
+    upload_staged_dataset(s3_client, aws_s3_bucket_name, upload_timestamp, local_root, paths)
+
+
+# ------------------ STEP 4 (INCREMENTAL): MERGE CHANGED ROWS INTO PARTITIONS ------------------
+def transform_incremental(s3_client, aws_s3_bucket_name, df):
+    """
+    Recompute features only for customers whose processed row is new or changed since the
+    last incremental run (customerid + content hash), then merge them into the
+    customer_bucket partitions of transformed/dataset/. Untouched partitions are not rewritten.
+    The hash state is saved last, so a failed run is simply repeated next time.
+    """
+    state = load_state(s3_client, aws_s3_bucket_name)
+    delta, new_state = find_changed_rows(df, state, n_buckets=transformation_buckets)
+    if delta.empty:
+        print("No new or changed rows; transformed dataset is up to date.")
+        logger.info("No new or changed rows; transformed dataset is up to date.")
+        return []
+
+    # Feature dtypes come from the specs and the load policy ran on the full file, so the write
+    # policy is skipped here: re-downcasting a small delta could change a partition's schema.
+    transformed_delta = transform_processed_data(delta)
+    written = apply_delta(s3_client, aws_s3_bucket_name, transformed_delta)
+    write_parquet_object(s3_client, aws_s3_bucket_name, STATE_KEY, new_state)
+    logger.info(f"Incremental transformation rewrote {len(written)} partitions for {len(delta)} rows.")
+    return written
+
+
+# ------------------ STEP 5: FEATURE RELEVANCE REPORT ------------------
+def write_relevance_report(df, df_new):
+    """Target-only correlations (and optionally mutual information) before and after transformation."""
+    if relevance_mode == "off":
+        return None
+    report = feature_relevance_report({"before": df, "after": df_new}, target="churn", mode=relevance_mode,
+                                      sample_size=relevance_sample_size, seed=relevance_seed)
+    return save_relevance_report(report, relevance_folder)
+
+
+def main():
+    # Initialize S3 client (for upload later)
+    s3_client, aws_s3_bucket_name, contetnt_present_flag = connect_to_s3()
+
+    if execution_engine == "dask" and transformation_mode != "incremental":
+        transform_dask(s3_client, aws_s3_bucket_name)
+        print("\nAll steps completed.")
+        logger.info("\nAll steps completed (relevance report is not computed in dask mode).")
+        return
+
+    if execution_engine == "arrow" and transformation_mode != "incremental":
+        from arrow_ops import apply_table_dtype_policy
+
+        table = load_latest_processed_table(s3_client, aws_s3_bucket_name)
+        table_new = transform_processed_table(table)
+        table_new = apply_table_dtype_policy(table_new, "data_transformation:write", exclude=("customerid",))
+        upload_transformed(s3_client, aws_s3_bucket_name, table_new)
+        print("\nAll steps completed.")
+        logger.info("\nAll steps completed.")
+        # The relevance report works on NumPy arrays; only convert when it is enabled.
+        if relevance_mode != "off":
+            write_relevance_report(table.to_pandas(), table_new.to_pandas())
+        return
+
+    df = load_latest_processed(s3_client, aws_s3_bucket_name)
+    if transformation_mode == "incremental":
+        transform_incremental(s3_client, aws_s3_bucket_name, df)
+        print("\nAll steps completed.")
+        logger.info("\nAll steps completed.")
+        return
+
+    # Load the prepared data
+    df_new = transform_processed_data(df)
+    df_new = apply_dtype_policy(df_new, "data_transformation:write", exclude=("customerid",))
+    upload_transformed(s3_client, aws_s3_bucket_name, df_new)
+
+    print("\nAll steps completed.")
+    logger.info("\nAll steps completed.")
+
+    write_relevance_report(df, df_new)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
-import subprocess
+import os
 import sys
-subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements_without_GE.txt"])
 
-import os
+# ------------------ SETUP ------------------
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src'))
+sys.path.append(project_root)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+from logger import setup_logging
+from environment_check import ensure_environment
+
+logger = setup_logging("feature_store")
+
+# The environment is checked against the requirements once (see environment_check)
+# instead of being reinstalled on every run.
+ensure_environment("requirements_without_GE.txt")
+
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
@@ -11,16 +22,10 @@ from feast.types import Float32, Int32, String, UnixTimestamp
 from feast.value_type import ValueType
 from feast import RedshiftSource
 
-
-# ------------------ SETUP ------------------
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src'))
-sys.path.append(project_root)
-current_dir = os.path.dirname(os.path.abspath(__file__))
-from logger import setup_logging
 from utils import connect_to_s3
 from exception import CustomException
-
-logger = setup_logging("feature_store")
+from preprocessing import load_preprocessing_artifact
+from sparse_encoding import code_columns
 
 try:
     # Define Feast Components
@@ -38,6 +43,15 @@ try:
         timestamp_field="event_timestamp",
     )
 
+    # High-cardinality categoricals reach the table as one <col>__code column each
+    # (sparse_encoding.collapse_sparse_columns); register those of the current artifact.
+    try:
+        preprocessing_artifact = load_preprocessing_artifact(os.path.join(project_root, "..", "artifacts", "preprocessing"))
+    except CustomException as e:
+        logger.info(f"No preprocessing artifact available, no code features registered: {e}")
+        preprocessing_artifact = None
+    code_fields = [Field(name=code, dtype=Int32) for code in code_columns(preprocessing_artifact)]
+
     customer_features = FeatureView(
         name="customer_features",
         entities=[customer],
@@ -80,7 +94,7 @@ try:
             Field(name="churn", dtype=String),
             Field(name="customerid", dtype=String),
             Field(name="event_timestamp", dtype=UnixTimestamp)
-        ],
+        ] + code_fields,
         source=source,
         online=True
     )
@@ -20,6 +20,10 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 from logger import setup_logging
 from utils import connect_to_s3
 from exception import CustomException
+from dedup_index import CustomerKeyIndex, deduplicate_chunks
+from arrow_ops import standardize_raw_table, concat_sources
+from csv_reader import (DEFAULT_BLOCK_SIZE, read_source_csv, read_source_table, table_to_frame, iter_source_frames,
+                        concat_source_frames)
 
 # ------------------ WARNING SUPPRESSION ------------------
 warnings.filterwarnings(
@@ -34,6 +38,15 @@ logger = setup_logging("merger")
 # Initialize S3 client (for upload later)
 s3_client, aws_s3_bucket_name, contetnt_present_flag = connect_to_s3()
 
+# Cross-ingest dedup of customer records: off (default), drop or upsert.
+dedup_mode = os.getenv("DEDUP_MODE", "off").lower()
+dedup_block_size = int(os.getenv("DEDUP_BLOCK_SIZE", str(DEFAULT_BLOCK_SIZE)))  # CSV bytes per batch
+dedup_index_path = os.path.join(project_root, "..", "artifacts", "dedup", "customer_keys.npy")
+
+# Execution engine: pandas (default) or arrow. With arrow the raw files are read, cleaned and
+# concatenated as pyarrow Tables; pandas is only built for the sklearn imputation.
+execution_engine = os.getenv("EXECUTION_ENGINE", "pandas").lower()
+
 def get_latest_s3_object(base_prefix):
     """
     List all objects under a given base prefix and return the key of the most recent file.
@@ -57,55 +70,91 @@ except Exception as e:
     print(f"Error retrieving latest dataset keys: {e}")
     raise
 
-try:
-    # Retrieve Kaggle dataset from S3
-    obj_kaggle = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=kaggle_key)
-    df_kaggle = pd.read_csv(obj_kaggle['Body'])
-
-    # Retrieve rds dataset from S3
-    obj_rds = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=rds_key)
-    df_rds = pd.read_csv(obj_rds['Body'])
-
-    print("Successfully loaded Kaggle and rds datasets from S3.")
-    logger.info("Successfully loaded Kaggle and rds datasets from S3.")
-except Exception as e:
-    print(f"Error loading datasets from S3: {e}")
-    logger.info(f"Error loading datasets from S3: {e}")
-    raise
-
-# ------------------ STANDARDIZE AND CONVERT COLUMNS ------------------
-# Convert "Churn" to categorical "Yes"/"No"
-if "Churn" in df_kaggle.columns:
-    df_kaggle["Churn"] = df_kaggle["Churn"].map({0: "No", 1: "Yes", "0": "No", "1": "Yes", "No": "No", "Yes": "Yes"})
-if "Churn" in df_rds.columns:
-    df_rds["Churn"] = df_rds["Churn"].map({0: "No", 1: "Yes", "0": "No", "1": "Yes", "No": "No", "Yes": "Yes"})
-
-# Convert "SeniorCitizen" to categorical if present. If numeric, map 0->"No", 1->"Yes".
-if "SeniorCitizen" in df_kaggle.columns:
-    if pd.api.types.is_numeric_dtype(df_kaggle["SeniorCitizen"]):
-        df_kaggle["SeniorCitizen"] = df_kaggle["SeniorCitizen"].map({0: "No", 1: "Yes"})
-if "SeniorCitizen" in df_rds.columns:
-    if pd.api.types.is_numeric_dtype(df_rds["SeniorCitizen"]):
-        df_rds["SeniorCitizen"] = df_rds["SeniorCitizen"].map({0: "No", 1: "Yes"})
-
-# Ensure "TotalCharges" is numeric so it is not imputed as a string.
-if "TotalCharges" in df_kaggle.columns:
-    df_kaggle["TotalCharges"] = pd.to_numeric(df_kaggle["TotalCharges"], errors="coerce")
-if "TotalCharges" in df_rds.columns:
-    df_rds["TotalCharges"] = pd.to_numeric(df_rds["TotalCharges"], errors="coerce")
-
-# ------------------ MERGE VIA VERTICAL CONCATENATION ------------------
-# Assume Kaggle has more columns; rds rows will get NaN for missing features.
-merged_df = pd.concat([df_kaggle, df_rds], axis=0, ignore_index=True, sort=False)
-
-# Reorder columns so that Kaggle's column order is preserved.
-final_columns = list(df_kaggle.columns)
-for col in merged_df.columns:
-    if col not in final_columns:
-        final_columns.append(col)
-merged_df = merged_df[final_columns]
+def read_raw_file(key, source, dedup_index=None):
+    """
+    Read a raw file from S3 with the source's pinned schema. With dedup enabled the file is
+    streamed in batches, read with the same schema, through the customer key index so
+    repeats are removed before anything is merged.
+    """
+    body = s3_client.get_object(Bucket=aws_s3_bucket_name, Key=key)['Body']
+    if dedup_index is None:
+        return read_source_csv(body.read(), source)
+    chunks = iter_source_frames(body, source, block_size=dedup_block_size)
+    return concat_source_frames(deduplicate_chunks(chunks, dedup_index, mode=dedup_mode))
+
+dedup_index = None
+if dedup_mode != "off":
+    dedup_index = CustomerKeyIndex(dedup_index_path)
+    logger.info(f"Dedup mode '{dedup_mode}' enabled with {len(dedup_index)} known customers.")
+
+if execution_engine == "arrow" and dedup_index is None:
+    try:
+        tables = [standardize_raw_table(read_source_table(s3_client.get_object(Bucket=aws_s3_bucket_name, Key=key)['Body'].read(), source))
+                  for key, source in ((kaggle_key, "kaggle"), (rds_key, "rds"))]
+        print("Successfully loaded Kaggle and rds datasets from S3.")
+        logger.info("Successfully loaded Kaggle and rds datasets from S3 as Arrow tables.")
+    except Exception as e:
+        print(f"Error loading datasets from S3: {e}")
+        logger.info(f"Error loading datasets from S3: {e}")
+        raise
+    # Kaggle's column order is kept by the concat; IterativeImputer needs a pandas frame.
+    merged_df = table_to_frame(concat_sources(tables))
+else:
+    try:
+        # Retrieve Kaggle dataset from S3
+        df_kaggle = read_raw_file(kaggle_key, "kaggle", dedup_index)
+
+        # Retrieve rds dataset from S3
+        df_rds = read_raw_file(rds_key, "rds", dedup_index)
+
+        print("Successfully loaded Kaggle and rds datasets from S3.")
+        logger.info("Successfully loaded Kaggle and rds datasets from S3.")
+    except Exception as e:
+        print(f"Error loading datasets from S3: {e}")
+        logger.info(f"Error loading datasets from S3: {e}")
+        raise
+
+    # ------------------ STANDARDIZE AND CONVERT COLUMNS ------------------
+    # Convert "Churn" to categorical "Yes"/"No"
+    if "Churn" in df_kaggle.columns:
+        df_kaggle["Churn"] = df_kaggle["Churn"].map({0: "No", 1: "Yes", "0": "No", "1": "Yes", "No": "No", "Yes": "Yes"})
+    if "Churn" in df_rds.columns:
+        df_rds["Churn"] = df_rds["Churn"].map({0: "No", 1: "Yes", "0": "No", "1": "Yes", "No": "No", "Yes": "Yes"})
+
+    # Convert "SeniorCitizen" to categorical if present. If numeric, map 0->"No", 1->"Yes".
+    if "SeniorCitizen" in df_kaggle.columns:
+        if pd.api.types.is_numeric_dtype(df_kaggle["SeniorCitizen"]):
+            df_kaggle["SeniorCitizen"] = df_kaggle["SeniorCitizen"].map({0: "No", 1: "Yes"})
+    if "SeniorCitizen" in df_rds.columns:
+        if pd.api.types.is_numeric_dtype(df_rds["SeniorCitizen"]):
+            df_rds["SeniorCitizen"] = df_rds["SeniorCitizen"].map({0: "No", 1: "Yes"})
+
+    # Ensure "TotalCharges" is numeric so it is not imputed as a string.
+    if "TotalCharges" in df_kaggle.columns:
+        df_kaggle["TotalCharges"] = pd.to_numeric(df_kaggle["TotalCharges"], errors="coerce")
+    if "TotalCharges" in df_rds.columns:
+        df_rds["TotalCharges"] = pd.to_numeric(df_rds["TotalCharges"], errors="coerce")
+
+    # ------------------ MERGE VIA VERTICAL CONCATENATION ------------------
+    # Assume Kaggle has more columns; rds rows will get NaN for missing features.
+    merged_df = pd.concat([df_kaggle, df_rds], axis=0, ignore_index=True, sort=False)
+
+    # Reorder columns so that Kaggle's column order is preserved.
+    final_columns = list(df_kaggle.columns)
+    for col in merged_df.columns:
+        if col not in final_columns:
+            final_columns.append(col)
+    merged_df = merged_df[final_columns]
+if dedup_mode == "upsert" and "customerID" in merged_df.columns:
+    # Later rows (rds after kaggle) replace earlier ones for the same customer.
+    merged_df = merged_df.drop_duplicates(subset=["customerID"], keep="last").reset_index(drop=True)
 print(f"Merged dataset shape: {merged_df.shape}")
 logger.info(f"Merged dataset shape: {merged_df.shape}")
+if merged_df.empty:
+    # Drop mode with every customer already merged: nothing to impute or upload.
+    print("No new customers to merge; merge step skipped.")
+    logger.info("No new customers to merge; merge step skipped.")
+    sys.exit(0)
 
 # ------------------ IMPUTATION ------------------
 # Separate the target ("Churn") from features.
@@ -175,13 +224,20 @@ imputed_df.to_csv(csv_buffer, index=False)
 push_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 push_s3_key = f"merged/{push_timestamp}/merged_churn_data.csv"
 
+uploaded = False
 try:
     s3_client.put_object(Bucket=aws_s3_bucket_name, Key=push_s3_key, Body=csv_buffer.getvalue())
+    uploaded = True
     print(f"Merged file after imputation uploaded to s3://{aws_s3_bucket_name}/{push_s3_key}")
     logger.info(f"Merged file after imputation uploaded to s3://{aws_s3_bucket_name}/{push_s3_key}")
 except Exception as e:
     print(f"Error uploading merged file to S3: {e}")
     logger.info(f"Error uploading merged file to S3: {e}")
 
+# Only mark customers as seen once the merged file is safely stored. A failing commit
+# raises: the index would otherwise be out of sync with what was merged.
+if uploaded and dedup_index is not None:
+    dedup_index.commit()
+
 print("\nMerge step completed.")
 logger.info("\nMerge step completed.")
@@ -21,6 +21,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 from logger import setup_logging
 from utils import connect_to_s3
 from exception import CustomException
+from incremental import PARTITION_COLUMN
 credentials_path = os.path.join(project_root, '..', "config", "credentials.yaml")
 
 # Setup logging
@@ -62,6 +63,10 @@ try:
     logger.info("Here 2")
     latest_transformed_key = get_latest_s3_object("transformed/")
     s3_transformed_path=f"s3://{aws_s3_bucket_name}/{latest_transformed_key}"
+    if f"/{PARTITION_COLUMN}=" in latest_transformed_key:
+        # Partitioned dataset: COPY every customer_bucket part in parallel; any part carries the schema.
+        dataset_prefix = latest_transformed_key.split(f"{PARTITION_COLUMN}=")[0]
+        s3_transformed_path=f"s3://{aws_s3_bucket_name}/{dataset_prefix}"
     logger.info(f"Latest transformed file for loading: {s3_transformed_path}")
 
 
@@ -94,9 +99,10 @@ except Exception as e:
 def map_dtype_to_redshift(dtype):
     """Maps pandas dtype to Redshift data types."""
     if pd.api.types.is_integer_dtype(dtype):
-        return "BIGINT"
+        # uint8 flags and downcast counters from the dtype policy fit in a SMALLINT
+        return "SMALLINT" if dtype.itemsize <= 2 and dtype != "uint16" else "BIGINT"
     elif pd.api.types.is_float_dtype(dtype):
-        return "FLOAT8"
+        return "REAL" if dtype.itemsize == 4 else "FLOAT8"
     elif pd.api.types.is_bool_dtype(dtype):
         return "BOOLEAN"
     elif pd.api.types.is_datetime64_any_dtype(dtype):
@@ -1,18 +1,9 @@
-import subprocess
-import sys
-
-subprocess.run([sys.executable, "-m", "pip", "freeze", "|", "xargs", "pip" "uninstall" "-y"])
-subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-
 import os
-import yaml
-import boto3
-import warnings
 import sys
-import great_expectations as ge
-from great_expectations.core.batch import RuntimeBatchRequest
-from datetime import datetime
-from great_expectations.validator.metric_configuration import MetricConfiguration
+import json
+import warnings
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ------------------ SETUP ------------------
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
@@ -21,7 +12,20 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 
 from exception import CustomException
 from logger import setup_logging
+from environment_check import ensure_environment
+
+# Ensure the logs folder exists
+logger = setup_logging("validation_GE")
+
+# The environment is checked against the requirements once (see environment_check)
+# instead of being reinstalled on every run.
+ensure_environment("requirements.txt")
+
 from utils import connect_to_s3
+from csv_reader import read_source_csv
+from validation_cache import ValidationCache, expectation_hash
+from expectation_spec import get_spec, ge_expectations
+from sampled_validation import SamplingPlan, sample_s3_csv, assess_checks, needs_full_scan
 
 # Define the path to the bash script and requirements file
 """bash_script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'components'))
@@ -39,102 +43,171 @@ subprocess.run(["bash", full_bash_script_path, requirements_file_with_GE])
 """
 
 
-# Ensure the logs folder exists
-logger = setup_logging("validation_GE")
-
 # Suppress python warnings (e.g. DeprecationWarnings)
 warnings.filterwarnings("ignore")
 
-# Initialize GE Data Context (assumes GE project is already set up)
-context = ge.get_context()
+# The data context (suites, stores, Data Docs) and the datasource's execution engine are
+# shared by the worker threads; using them is serialized, downloads and parsing run
+# concurrently.
+context_lock = threading.RLock()
+# Great Expectations and its data context are loaded on first use: a run whose files are
+# all cached, or a --build-docs run with nothing pending, never imports them.
+_context = None
+
+
+def get_context():
+    global _context
+    with context_lock:
+        if _context is None:
+            import great_expectations as ge
+            # Initialize GE Data Context (assumes GE project is already set up)
+            _context = ge.get_context()
+        return _context
+
+# Same settings as validation_manual: bounded pool size and number of recent files per source.
+validation_workers = int(os.getenv("VALIDATION_WORKERS", "4"))
+validation_backfill = int(os.getenv("VALIDATION_BACKFILL", "1"))
+# VALIDATION_MODE=sampled validates byte-range samples of the files first, as in
+# validation_manual; other modes validate the whole file.
+validation_mode = os.getenv("VALIDATION_MODE", "full").lower()
+sampling_plan = SamplingPlan.from_env()
+# Results are cached per (object key, ETag, expectations); FORCE_REVALIDATION=true ignores the cache.
+force_revalidation = os.getenv("FORCE_REVALIDATION", "false").lower() in ("1", "true", "yes")
+validation_cache = ValidationCache(os.path.join(project_root, "..", "artifacts", "validation_cache", "ge"))
+
+# Data Docs are updated only for the suites and validations that changed, after the
+# validations: "incremental" builds those pages at the end of the run, "deferred" queues
+# them for a later `python src/components/validation_GE.py --build-docs` step.
+data_docs_build = os.getenv("DATA_DOCS_BUILD", "incremental").lower()
+pending_docs_path = os.path.join(project_root, "..", "artifacts", "validation_cache", "ge_pending_docs.json")
+# Identifiers of the suites and validation results written since the last docs build.
+changed_resources = []
+
+SOURCE_SETTINGS = {
+    "kaggle": ("data/raw/kaggle/", "customer_churn_suite_kaggle"),
+    "rds": ("data/raw/rds/", "customer_churn_suite_rds"),
+}
 
 # ------------------ EXPECTATION FUNCTIONS ------------------
 
-def add_kaggle_expectations(validator):
-    validator.expect_table_row_count_to_be_between(min_value=1, max_value=15000)
-    validator.expect_column_values_to_be_between("SeniorCitizen", min_value=0, max_value=1)
-    validator.expect_column_values_to_be_between("tenure", min_value=0, max_value=100)
-    validator.expect_column_values_to_be_between("MonthlyCharges", min_value=0, max_value=500)
-    validator.expect_column_values_to_not_be_null("SeniorCitizen")
-    validator.expect_column_values_to_not_be_null("tenure")
-    validator.expect_column_values_to_not_be_null("MonthlyCharges")
-    validator.expect_column_values_to_not_be_null("TotalCharges")
-    validator.expect_column_values_to_be_in_set("gender", ["Male", "Female"])
-    validator.expect_column_values_to_be_in_set("Partner", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set("Dependents", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set("PhoneService", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set("MultipleLines", ["No phone service", "No", "Yes"])
-    validator.expect_column_values_to_be_in_set("InternetService", ["DSL", "Fiber optic", "No"])
-    validator.expect_column_values_to_be_in_set("OnlineSecurity", ["No", "Yes", "No internet service"])
-    validator.expect_column_values_to_be_in_set("OnlineBackup", ["No", "Yes", "No internet service"])
-    validator.expect_column_values_to_be_in_set("DeviceProtection", ["No", "Yes", "No internet service"])
-    validator.expect_column_values_to_be_in_set("TechSupport", ["No", "Yes", "No internet service"])
-    validator.expect_column_values_to_be_in_set("StreamingTV", ["No", "Yes", "No internet service"])
-    validator.expect_column_values_to_be_in_set("StreamingMovies", ["No", "Yes", "No internet service"])
-    validator.expect_column_values_to_be_in_set("Contract", ["Month-to-month", "One year", "Two year"])
-    validator.expect_column_values_to_be_in_set("PaperlessBilling", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set(
-        "PaymentMethod",
-        ["Electronic check", "Mailed check", "Bank transfer (automatic)", "Credit card (automatic)"]
-    )
-    validator.expect_column_values_to_be_in_set("Churn", ["No", "Yes"])
-
-
-def add_local_expectations(validator):
-    validator.expect_table_row_count_to_be_between(min_value=1, max_value=15000)
-    validator.expect_column_values_to_be_between("SeniorCitizen", min_value=0, max_value=1)
-    validator.expect_column_values_to_be_between("tenure", min_value=0, max_value=100)
-    validator.expect_column_values_to_be_between("Churn", min_value=0, max_value=1)
-    validator.expect_column_values_to_not_be_null("SeniorCitizen")
-    validator.expect_column_values_to_not_be_null("tenure")
-    validator.expect_column_values_to_not_be_null("Churn")
-    validator.expect_column_values_to_be_in_set("gender", ["Male", "Female"])
-    validator.expect_column_values_to_be_in_set("Partner", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set("Dependents", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set("PhoneService", ["Yes", "No"])
-    validator.expect_column_values_to_be_in_set("MultipleLines", ["Yes", "No", "No phone service"])
-    validator.expect_column_values_to_be_in_set("InternetService", ["DSL", "Fiber optic", "No"])
-    validator.expect_column_values_to_be_in_set("OnlineSecurity", ["Yes", "No", "No internet service"])
-    validator.expect_column_values_to_be_in_set("OnlineBackup", ["Yes", "No", "No internet service"])
+# Suites built in this process, one per source, shared by all files and threads.
+suites = {}
+
+
+def get_suite(source):
+    """
+    The source's expectation suite, built from the spec shared with validation_manual the
+    first time it is needed, and saved to the data context only when it differs from the
+    stored one. Validators are created with it, so expectations are not added (and
+    evaluated) one by one for every file.
+    """
+    from great_expectations.core.expectation_configuration import ExpectationConfiguration
+    from great_expectations.core.expectation_suite import ExpectationSuite
+    from great_expectations.data_context.types.resource_identifiers import ExpectationSuiteIdentifier
+
+    with context_lock:
+        if source not in suites:
+            context = get_context()
+            suite_name = SOURCE_SETTINGS[source][1]
+            suite = ExpectationSuite(expectation_suite_name=suite_name, data_context=context)
+            for expectation_type, kwargs in ge_expectations(get_spec(source)):
+                suite.add_expectation(ExpectationConfiguration(expectation_type=expectation_type, kwargs=kwargs))
+            try:
+                stored = context.get_expectation_suite(expectation_suite_name=suite_name)
+            except Exception:
+                stored = None
+            if stored is None or not suite.isEquivalentTo(stored):
+                context.save_expectation_suite(suite)
+                changed_resources.append(ExpectationSuiteIdentifier(expectation_suite_name=suite_name))
+            suites[source] = suite
+        return suites[source]
 
 
 # ------------------ UTILITY FUNCTION ------------------
 
 def get_latest_s3_object(base_prefix):
+    s3_client, s3_bucket_name, objects = get_recent_s3_objects(base_prefix, 1)
+    return s3_client, s3_bucket_name, objects[0][0]
+
+
+def get_recent_s3_objects(base_prefix, count=1):
     # Initialize S3 client
     s3_client, s3_bucket_name, contetnt_present_flag = connect_to_s3()
-    response = s3_client.list_objects_v2(Bucket=s3_bucket_name, Prefix=base_prefix)
-    objects = response.get("Contents", [])
+    objects = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=s3_bucket_name, Prefix=base_prefix):
+        objects.extend(page.get("Contents", []))
+    recent = sorted(objects, key=lambda x: x["LastModified"], reverse=True)[:count]
+    # (key, ETag) pairs; the ETag identifies the object version for the result cache
+    objects = [(obj["Key"], obj.get("ETag")) for obj in recent if not obj["Key"].endswith("/")]
     if not objects:
         raise ValueError(f"No objects found for prefix: {base_prefix}")
-    latest_obj = max(objects, key=lambda x: x["LastModified"])
-    return s3_bucket_name, latest_obj["Key"]
+    return s3_client, s3_bucket_name, objects
 
 
 # ------------------ VALIDATION FUNCTION ------------------
 
 def validate_latest_file(source):
-    logger.info(f"Starting GE validation with {source}")
-
-    if source == "kaggle":
-        base_prefix = "data/raw/kaggle/"
-        suite_name = "customer_churn_suite_kaggle"
-    elif source == "rds":
-        base_prefix = "data/raw/rds/"
-        suite_name = "customer_churn_suite_rds"
-    else:
+    if source not in SOURCE_SETTINGS:
         raise ValueError("Source must be 'kaggle' or 'rds'.")
+    s3_client, s3_bucket_name, key = get_latest_s3_object(SOURCE_SETTINGS[source][0])
+    results = validate_file(source, s3_client, s3_bucket_name, key)
+    update_data_docs()
+    return results
+
+
+def suite_hash(source):
+    sampling = sampling_plan.describe() if validation_mode == "sampled" else None
+    return expectation_hash(SOURCE_SETTINGS[source][1], get_spec(source), sampling)
 
-    s3_bucket_name, key = get_latest_s3_object(base_prefix)
+
+def validate_file(source, s3_client, s3_bucket_name, key, etag=None):
+    """
+    Validate one S3 object against the source's suite and return the validation result as
+    a JSON dict. An object version (ETag) already validated with the same suite is not
+    downloaded again: the cached result is returned unless FORCE_REVALIDATION is set.
+    In sampled mode a sample is validated first and the whole file only when the sample
+    cannot decide every expectation.
+    """
     s3_file_path = f"s3://{s3_bucket_name}/{key}"
-    logger.info(f"Latest {source} file: {s3_file_path}")
+    if etag is None:
+        etag = s3_client.head_object(Bucket=s3_bucket_name, Key=key).get("ETag")
+    expectations = suite_hash(source)
+    if not force_revalidation:
+        cached = validation_cache.get(key, etag, expectations)
+        if cached is not None:
+            logger.info(f"Reusing GE validation of {s3_file_path} from {cached['validated_at']}.")
+            return cached["result"]
+
+    logger.info(f"Starting GE validation with {source}")
+    logger.info(f"{source} file: {s3_file_path}")
+
+    results = None
+    if validation_mode == "sampled":
+        results = validate_sample(source, s3_client, s3_bucket_name, key)
+    if results is None:
+        # Parse once with the pinned source schema (multithreaded, categoricals for the
+        # Yes/No fields, blank TotalCharges as nulls) and hand GE the frame instead of a path.
+        s3_object = s3_client.get_object(Bucket=s3_bucket_name, Key=key)
+        results = run_suite(source, read_source_csv(s3_object["Body"].read(), source), key)
+    store_result(results)
+    result = results.to_json_dict()
+
+    validation_cache.put(key, etag, expectations, result)
+    logger.info(f"Validation complete for {source} dataset ({key}).")
+    return result
+
 
-    runtime_params = {"path": s3_file_path}
+def run_suite(source, data, key):
+    """
+    Validate a DataFrame with the source's suite and log the table summary. Returns the GE
+    validation result (not stored; see store_result).
+    """
+    from great_expectations.core.batch import RuntimeBatchRequest
+    from great_expectations.validator.metric_configuration import MetricConfiguration
 
-    logger.info(f"runtime_params: {runtime_params}")
+    runtime_params = {"batch_data": data}
 
-    if source == "kaggle":
-        runtime_params["reader_options"] = {"skipinitialspace": True}
+    logger.info(f"runtime_params: batch_data for {key}")
 
     logger.info("Setting batch_request")
 
@@ -143,63 +216,177 @@ def validate_latest_file(source):
         data_connector_name="default_runtime_data_connector_name",
         data_asset_name=f"customer_churn_dataset_{source}",
         runtime_parameters=runtime_params,
-        batch_identifiers={"default_identifier_name": "default_batch"}
+        batch_identifiers={"default_identifier_name": key}
     )
 
     logger.info(f"batch_request: {batch_request}")
 
-    context.create_expectation_suite(expectation_suite_name=suite_name, overwrite_existing=True)
-
-    validator = context.get_validator(
-        batch_request=batch_request,
-        expectation_suite_name=suite_name
-    )
-
-    columns_metric = MetricConfiguration(
-        metric_name="table.columns",
-        metric_domain_kwargs={},
-        metric_value_kwargs={}
-    )
-    actual_columns = validator.get_metric(metric=columns_metric)
-    logger.info(f"Detected columns in {source} data: {actual_columns}")
-
-    # Add core expectations
-    if source == "kaggle":
-        add_kaggle_expectations(validator)
-    else:
-        add_local_expectations(validator)
-
-    results = validator.validate()
-    logger.info(f"Validation results for {source} dataset:")
-    logger.info(results)
-
-    row_count_metric = MetricConfiguration(
-        metric_name="table.row_count",
-        metric_domain_kwargs={},
-        metric_value_kwargs={}
-    )
-    row_count = validator.get_metric(metric=row_count_metric)
+    suite = get_suite(source)
+    # All validators share the datasource's one execution engine, and metrics resolve
+    # against its active batch (the one loaded last), so everything from loading the batch
+    # to the last metric runs under the lock. Downloading and parsing stay concurrent.
+    with context_lock:
+        validator = get_context().get_validator(
+            batch_request=batch_request,
+            expectation_suite=suite
+        )
 
-    missing_counts = {}
-    for col in actual_columns:
-        missing_metric = MetricConfiguration(
-            metric_name="column_values.null.count",
-            metric_domain_kwargs={"column": col},
+        columns_metric = MetricConfiguration(
+            metric_name="table.columns",
+            metric_domain_kwargs={},
             metric_value_kwargs={}
         )
-        missing_counts[col] = validator.get_metric(metric=missing_metric)
+        actual_columns = validator.get_metric(metric=columns_metric)
+        logger.info(f"Detected columns in {source} data: {actual_columns}")
+
+        results = validator.validate()
+        logger.info(f"Validation results for {source} dataset:")
+        logger.info(results)
+
+        # Row count and per-column null counts resolved together in one metric graph
+        # instead of one get_metric call (and graph resolution) per column.
+        summary_metrics = {"table.row_count": MetricConfiguration(
+            metric_name="table.row_count",
+            metric_domain_kwargs={},
+            metric_value_kwargs={}
+        )}
+        for col in actual_columns:
+            summary_metrics[f"null_count.{col}"] = MetricConfiguration(
+                metric_name="column_values.null.count",
+                metric_domain_kwargs={"column": col},
+                metric_value_kwargs={}
+            )
+        summary = validator.get_metrics(metrics=summary_metrics)
+    row_count = summary["table.row_count"]
+    missing_counts = {col: summary[f"null_count.{col}"] for col in actual_columns}
 
     logger.info(f"Total row count: {row_count}")
     logger.info("Missing values per column:")
     for col, missing in missing_counts.items():
         logger.info(f"  {col}: {missing}")
+    return results
+
+
+def store_result(results):
+    """
+    Keep a validation result in the validations store and queue its Data Docs page.
+    """
+    from great_expectations.data_context.types.resource_identifiers import ValidationResultIdentifier
+
+    with context_lock:
+        identifier = ValidationResultIdentifier.from_object(results)
+        get_context().validations_store.set(identifier, results)
+        changed_resources.append(identifier)
+
+
+def ge_checks(result):
+    """
+    The expectation results of a GE validation result dict in the form
+    sampled_validation.assess_checks expects, with the number of rows each was checked on.
+    """
+    checks = []
+    for item in result["results"]:
+        config = item["expectation_config"]
+        details = item.get("result") or {}
+        expectation_type = config["expectation_type"]
+        check = {"expectation_type": expectation_type, "column": config["kwargs"].get("column"),
+                 "success": item["success"], "unexpected_count": details.get("unexpected_count"),
+                 "observed_value": details.get("observed_value")}
+        if "element_count" in details:
+            # Map expectations other than not-null skip missing values.
+            missing = 0 if expectation_type == "expect_column_values_to_not_be_null" else details.get("missing_count", 0)
+            check["element_count"] = details["element_count"] - (missing or 0)
+        checks.append(check)
+    return checks
+
+
+def validate_sample(source, s3_client, s3_bucket_name, key):
+    """
+    Validate a byte-range sample of the object with the suite and estimate each
+    expectation's failure rate for the whole file. Returns the GE result of the sample,
+    with the estimates and the verdict for the file under meta["sampling"] (success and
+    the per-expectation results stay those of the sample), or None when the file has to be
+    validated in full (too small to sample, or an estimate too close to its threshold).
+    """
+    sample, estimated_rows = sample_s3_csv(s3_client, s3_bucket_name, key, source, sampling_plan)
+    if sample is None:
+        return None
+    results = run_suite(source, sample, key)
+    assessments = assess_checks(ge_checks(results.to_json_dict()), len(sample), estimated_rows, sampling_plan,
+                                get_spec(source)["row_count"])
+    if needs_full_scan(assessments):
+        logger.info(f"Sample of {key} is inconclusive; validating the whole file.")
+        return None
+    results.meta["sampling"] = {**sampling_plan.describe(), "sample_rows": len(sample),
+                                "estimated_rows": estimated_rows, "assessments": assessments,
+                                "success": not any(entry["decision"] == "fail" for entry in assessments)}
+    return results
+
+
+def file_success(result):
+    """
+    Verdict for the file of a result dict: the sample-based estimate for sampled results,
+    GE's success otherwise.
+    """
+    return result.get("meta", {}).get("sampling", {}).get("success", result["success"])
+
+
+def _resource_entry(identifier):
+    from great_expectations.data_context.types.resource_identifiers import ExpectationSuiteIdentifier
+
+    kind = "suite" if isinstance(identifier, ExpectationSuiteIdentifier) else "validation"
+    return {"type": kind, "key": list(identifier.to_tuple())}
+
+
+def _resource_identifier(entry):
+    from great_expectations.data_context.types.resource_identifiers import (
+        ExpectationSuiteIdentifier,
+        ValidationResultIdentifier,
+    )
 
-    validator.save_expectation_suite(discard_failed_expectations=False)
-
-    # Build Data Docs and retrieve URLs
-    context.build_data_docs()
-    docs_urls = context.get_docs_sites_urls()
-    logger.info("Data Docs available at:")
+    identifier_class = ExpectationSuiteIdentifier if entry["type"] == "suite" else ValidationResultIdentifier
+    return identifier_class.from_tuple(tuple(entry["key"]))
+
+
+def load_pending_docs():
+    if not os.path.exists(pending_docs_path):
+        return []
+    with open(pending_docs_path, "r") as f:
+        return [_resource_identifier(entry) for entry in json.load(f)]
+
+
+def queue_data_docs():
+    """
+    Add the resources changed in this run to the pending list for a later docs build.
+    """
+    with context_lock:
+        entries = [_resource_entry(identifier) for identifier in load_pending_docs() + changed_resources]
+        unique = list({json.dumps(entry, sort_keys=True): entry for entry in entries}.values())
+        os.makedirs(os.path.dirname(pending_docs_path), exist_ok=True)
+        with open(pending_docs_path, "w") as f:
+            json.dump(unique, f)
+        changed_resources.clear()
+    logger.info(f"{len(unique)} Data Docs page(s) pending; build them with --build-docs.")
+
+
+def build_data_docs():
+    """
+    Build the Data Docs pages of the suites and validations changed in this run or
+    queued by earlier deferred runs, plus the site index. Pages of unchanged resources
+    are not rendered again, so the build does not grow with the validation history.
+    """
+    with context_lock:
+        resources = load_pending_docs() + changed_resources
+        if not resources:
+            logger.info("No changed suites or validations; Data Docs are up to date.")
+            return
+        context = get_context()
+        context.build_data_docs(resource_identifiers=resources)
+        changed_resources.clear()
+        if os.path.exists(pending_docs_path):
+            os.remove(pending_docs_path)
+        docs_urls = context.get_docs_sites_urls()
+    logger.info(f"Data Docs updated for {len(resources)} changed suite(s)/validation(s).")
 
     if isinstance(docs_urls, dict):
         url = docs_urls.get("site_url")
@@ -215,20 +402,56 @@ def validate_latest_file(source):
         logger.info("Unexpected format for docs URLs:", docs_urls)
         logger.info(f"Unexpected format for docs URLs: {docs_urls}")
 
-    logger.info(f"Validation complete for {source} dataset. Data quality report generated.")
-    logger.info(f"Validation for {source} dataset completed and Data Docs built.")
 
+def update_data_docs():
+    if data_docs_build == "deferred":
+        queue_data_docs()
+    else:
+        build_data_docs()
 
 
 # ------------------ MAIN FUNCTION ------------------
 
 def main():
-    for source in ["kaggle", "rds"]:
-        validate_latest_file(source)
+    """
+    Validate every source (and, with VALIDATION_BACKFILL > 1, its most recent files) in a
+    pool of VALIDATION_WORKERS threads (downloads and parsing overlap, GE runs one batch
+    at a time), then update Data Docs once
+    for what changed (or queue the update, see DATA_DOCS_BUILD).
+    Files whose result is cached (same ETag and suite) are not validated again.
+    Returns {source: {"validated": {key: success}, "failed": {key: error}}}.
+    """
+    outcome = {source: {"validated": {}, "failed": {}} for source in SOURCE_SETTINGS}
+    with ThreadPoolExecutor(max_workers=validation_workers) as executor:
+        futures = {}
+        for source, (base_prefix, _) in SOURCE_SETTINGS.items():
+            try:
+                s3_client, s3_bucket_name, objects = get_recent_s3_objects(base_prefix, validation_backfill)
+            except Exception as e:
+                logger.error(f"Could not list {source} files: {e}")
+                outcome[source]["failed"][base_prefix] = str(e)
+                continue
+            for key, etag in objects:
+                futures[(source, key)] = executor.submit(validate_file, source, s3_client, s3_bucket_name, key, etag)
+        for (source, key), future in futures.items():
+            try:
+                outcome[source]["validated"][key] = file_success(future.result())
+            except Exception as e:
+                logger.error(f"GE validation of {key} failed: {e}")
+                outcome[source]["failed"][key] = str(e)
+
+    if futures:
+        update_data_docs()
+    for source, result in outcome.items():
+        logger.info(f"{source}: {len(result['validated'])} file(s) validated, {len(result['failed'])} failed.")
+    return outcome
 
 
 if __name__ == "__main__":
-    main()
+    if "--build-docs" in sys.argv:
+        build_data_docs()
+    else:
+        main()
 
     # Run the bash script with the requirements file as an argument
     # subprocess.run(["bash", bash_script, requirements_file_without_GE])
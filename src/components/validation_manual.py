@@ -3,22 +3,59 @@ import yaml
 import boto3
 import pandas as pd
 from datetime import datetime
-from io import StringIO
 import sys
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import tempfile
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # ------------------ SETUP ------------------
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 sys.path.append(project_root)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 from logger import setup_logging
-from utils import connect_to_s3
+from utils import connect_to_s3, connect_to_rds, RDS_EXTRACT_COLUMNS
 from exception import CustomException
+from csv_reader import read_source_csv, iter_source_frames, table_to_frame, DEFAULT_BLOCK_SIZE
+from profiler import profile_frame, StreamingProfiler
+from expectation_spec import get_spec, profile_arguments, evaluate
+from sampled_validation import SamplingPlan, sample_s3_csv, assess_checks, needs_full_scan
+from sql_profiler import profile_table, table_columns
+from validation_cache import ValidationCache, expectation_hash
+from report_renderer import write_result, render_report, render_reports, pending_results
 
 # Setup logging
 logger = setup_logging("validation_manual")
 
+# "full" loads the latest file into memory; "streaming" validates it batch by batch with
+# bounded memory (exact counts, sketches for quantiles and cardinality of wide columns);
+# "sampled" validates byte-range samples of CSV files and falls back to a full scan when
+# an estimate is too close to its threshold (VALIDATION_SAMPLE_* settings, see SamplingPlan).
+validation_mode = os.getenv("VALIDATION_MODE", "full").lower()
+sampling_plan = SamplingPlan.from_env()
+# RDS_VALIDATION=pushdown validates the RDS customers table in Postgres with aggregate
+# queries instead of the CSV extract in S3; only the summary numbers leave the database.
+rds_validation = os.getenv("RDS_VALIDATION", "extract").lower()
+rds_table = os.getenv("RDS_TABLE", "customers")
+validation_block_size = int(os.getenv("VALIDATION_BLOCK_SIZE", str(DEFAULT_BLOCK_SIZE)))  # CSV bytes per batch
+validation_batch_rows = int(os.getenv("VALIDATION_BATCH_ROWS", "100000"))  # Parquet rows per batch
+# Files are validated concurrently by a bounded pool; VALIDATION_BACKFILL > 1 also
+# validates that many of the most recent files of each source instead of the latest only.
+validation_workers = int(os.getenv("VALIDATION_WORKERS", "4"))
+validation_backfill = int(os.getenv("VALIDATION_BACKFILL", "1"))
+# Results are cached per (object key, ETag, expectations); FORCE_REVALIDATION=true ignores the cache.
+force_revalidation = os.getenv("FORCE_REVALIDATION", "false").lower() in ("1", "true", "yes")
+validation_cache = ValidationCache(os.path.join(project_root, "..", "artifacts", "validation_cache", "manual"))
+# Validation writes a JSON result per file; PDF/HTML reports are rendered from it "batch"
+# (in a process pool once every file is validated), "inline" (inside each validation, as
+# before) or "deferred" (left to `python src/report_renderer.py`).
+report_rendering = os.getenv("REPORT_RENDERING", "batch").lower()
+report_formats = tuple(fmt.strip() for fmt in os.getenv("REPORT_FORMATS", "pdf").lower().split(",") if fmt.strip())
+report_dir = os.path.join(project_root, "..", "artifacts", "validation_reports")
+# Bump when the checks in build_validation_report change, so cached results are not reused.
+CHECKS_VERSION = 2
+
 # Load AWS credentials from YAML
 credentials_path = os.path.join(project_root, '..', "config", "credentials.yaml")
 with open(credentials_path, "r") as file:
@@ -27,97 +64,47 @@ with open(credentials_path, "r") as file:
 
 def generate_report(validation_details, resolution_details, source, file_name):
     """
-    Generate a PDF report with validation details and resolution suggestions.
-    The report is saved under artifacts/validation_reports.
+    Write the validation and resolution details as a compact JSON result under
+    artifacts/validation_reports and return its path. The PDF/HTML versions are rendered
+    from it according to REPORT_RENDERING, so validation does not wait on them unless
+    rendering is inline.
     """
     try:
-        report_dir = os.path.join(project_root, "..", "artifacts", "validation_reports")
-        os.makedirs(report_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        report_file_name = f"validation_report_{source}_{file_name}_{timestamp}.pdf"
-        report_path = os.path.join(report_dir, report_file_name)
-        c = canvas.Canvas(report_path, pagesize=letter)
-        width, height = letter
-        x_margin = 50
-        y = height - 50
-
-        # Title
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(x_margin, y, f"Validation Report for {source} - {file_name}")
-        y -= 30
-
-        # Validation Details Section
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(x_margin, y, "Issues:")
-        y -= 20
-        c.setFont("Helvetica", 10)
-        for key, value in validation_details.items():
-            if isinstance(value, dict):
-                for subkey, detail in value.items():
-                    line = f"{key} - {subkey}: {detail}"
-                    c.drawString(x_margin, y, line)
-                    y -= 15
-                    if y < 50:
-                        c.showPage()
-                        y = height - 50
-                        c.setFont("Helvetica", 10)
-            else:
-                line = f"{key}: {value}"
-                c.drawString(x_margin, y, line)
-                y -= 15
-                if y < 50:
-                    c.showPage()
-                    y = height - 50
-                    c.setFont("Helvetica", 10)
-
-        # Resolution Section
-        y -= 20
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(x_margin, y, "Resolutions:")
-        y -= 20
-        c.setFont("Helvetica", 10)
-        for key, value in resolution_details.items():
-            if isinstance(value, dict):
-                for subkey, res in value.items():
-                    line = f"{key} - {subkey}: {res}"
-                    c.drawString(x_margin, y, line)
-                    y -= 15
-                    if y < 50:
-                        c.showPage()
-                        y = height - 50
-                        c.setFont("Helvetica", 10)
-            else:
-                line = f"{key}: {value}"
-                c.drawString(x_margin, y, line)
-                y -= 15
-                if y < 50:
-                    c.showPage()
-                    y = height - 50
-                    c.setFont("Helvetica", 10)
-        c.save()
-        logger.info(f"Data quality report generated: {report_path}")
-        print(f"Validation report generated: {report_path}")
+        result_path = write_result(report_dir, source, file_name, validation_details, resolution_details)
+        if report_rendering == "inline":
+            for path in render_report(result_path, report_formats):
+                logger.info(f"Data quality report generated: {path}")
+        print(f"Validation result written: {result_path}")
+        return result_path
     except Exception as e:
         raise CustomException(e, sys)
 
 
-def generate_resolutions(validation_report):
+def generate_resolutions(validation_report, profile=None):
     """
     Generate resolution suggestions based on the validation report.
     Returns a dictionary with the same structure as validation_report.
+    With the column profile the report was built from, missing-data suggestions are
+    taken from the null counts instead of the report strings.
     """
     resolution_report = {}
     for key, value in validation_report.items():
         if key == "missing_data":
             # value is a dictionary per column
+            if profile is not None:
+                has_missing = {col: profile[col].null_count > 0 for col in value}
+            else:
+                has_missing = {col: text != "0 missing (0.00%)" for col, text in value.items()}
             resolution_report[key] = {
                 col: "Consider imputing missing values (mean/median/mode) or dropping rows if appropriate."
-                for col, _ in value.items() if _ != "0 missing (0.00%)"
+                for col in value if has_missing[col]
             }
             # For columns with no missing data, add a note.
-            for col, _ in value.items():
-                if _ == "0 missing (0.00%)":
+            for col in value:
+                if not has_missing[col]:
                     resolution_report[key][col] = "No action needed."
+        elif key == "sampling":
+            continue
         elif key == "duplicates":
             resolution_report[key] = "Consider removing duplicate rows based on 'customerID'."
         elif key == "outliers":
@@ -142,180 +129,357 @@ def generate_resolutions(validation_report):
     return resolution_report
 
 
-def validate_dataframe(data, source, file_name):
+def expected_validations(source):
+    """
+    Expected numeric ranges and categorical values for a source, taken from its spec in
+    expectation_spec (shared with the Great Expectations validator).
     """
-    Validate a DataFrame and record detailed metrics.
+    spec = get_spec(source)
+    return dict(spec["ranges"]), dict(spec["in_set"])
 
-    For 'local' data, expected validations are:
-      - Numeric: 'tenure' (range 0–100), 'Churn' (range 0–1)
-      - Categorical: 'gender' (["Male", "Female"]), 'PhoneService' (["Yes", "No"])
 
-    For 'kaggle' data, expected validations are:
-      - Numeric: 'tenure' (range 0–100), 'MonthlyCharges' (range 0–500), 'TotalCharges' (range 0–10000)
-      - Categorical: 'gender' (["Male", "Female"]), 'InternetService' (["DSL", "Fiber optic", "No"])
+def expectation_messages(checks, total_rows):
     """
-    try:
-        # Strip extra whitespace from column names
-        data.columns = data.columns.str.strip()
+    One line per evaluated expectation (expectation_spec.evaluate) for the report.
+    """
+    messages = {}
+    for check in checks:
+        label = check["expectation_type"] + (f" ({check['column']})" if check["column"] else "")
+        if check["success"]:
+            messages[label] = "passed"
+        elif check["observed_value"] is not None:
+            messages[label] = f"failed: observed {check['observed_value']}."
+        elif check["unexpected_count"] is None:
+            messages[label] = "failed: column not found."
+        else:
+            count = check["unexpected_count"]
+            messages[label] = f"failed: {count} unexpected values out of {total_rows} rows ({count / total_rows * 100:.2f}%)."
+    return messages
 
-        validation_report = {}
-        total_rows = len(data)
-
-        # --- Missing Data Check ---
-        missing_data = data.isnull().sum()
-        missing_info = {col: f"{cnt} missing ({cnt / total_rows * 100:.2f}%)" for col, cnt in missing_data.items()}
-        validation_report["missing_data"] = missing_info
-
-        # Define expected validations based on source
-        if source == "local":
-            expected_numeric = {"tenure": (0, 100), "Churn": (0, 1)}
-            expected_categorical = {"gender": ["Male", "Female"], "PhoneService": ["Yes", "No"]}
-        elif source == "kaggle":
-            expected_numeric = {"tenure": (0, 100), "MonthlyCharges": (0, 500), "TotalCharges": (0, 10000)}
-            expected_categorical = {"gender": ["Male", "Female"], "InternetService": ["DSL", "Fiber optic", "No"]}
+
+def sampled_expectation_messages(assessments, confidence):
+    """
+    One line per expectation assessed on a sample (sampled_validation.assess_checks).
+    """
+    messages = {}
+    for entry in assessments:
+        label = entry["expectation_type"] + (f" ({entry['column']})" if entry["column"] else "")
+        if entry["expectation_type"] == "expect_table_row_count_to_be_between":
+            detail = f"about {entry['estimate']} rows"
+        elif "ci_low" in entry:
+            detail = (f"estimated {entry['estimate'] * 100:.2f}% unexpected "
+                      f"({confidence:.0%} CI {entry['ci_low'] * 100:.2f}%-{entry['ci_high'] * 100:.2f}%)")
+        elif entry["unexpected_count"] is None:
+            detail = "column not found"
         else:
-            expected_numeric = {}
-            expected_categorical = {}
-
-        # --- Numeric Validations for expected columns ---
-        for col, exp_range in expected_numeric.items():
-            if col in data.columns:
-                data[col] = pd.to_numeric(data[col], errors="coerce")
-                valid_data = data[col].dropna()
-                if valid_data.nunique() <= 2:
-                    msg = "Binary column; outlier check not applicable."
-                else:
-                    out_of_range = valid_data[(valid_data < exp_range[0]) | (valid_data > exp_range[1])]
-                    msg = f"{len(out_of_range)} out of {total_rows} rows ({len(out_of_range) / total_rows * 100:.2f}%) are outside the expected range {exp_range}."
-                validation_report[col] = msg
-            else:
-                validation_report[col] = f"{col} column not found."
-
-        # --- Numeric Validations for additional numeric columns ---
-        numeric_blacklist = {"SeniorCitizen"}
-        additional_numeric = set(data.select_dtypes(include=["number"]).columns) - set(expected_numeric.keys()) - numeric_blacklist
-        for col in additional_numeric:
-            if data[col].nunique() >= 0.9 * total_rows:
-                validation_report[col] = f"High-cardinality numeric column; details omitted."
-                continue
-            col_numeric = pd.to_numeric(data[col], errors="coerce")
-            valid_data = col_numeric.dropna()
-            if valid_data.nunique() <= 2:
+            detail = f"{entry['unexpected_count']} unexpected values in the sample"
+        messages[label] = f"{entry['decision']}: {detail}."
+    return messages
+
+
+def outlier_message(profile, total_rows):
+    if profile.is_binary:
+        return "Binary column; outlier check not applicable."
+    count = profile.iqr_outliers
+    return f"{count} out of {total_rows} rows ({count / total_rows * 100:.2f}%) are outliers."
+
+
+def build_validation_report(profile, expected_numeric, expected_categorical):
+    """
+    Turn a column profile (profiler.profile_frame) into the validation report: missing
+    data, range and set checks for the expected columns, IQR outliers and value summaries
+    for the other columns, and duplicates on 'customerID'.
+    """
+    total_rows = profile.rows
+    validation_report = {}
+
+    # --- Missing Data Check ---
+    validation_report["missing_data"] = {
+        col: f"{p.null_count} missing ({p.null_count / total_rows * 100:.2f}%)" for col, p in profile.columns.items()
+    }
+
+    # --- Numeric Validations for expected columns ---
+    for col, exp_range in expected_numeric.items():
+        if col in profile:
+            p = profile[col]
+            if p.is_binary:
                 msg = "Binary column; outlier check not applicable."
             else:
-                Q1 = valid_data.quantile(0.25)
-                Q3 = valid_data.quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                outlier_count = valid_data[(valid_data < lower_bound) | (valid_data > upper_bound)].count()
-                msg = f"{outlier_count} out of {total_rows} rows ({outlier_count / total_rows * 100:.2f}%) are outliers."
+                msg = f"{p.out_of_range} out of {total_rows} rows ({p.out_of_range / total_rows * 100:.2f}%) are outside the expected range {exp_range}."
             validation_report[col] = msg
+        else:
+            validation_report[col] = f"{col} column not found."
 
-        # --- Categorical Validations for expected columns ---
-        for col, expected_vals in expected_categorical.items():
-            if col in data.columns:
-                invalid = data[~data[col].isin(expected_vals)]
-                count_invalid = len(invalid)
-                msg = f"{count_invalid} invalid values out of {total_rows} rows ({count_invalid / total_rows * 100:.2f}%)."
-                if count_invalid > 0:
-                    msg += f" Found: {invalid[col].unique().tolist()}."
-                else:
-                    msg += " (All values valid)"
-                validation_report[col] = msg
-            else:
-                validation_report[col] = f"{col} column not found."
-
-        # --- Additional Categorical Columns ---
-        blacklist = {"customerID"}
-        additional_categorical = set(data.select_dtypes(include=["object"]).columns) - set(expected_categorical.keys()) - blacklist
-        for col in additional_categorical:
-            unique_vals = data[col].unique()
-            if len(unique_vals) >= 0.9 * total_rows:
-                validation_report[col] = f"High-cardinality column with {len(unique_vals)} unique values; details omitted."
+    # --- Numeric Validations for additional numeric columns ---
+    numeric_blacklist = {"SeniorCitizen"}
+    additional_numeric = [col for col in profile.of_kind("numeric")
+                          if col not in expected_numeric and col not in numeric_blacklist]
+    for col in additional_numeric:
+        if profile[col].distinct >= 0.9 * total_rows:
+            validation_report[col] = f"High-cardinality numeric column; details omitted."
+        else:
+            validation_report[col] = outlier_message(profile[col], total_rows)
+
+    # --- Categorical Validations for expected columns ---
+    for col in expected_categorical:
+        if col in profile:
+            p = profile[col]
+            msg = f"{p.invalid_count} invalid values out of {total_rows} rows ({p.invalid_count / total_rows * 100:.2f}%)."
+            if p.invalid_count > 0:
+                msg += f" Found: {p.invalid_values}."
             else:
-                validation_report[col] = f"Unique values: {unique_vals.tolist()}"
+                msg += " (All values valid)"
+            validation_report[col] = msg
+        else:
+            validation_report[col] = f"{col} column not found."
 
-        # --- Duplicates Check (on 'customerID') ---
-        if "customerID" in data.columns:
-            dup_count = data.duplicated(subset=["customerID"]).sum()
-            validation_report["duplicates"] = f"{dup_count} duplicate rows found out of {total_rows} rows ({dup_count / total_rows * 100:.2f}%)."
+    # --- Additional Categorical Columns ---
+    blacklist = {"customerID"}
+    for col in profile.of_kind("text"):
+        if col in expected_categorical or col in blacklist:
+            continue
+        cardinality = profile[col].cardinality
+        if cardinality >= 0.9 * total_rows:
+            validation_report[col] = f"High-cardinality column with {cardinality} unique values; details omitted."
         else:
-            validation_report["duplicates"] = "customerID column not found."
-
-        # --- Outlier Detection for expected numeric columns ---
-        outliers_info = {}
-        for col in expected_numeric.keys():
-            if col in data.columns:
-                col_numeric = pd.to_numeric(data[col], errors="coerce")
-                if col_numeric.nunique() <= 2:
-                    outliers_info[col] = "Binary column; outlier check not applicable."
-                    continue
-                Q1 = col_numeric.quantile(0.25)
-                Q3 = col_numeric.quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                outlier_count = col_numeric[(col_numeric < lower_bound) | (col_numeric > upper_bound)].count()
-                outliers_info[col] = f"{outlier_count} out of {total_rows} rows ({outlier_count / total_rows * 100:.2f}%) are outliers."
-        for col in additional_numeric:
-            if col in validation_report and "High-cardinality" in validation_report[col]:
-                continue
-            col_numeric = pd.to_numeric(data[col], errors="coerce")
-            if col_numeric.nunique() <= 2:
-                outliers_info[col] = "Binary column; outlier check not applicable."
-                continue
-            Q1 = col_numeric.quantile(0.25)
-            Q3 = col_numeric.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            outlier_count = col_numeric[(col_numeric < lower_bound) | (col_numeric > upper_bound)].count()
-            outliers_info[col] = f"{outlier_count} out of {total_rows} rows ({outlier_count / total_rows * 100:.2f}%) are outliers."
-        validation_report["outliers"] = outliers_info
-
-        # Generate resolution suggestions based on the validation report
-        resolution_report = generate_resolutions(validation_report)
-
-        # Generate PDF report with both validation details and resolution suggestions
-        generate_report(validation_report, resolution_report, source, file_name)
-        return validation_report
+            validation_report[col] = f"Unique values: {profile[col].unique_values}"
+
+    # --- Duplicates Check (on 'customerID') ---
+    if "customerID" in profile:
+        # Rows beyond the first of each key, missing keys counted as one value (like duplicated()).
+        p = profile["customerID"]
+        dup_count = total_rows - p.distinct - (1 if p.null_count else 0)
+        validation_report["duplicates"] = f"{dup_count} duplicate rows found out of {total_rows} rows ({dup_count / total_rows * 100:.2f}%)."
+    else:
+        validation_report["duplicates"] = "customerID column not found."
+
+    # --- Outlier Detection for expected and additional numeric columns ---
+    outliers_info = {}
+    for col in expected_numeric:
+        if col in profile:
+            outliers_info[col] = outlier_message(profile[col], total_rows)
+    for col in additional_numeric:
+        if "High-cardinality" in validation_report[col]:
+            continue
+        outliers_info[col] = outlier_message(profile[col], total_rows)
+    validation_report["outliers"] = outliers_info
+    return validation_report
+
+
+def report_profile(profile, source, file_name, assessments=None, sampling=None):
+    """
+    Build the report of a profile and write its result. With assessments (a sampled
+    validation) the expectation lines carry the estimates for the whole file, and the
+    sampling details are added to the report.
+    """
+    expected_numeric, expected_categorical = expected_validations(source)
+    validation_report = build_validation_report(profile, expected_numeric, expected_categorical)
+    if assessments is None:
+        validation_report["expectations"] = expectation_messages(evaluate(get_spec(source), profile), profile.rows)
+    else:
+        validation_report["expectations"] = sampled_expectation_messages(assessments, sampling_plan.confidence)
+        validation_report["sampling"] = sampling
+
+    # Generate resolution suggestions based on the validation report
+    resolution_report = generate_resolutions(validation_report, profile)
+
+    # Write the result with both validation details and resolution suggestions
+    report_path = generate_report(validation_report, resolution_report, source, file_name)
+    return validation_report, report_path
+
+
+def validate_dataframe(data, source, file_name):
+    """
+    Validate a DataFrame and record detailed metrics (see expectation_spec for the
+    source-specific expectations). All statistics and expectation results come from a
+    single profiling pass.
+    Returns the validation report and the path of its JSON result.
+    """
+    try:
+        # Strip extra whitespace from column names
+        data.columns = data.columns.str.strip()
+
+        profile = profile_frame(data, **profile_arguments(get_spec(source)))
+        return report_profile(profile, source, file_name)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def validate_stream(frames, source, file_name):
+    """
+    validate_dataframe over an iterable of batches. Each batch updates mergeable
+    accumulators and is then dropped, so memory does not grow with the file. Counts,
+    min/max and range/set checks are exact; quartiles, outliers and cardinality are exact
+    for columns with few distinct values and sketched (t-digest, HyperLogLog) otherwise;
+    duplicate counts on customerID stay exact.
+    """
+    try:
+        spec = get_spec(source)
+        key_columns = list(dict.fromkeys(["customerID", *spec["unique"]]))
+        profiler = StreamingProfiler(**profile_arguments(spec), key_columns=key_columns)
+        for frame in frames:
+            frame.columns = frame.columns.str.strip()
+            profiler.update(frame)
+        return report_profile(profiler.result(), source, file_name)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def validate_sample(s3_client, bucket, source, key, file_name):
+    """
+    Validate a byte-range sample of a CSV object (see SamplingPlan). Returns None when the
+    object is too small to sample or an estimate is too close to its threshold to decide,
+    in which case the caller validates the whole file.
+    """
+    try:
+        sample, estimated_rows = sample_s3_csv(s3_client, bucket, key, source, sampling_plan)
+        if sample is None:
+            return None
+        sample.columns = sample.columns.str.strip()
+        spec = get_spec(source)
+        profile = profile_frame(sample, **profile_arguments(spec))
+        assessments = assess_checks(evaluate(spec, profile), profile.rows, estimated_rows, sampling_plan,
+                                    spec["row_count"])
+        if needs_full_scan(assessments):
+            undecided = [f"{a['expectation_type']} ({a['column']})" for a in assessments if a["decision"] == "escalate"]
+            logger.info(f"Sample of {file_name} is inconclusive for {undecided}; validating the whole file.")
+            return None
+        sampling = {**sampling_plan.describe(), "sample_rows": profile.rows, "estimated_rows": estimated_rows}
+        return report_profile(profile, source, file_name, assessments, sampling)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def validate_rds_table(table):
+    """
+    Validate the RDS table where it lives: the checks of validate_dataframe run as
+    aggregate SQL in Postgres (sql_profiler.profile_table) and their results feed the same
+    report. Table columns are named positionally as in the CSV extract (utils.write_csv).
+    """
+    try:
+        conn = connect_to_rds()
+        try:
+            names = [name for name, _ in table_columns(conn, table)]
+            columns = dict(zip(RDS_EXTRACT_COLUMNS, names))
+            profile = profile_table(conn, table, columns, **profile_arguments(get_spec("rds")))
+        finally:
+            conn.close()
+        return report_profile(profile, "rds", f"{table}_table")
     except Exception as e:
         raise CustomException(e, sys)
 
 
+def iter_s3_frames(s3_client, bucket, key, source):
+    """
+    Batches of an S3 object: CSV is parsed straight off the response stream; Parquet needs
+    random access, so it is spooled to a temporary file first and read one batch at a time.
+    """
+    if key.endswith(".parquet"):
+        with tempfile.TemporaryFile() as spool:
+            s3_client.download_fileobj(bucket, key, spool)
+            spool.seek(0)
+            for batch in pq.ParquetFile(spool).iter_batches(batch_size=validation_batch_rows):
+                yield table_to_frame(pa.Table.from_batches([batch]))
+    else:
+        body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+        yield from iter_source_frames(body, source, block_size=validation_block_size)
+
+
+def recent_s3_objects(s3_client, bucket, prefix, count=1):
+    """
+    (key, ETag) of the count most recently modified objects under prefix, newest first.
+    Folder markers among them are skipped.
+    """
+    objects = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        objects.extend(page.get("Contents", []))
+    recent = sorted(objects, key=lambda x: x["LastModified"], reverse=True)[:count]
+    return [(obj["Key"], obj.get("ETag")) for obj in recent if not obj["Key"].endswith("/")]
+
+
+def validate_s3_object(s3_client, bucket, source, key, etag=None):
+    """
+    Validate one object, or return the cached report when the same object version (ETag)
+    was already validated with the same expectations and mode.
+    """
+    expectations = expectation_hash(CHECKS_VERSION, get_spec(source), validation_mode,
+                                    sampling_plan.describe() if validation_mode == "sampled" else None)
+    if not force_revalidation:
+        cached = validation_cache.get(key, etag, expectations)
+        if cached is not None:
+            logger.info(f"Reusing validation of {key} from {cached['validated_at']}: {cached['report_path']}")
+            return cached["result"]
+
+    file_name = os.path.basename(key)
+    logger.info(f"Validating {source} file: {file_name} ({validation_mode} mode)")
+    sampled = None
+    if validation_mode == "sampled" and not key.endswith(".parquet"):
+        sampled = validate_sample(s3_client, bucket, source, key, file_name)
+    if sampled is not None:
+        report, report_path = sampled
+    elif validation_mode == "streaming":
+        report, report_path = validate_stream(iter_s3_frames(s3_client, bucket, key, source), source, file_name)
+    else:
+        content = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+        if key.endswith(".parquet"):
+            data = pd.read_parquet(BytesIO(content))
+        else:
+            data = read_source_csv(content, source)
+        report, report_path = validate_dataframe(data, source, file_name)
+    validation_cache.put(key, etag, expectations, report, report_path)
+    logger.info(f"Data quality report for {file_name} generated.")
+    return report
+
+
 def validate_s3_files():
     """
     For each source ('kaggle' and 'rds'), list objects in S3 under the given prefix,
-    select the latest file (by LastModified), download its content, read it into a DataFrame,
-    and validate it using source-specific expectations.
+    select the latest file (by LastModified) - or the VALIDATION_BACKFILL most recent
+    ones - and validate each with source-specific expectations. Files are downloaded,
+    checked and reported concurrently in a pool of VALIDATION_WORKERS threads, so the
+    run takes as long as the slowest file rather than the sum. With RDS_VALIDATION=pushdown
+    the RDS table is validated in Postgres instead of its extract.
+
+    Returns {source: {"validated": {key: report}, "failed": {key: error}}}; one failing
+    file does not stop the others. With REPORT_RENDERING=batch the PDF/HTML reports not
+    rendered yet are rendered afterwards in a process pool.
     """
     try:
         s3_client, s3_bucket_name, content_present_flag = connect_to_s3()
         prefixes = {"kaggle": "data/raw/kaggle/", "rds": "data/raw/rds/"}
 
+        targets = []
+        results = {source: {"validated": {}, "failed": {}} for source in prefixes}
+        if rds_validation == "pushdown":
+            # Validated in the database below, no extract to list or download.
+            prefixes.pop("rds")
         for source, prefix in prefixes.items():
             logger.info(f"Listing objects for prefix: {prefix}")
-            response = s3_client.list_objects_v2(Bucket=s3_bucket_name, Prefix=prefix)
-            objects = response.get("Contents", [])
-            if objects:
-                latest_obj = max(objects, key=lambda x: x["LastModified"])
-                key = latest_obj["Key"]
-                if key.endswith("/"):
-                    logger.info(f"Latest key for {source} is a folder. Skipping.")
-                    continue
+            objects = recent_s3_objects(s3_client, s3_bucket_name, prefix, validation_backfill)
+            if not objects:
+                logger.info(f"No files to validate for prefix: {prefix}")
+            targets.extend((source, key, etag) for key, etag in objects)
+
+        with ThreadPoolExecutor(max_workers=validation_workers) as executor:
+            futures = {(source, key): executor.submit(validate_s3_object, s3_client, s3_bucket_name, source, key, etag)
+                       for source, key, etag in targets}
+            if rds_validation == "pushdown":
+                futures[("rds", f"rds:{rds_table}")] = executor.submit(
+                    lambda: validate_rds_table(rds_table)[0])
+            for (source, key), future in futures.items():
                 try:
-                    s3_object = s3_client.get_object(Bucket=s3_bucket_name, Key=key)
-                    file_content = s3_object["Body"].read().decode("utf-8")
-                    data = pd.read_csv(StringIO(file_content))
-                    file_name = os.path.basename(key)
-                    logger.info(f"Validating latest {source} file: {file_name}")
-                    validate_dataframe(data, source, file_name)
-                    logger.info(f"Data quality report for {file_name} generated.")
+                    results[source]["validated"][key] = future.result()
                 except Exception as e:
                     logger.error(f"Error processing {key}: {str(e)}")
-            else:
-                logger.info(f"No objects found for prefix: {prefix}")
+                    results[source]["failed"][key] = str(e)
+
+        for source, outcome in results.items():
+            logger.info(f"{source}: {len(outcome['validated'])} file(s) validated, {len(outcome['failed'])} failed.")
+
+        if report_rendering == "batch":
+            # The validation threads are done, so worker processes can be forked safely.
+            render_reports(pending_results(report_dir, report_formats), report_formats)
+        return results
     except Exception as e:
         raise CustomException(e, sys)
 
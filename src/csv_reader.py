@@ -0,0 +1,274 @@
+import io
+import csv
+import sys
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from exception import CustomException
+from logger import logging
+from arrow_ops import coerce_numeric
+
+# Column kinds a schema can pin. Categorical kinds are read as Arrow dictionaries and
+# arrive in pandas as category columns; "numeric" columns tolerate dirty values (e.g. the
+# blank TotalCharges strings in the Kaggle file) and are coerced to float with nulls.
+COLUMN_TYPES = {
+    "string": pa.string(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+    "yes_no": pa.dictionary(pa.int32(), pa.string()),
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "numeric": pa.string(),
+}
+NUMERIC_KINDS = ("int", "float", "numeric")
+DEFAULT_BLOCK_SIZE = 16 << 20  # bytes of CSV per streamed batch
+
+TELCO_SERVICE_COLUMNS = {
+    "gender": "category", "SeniorCitizen": "int", "Partner": "yes_no", "Dependents": "yes_no",
+    "tenure": "int", "PhoneService": "yes_no", "MultipleLines": "category", "InternetService": "category",
+    "OnlineSecurity": "category", "OnlineBackup": "category",
+}
+
+SOURCE_SCHEMAS = {
+    # Kaggle Telco churn export
+    "kaggle": {
+        "customerID": "string", **TELCO_SERVICE_COLUMNS,
+        "DeviceProtection": "category", "TechSupport": "category", "StreamingTV": "category",
+        "StreamingMovies": "category", "Contract": "category", "PaperlessBilling": "yes_no",
+        "PaymentMethod": "category", "MonthlyCharges": "float", "TotalCharges": "numeric", "Churn": "category",
+    },
+    # RDS extract written by utils.write_csv (Churn is 0/1 there)
+    "rds": {"customerID": "string", **TELCO_SERVICE_COLUMNS, "Churn": "int"},
+    # Seed file loaded into the RDS customers table by setup_rds.py, in table column order
+    "rds_seed": {
+        "customer_id": "string", "age": "int", "city": "category", "zip_code": "string",
+        "latitude": "float", "longitude": "float", "number_of_referrals": "int", "offer": "category",
+        "avg_monthly_long_distance_charges": "float", "avg_monthly_gb_download": "float",
+        "streaming_music": "yes_no", "unlimited_data": "yes_no", "total_refunds": "float",
+        "total_extra_data_charges": "float", "total_long_distance_charges": "float", "total_revenue": "float",
+    },
+}
+# Merged file written by the merger: Kaggle's columns after imputation (numerics come out
+# of IterativeImputer as floats, SeniorCitizen as Yes/No).
+SOURCE_SCHEMAS["merged"] = {**SOURCE_SCHEMAS["kaggle"], "SeniorCitizen": "yes_no", "tenure": "numeric",
+                            "MonthlyCharges": "numeric", "TotalCharges": "numeric"}
+# The validators and the merger call the RDS extract "local" as well.
+SOURCE_SCHEMAS["local"] = SOURCE_SCHEMAS["rds"]
+# Exports that pad fields after the delimiter (", Male"); their text values are trimmed
+# as pd.read_csv(skipinitialspace=True) did.
+PADDED_SOURCES = ("kaggle",)
+
+
+def _as_buffer(source):
+    if isinstance(source, (bytes, bytearray)):
+        return pa.BufferReader(bytes(source))
+    if isinstance(source, str):
+        return source
+    return pa.BufferReader(source.read())
+
+
+def _parse_header(first_line):
+    return next(csv.reader(io.StringIO(first_line.decode("utf-8").rstrip("\r"))), [])
+
+
+def _header(source):
+    if isinstance(source, str):
+        with open(source, newline="") as f:
+            return next(csv.reader(f), [])
+    first_line = source.read_buffer(64 * 1024).to_pybytes().split(b"\n", 1)[0]
+    source.seek(0)
+    return _parse_header(first_line)
+
+
+class _PrefixedStream(io.RawIOBase):
+    '''
+    A forward-only stream with the bytes already read from it put back in front.
+    '''
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.prefix:
+            n = min(len(buffer), len(self.prefix))
+            buffer[:n] = self.prefix[:n]
+            self.prefix = self.prefix[n:]
+            return n
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _peek_header(stream):
+    '''
+    Header row of a stream that cannot seek (e.g. an S3 object body), and a stream that
+    still starts with it.
+    '''
+    head = b""
+    while b"\n" not in head:
+        chunk = stream.read(64 * 1024)
+        if not chunk:
+            break
+        head += chunk
+    return _parse_header(head.split(b"\n", 1)[0]), io.BufferedReader(_PrefixedStream(head, stream))
+
+
+def _trim_strings(table):
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            column = pc.dictionary_encode(pc.utf8_trim_whitespace(table.column(i).cast(pa.string())))
+        elif pa.types.is_string(field.type):
+            column = pc.utf8_trim_whitespace(table.column(i))
+        else:
+            continue
+        table = table.set_column(i, field.name, column)
+    return table
+
+
+def _read(source, read_options, convert_options, max_rows):
+    if max_rows is None:
+        return pacsv.read_csv(source, read_options=read_options, convert_options=convert_options)
+    batches, rows = [], 0
+    with pacsv.open_csv(source, read_options=read_options, convert_options=convert_options) as reader:
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= max_rows:
+                break
+        return pa.Table.from_batches(batches, schema=reader.schema).slice(0, max_rows)
+
+
+def read_source_table(source, schema_name, columns=None, max_rows=None, positional=False):
+    '''
+    Read a CSV (path, bytes or file object) with the pinned schema of one source into a
+    pyarrow Table using the multithreaded Arrow parser.
+
+    columns projects the read to the columns a stage needs (others are never parsed);
+    columns outside the schema keep Arrow's type inference. With positional=True the
+    file's header row is skipped and the schema's names are used in order; otherwise the
+    header's names are used with surrounding spaces stripped. max_rows stops reading after
+    that many rows. Text values of PADDED_SOURCES are trimmed.
+
+    Numeric columns that fail to parse (stray text in a numeric field) are re-read as
+    text and coerced, so dirty values become nulls instead of failing the stage.
+    '''
+    try:
+        schema = SOURCE_SCHEMAS[schema_name]
+        source = _as_buffer(source)
+        # The header row is replaced by explicit names, so projection and types work on
+        # the stripped names whatever padding the file has.
+        names = list(schema) if positional else [name.strip() for name in _header(source)]
+        read_options = pacsv.ReadOptions(use_threads=True, column_names=names, skip_rows=1)
+        wanted = [c for c in (columns or names) if c in names]
+        types = {c: COLUMN_TYPES[schema[c]] for c in wanted if c in schema}
+
+        def convert(column_types):
+            return pacsv.ConvertOptions(column_types=column_types, include_columns=wanted, strings_can_be_null=True)
+
+        try:
+            table = _read(source, read_options, convert(types), max_rows)
+            dirty = [c for c in wanted if schema.get(c) == "numeric"]
+        except pa.ArrowInvalid as e:
+            logging.info(f"Strict read of {schema_name} failed ({e}); re-reading numeric columns as text.")
+            if not isinstance(source, str):
+                source.seek(0)
+            dirty = [c for c in wanted if schema.get(c) in NUMERIC_KINDS]
+            table = _read(source, read_options, convert({**types, **{c: pa.string() for c in dirty}}), max_rows)
+
+        if schema_name in PADDED_SOURCES:
+            table = _trim_strings(table)
+        for col in dirty:
+            if col not in table.column_names:
+                continue
+            coerced = coerce_numeric(table[col])
+            if coerced.null_count == len(coerced) and table[col].null_count < len(coerced):
+                # Nothing parsed: the source changed what it stores here, keep the text.
+                logging.info(f"Column {col} of {schema_name} is not numeric in this file; kept as text.")
+                continue
+            if schema[col] == "int" and coerced.null_count == table[col].null_count:
+                coerced = coerced.cast(pa.int64())
+            table = table.set_column(table.column_names.index(col), col, coerced)
+        return table
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def table_to_frame(table):
+    '''
+    Table to pandas with dictionary columns as categoricals. Categories are sorted, as
+    astype("category") on the object columns pd.read_csv used to return would sort them,
+    so category codes downstream do not depend on the order values appear in the file.
+    '''
+    df = table.to_pandas()
+    for col in df.select_dtypes(include=["category"]).columns:
+        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def read_source_csv(source, schema_name, columns=None, max_rows=None, positional=False):
+    '''
+    read_source_table as a pandas DataFrame (see table_to_frame); integer columns with gaps
+    become float64 as with pd.read_csv.
+    '''
+    df = table_to_frame(read_source_table(source, schema_name, columns=columns, max_rows=max_rows,
+                                          positional=positional))
+    logging.info(f"Read {len(df)} rows x {len(df.columns)} columns with the '{schema_name}' schema.")
+    return df
+
+
+def iter_source_frames(source, schema_name, columns=None, block_size=DEFAULT_BLOCK_SIZE):
+    '''
+    Stream a CSV (path, bytes or a readable stream such as an S3 object body) as pandas
+    frames of about block_size bytes of input each, with the source's pinned schema and
+    optional column projection. Header names are stripped as in read_source_table. A
+    stream cannot be re-read, so pinned numeric columns are always parsed as text and
+    coerced per batch (dirty values become nulls).
+    '''
+    try:
+        schema = SOURCE_SCHEMAS[schema_name]
+        types = {c: pa.string() if kind in NUMERIC_KINDS else COLUMN_TYPES[kind] for c, kind in schema.items()}
+        if isinstance(source, (bytes, bytearray)):
+            source = pa.BufferReader(bytes(source))
+        if isinstance(source, (str, pa.NativeFile)):
+            header = _header(source)
+        else:
+            header, source = _peek_header(source)
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=block_size, skip_rows=1,
+                                         column_names=[name.strip() for name in header])
+        convert_options = pacsv.ConvertOptions(column_types=types, include_columns=list(columns or []),
+                                               strings_can_be_null=True)
+        with pacsv.open_csv(source, read_options=read_options, convert_options=convert_options) as reader:
+            for batch in reader:
+                table = pa.Table.from_batches([batch])
+                if schema_name in PADDED_SOURCES:
+                    table = _trim_strings(table)
+                for col in table.column_names:
+                    if schema.get(col) in NUMERIC_KINDS:
+                        coerced = coerce_numeric(table[col])
+                        if schema[col] == "int" and coerced.null_count == table[col].null_count:
+                            coerced = coerced.cast(pa.int64())
+                        table = table.set_column(table.column_names.index(col), col, coerced)
+                yield table_to_frame(table)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def concat_source_frames(frames):
+    '''
+    Concatenate frames streamed by iter_source_frames into the frame read_source_csv
+    returns: categorical columns keep the sorted union of the batches' categories instead
+    of falling back to object, and integer columns become float64 only if a batch had gaps.
+    '''
+    frames = list(frames)
+    if not frames:
+        return pd.DataFrame()
+    dtypes = {}
+    for col in frames[0].select_dtypes(include=["category"]).columns:
+        categories = sorted(set().union(*(frame[col].cat.categories for frame in frames)))
+        dtypes[col] = pd.CategoricalDtype(categories)
+    return pd.concat([frame.astype(dtypes) for frame in frames], ignore_index=True)
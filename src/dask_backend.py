@@ -0,0 +1,371 @@
+import os
+import sys
+import socket
+import numpy as np
+import pandas as pd
+import dask
+import dask.dataframe as dd
+
+from exception import CustomException
+from logger import logging
+from preprocessing import PreprocessingArtifact, transform_with_artifact
+from sparse_encoding import collapse_sparse_columns
+from streaming_stats import PreparationStats, WelfordAccumulator, scaler_from_moments
+from feature_engine import evaluate_features
+from parquet_writer import write_partitioned_dataset
+from sketches import TDigest
+
+DEFAULT_BLOCKSIZE = "64MB"
+# Numeric columns with at most this many distinct values get their medians from value
+# counts; wider (continuous) columns switch to a t-digest so the state stays bounded, and
+# their exact medians come from a selection pass over about this many values around it.
+MEDIAN_EXACT_VALUES = 10000
+
+
+def _is_local_host(host):
+    if host in ("localhost", "127.0.0.1", "::1", "0.0.0.0", None):
+        return True
+    names = {socket.gethostname(), socket.getfqdn()}
+    try:
+        names.add(socket.gethostbyname(socket.gethostname()))
+    except OSError:
+        pass
+    return host in names
+
+
+def get_client(scheduler_address=None):
+    '''
+    A dask.distributed Client when a scheduler address is given, otherwise None and the
+    local multi-process scheduler is used.
+
+    Input and output are staged on the driver's disk (the downloaded CSV, the Parquet
+    parts uploaded afterwards), so every worker has to run on this machine; a cluster with
+    workers elsewhere is rejected instead of silently reading and writing the wrong disks.
+    '''
+    if not scheduler_address:
+        return None
+    from urllib.parse import urlparse
+    from dask.distributed import Client  # optional: only needed for a scheduler process
+
+    client = Client(scheduler_address)
+    workers = client.scheduler_info().get("workers", {})
+    remote = [address for address in workers if not address.startswith("inproc://")
+              and not _is_local_host(urlparse(address).hostname)]
+    if remote:
+        client.close()
+        raise ValueError(f"Dask workers {remote} are not on this machine; the Dask backend stages its "
+                         f"input and output on the local disk and needs a local scheduler.")
+    logging.info(f"Connected to Dask scheduler {scheduler_address}: {client}")
+    return client
+
+
+def compute(*collections, client=None, num_workers=None):
+    if client is not None:
+        return client.compute(list(collections), sync=True)
+    return dask.compute(*collections, scheduler="processes", num_workers=num_workers)
+
+
+def broadcast(value, client=None):
+    '''
+    Ship a (large) object to every worker once instead of once per task.
+    '''
+    if client is None:
+        return value
+    return client.scatter(value, broadcast=True)
+
+
+def read_csv_partitions(paths, blocksize=None, assume_missing=False):
+    # Keep object columns as object so dtype-based column selection is the same as in
+    # pandas; scoped to the read so importing this module changes no global config.
+    with dask.config.set({"dataframe.convert-string": False}):
+        return dd.read_csv(paths, blocksize=blocksize or DEFAULT_BLOCKSIZE, assume_missing=assume_missing)
+
+
+class MedianSketch:
+    '''
+    Mergeable per-column median state: exact value counts while a column has at most
+    max_exact distinct values (flags, tenure), a TDigest once it has more (MonthlyCharges,
+    TotalCharges), so what travels up the reduction tree is bounded per column. The
+    medians of TDigest columns are exact once select_medians has run.
+    '''
+
+    def __init__(self, columns, max_exact=MEDIAN_EXACT_VALUES):
+        self.columns = list(columns)
+        self.max_exact = max_exact
+        self.counts = {col: pd.Series(dtype=np.int64) for col in self.columns}
+        self.digests = {}
+        self.selected = {}
+
+    def _to_digest(self, col):
+        counts = self.counts.pop(col)
+        self.digests[col] = TDigest().update(counts.index.to_numpy(dtype=np.float64), counts.to_numpy())
+
+    def update(self, batch):
+        for col in self.columns:
+            if col in self.digests:
+                self.digests[col].update(batch[col].to_numpy(dtype=np.float64, na_value=np.nan))
+                continue
+            self.counts[col] = self.counts[col].add(batch[col].value_counts(dropna=True), fill_value=0)
+            if len(self.counts[col]) > self.max_exact:
+                self._to_digest(col)
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            if col in other.digests and col not in self.digests:
+                self._to_digest(col)
+            if col in self.digests:
+                if col in other.digests:
+                    self.digests[col].merge(other.digests[col])
+                else:
+                    counts = other.counts[col]
+                    self.digests[col].update(counts.index.to_numpy(dtype=np.float64), counts.to_numpy())
+                continue
+            self.counts[col] = self.counts[col].add(other.counts[col], fill_value=0)
+            if len(self.counts[col]) > self.max_exact:
+                self._to_digest(col)
+        return self
+
+    def median(self, col):
+        if col in self.selected:
+            return self.selected[col]
+        if col in self.digests:
+            raise ValueError(f"The median of {col} needs the selection pass (select_medians).")
+        return median_from_counts(self.counts[col])
+
+
+class GlobalStats:
+    '''
+    PreparationStats plus the numeric median state (MedianSketch). Partial stats from each
+    partition are merged in a tree reduction.
+    '''
+
+    def __init__(self, stats, medians):
+        self.stats = stats
+        self.medians = medians
+
+    @classmethod
+    def from_partition(cls, partition, template):
+        stats = PreparationStats(template.base_cols, template.numeric_cols, template.categorical_cols)
+        medians = MedianSketch(template.numeric_cols)
+        return cls(stats.update(partition), medians.update(partition))
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.medians.merge(other.medians)
+        return self
+
+
+def _merge_stats(parts):
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    return merged
+
+
+def _tree_reduce(partials, merge, client=None, num_workers=None):
+    while len(partials) > 1:
+        partials = [dask.delayed(merge)(partials[i:i + 8]) for i in range(0, len(partials), 8)]
+    (result,) = compute(partials[0], client=client, num_workers=num_workers)
+    return result
+
+
+def collect_global_stats(ddf, client=None, num_workers=None):
+    '''
+    One pass over all partitions: counts/means/M2, category counts and numeric medians,
+    then a selection pass for the exact medians of the wide numeric columns.
+    '''
+    try:
+        template = PreparationStats.for_frame(ddf._meta)
+        partials = [dask.delayed(GlobalStats.from_partition)(part, template) for part in ddf.to_delayed()]
+        result = _tree_reduce(partials, _merge_stats, client=client, num_workers=num_workers)
+        select_medians(ddf, result.medians, client=client, num_workers=num_workers)
+        logging.info(f"Global stats over {result.stats.rows} rows from {ddf.npartitions} partitions.")
+        return result
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _bracket_partition(partition, brackets):
+    selection = {}
+    for col, (low, high) in brackets.items():
+        values = partition[col]
+        selection[col] = (int((values < low).sum()), values[(values >= low) & (values <= high)].value_counts())
+    return selection
+
+
+def _merge_brackets(parts):
+    merged = parts[0]
+    for part in parts[1:]:
+        for col, (below, counts) in part.items():
+            merged[col] = (merged[col][0] + below, merged[col][1].add(counts, fill_value=0))
+    return merged
+
+
+def select_medians(ddf, sketch, client=None, num_workers=None):
+    '''
+    Exact medians of the columns the sketch holds as t-digests. The digest brackets the
+    two middle ranks with about max_exact values; one pass then counts the values below
+    the bracket and the distinct values inside it, which pins down the middle values. A
+    bracket that misses them is widened and the pass repeated (at worst up to the full
+    min/max range).
+    '''
+    pending = dict(sketch.digests)
+    spread = sketch.max_exact / 2
+    while pending:
+        brackets = {}
+        for col, digest in pending.items():
+            q = spread / max(digest.count, 1)
+            if q >= 0.5:
+                brackets[col] = (digest.min, digest.max)
+            else:
+                brackets[col] = (digest.quantile(0.5 - q), digest.quantile(0.5 + q))
+        partials = [dask.delayed(_bracket_partition)(part, brackets) for part in ddf.to_delayed()]
+        selection = _tree_reduce(partials, _merge_brackets, client=client, num_workers=num_workers)
+        for col, (below, counts) in selection.items():
+            n = int(round(pending[col].count))
+            lower_rank, upper_rank = (n - 1) // 2 - below, n // 2 - below
+            if lower_rank >= 0 and upper_rank < counts.sum():
+                counts = counts.sort_index()
+                sketch.selected[col] = _midpoint(_value_at_rank(counts, lower_rank), _value_at_rank(counts, upper_rank))
+                del pending[col]
+        spread *= 4
+    return sketch
+
+
+def _value_at_rank(sorted_counts, rank):
+    # Value at 0-based position rank of the sorted values the counts describe.
+    return sorted_counts.index[np.searchsorted(sorted_counts.to_numpy().cumsum(), rank + 1)]
+
+
+def _midpoint(lower, upper):
+    # Float columns average in their own dtype, as Series.median does; integers in float64.
+    if not isinstance(lower, np.floating):
+        lower, upper = np.float64(lower), np.float64(upper)
+    return (lower + upper) / 2
+
+
+def median_from_counts(counts):
+    '''
+    Exact median (same as Series.median) from value counts.
+    '''
+    if counts.empty:
+        return np.nan
+    counts = counts.sort_index()
+    n = int(counts.sum())
+    return _midpoint(_value_at_rank(counts, (n - 1) // 2), _value_at_rank(counts, n // 2))
+
+
+def artifact_from_global_stats(global_stats, sparse_threshold=None, dense_cols=()):
+    '''
+    Same artifact fit_preprocessor would learn on the whole frame: exact median fill values,
+    the scaler moments of the median-filled columns (observed values combined with the filled
+    gaps, which all sit at the median) and the category modes and vocabularies.
+    '''
+    try:
+        stats = global_stats.stats
+        acc = stats.numeric
+        fill_values = {col: global_stats.medians.median(col) for col in acc.columns}
+
+        filled = WelfordAccumulator(acc.columns)
+        filled._combine(acc.count, acc.mean, acc.m2)
+        missing = stats.rows - acc.count
+        medians = np.array([fill_values[c] for c in acc.columns], dtype=np.float64)
+        filled._combine(missing, np.nan_to_num(medians), np.zeros(len(acc.columns)))
+        scaler = scaler_from_moments(acc.columns, filled.mean, filled.m2 / max(stats.rows, 1), stats.rows)
+
+        for col in stats.categorical_cols:
+            fill_values[col] = stats.categorical.mode(col)
+        vocabularies = {col: sorted(stats.categorical.counts[col].index.tolist()) for col in stats.categorical_cols}
+        sparse_cols = []
+        if sparse_threshold:
+            sparse_cols = [c for c in stats.categorical_cols
+                           if len(vocabularies[c]) > sparse_threshold and c not in dense_cols]
+        artifact = PreprocessingArtifact(stats.base_cols, stats.numeric_cols, stats.categorical_cols,
+                                         fill_values, scaler, vocabularies, sparse_cols)
+        logging.info(f"Preprocessor built from distributed stats over {stats.rows} rows: "
+                     f"{len(artifact.output_columns)} output columns.")
+        return artifact
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _prepare_partition(partition, artifact):
+    out = collapse_sparse_columns(transform_with_artifact(partition, artifact), artifact)
+    # Same CSV text as the single-process write policy, which stores floats as float32.
+    return out.astype({c: np.float32 for c in out.columns if pd.api.types.is_float_dtype(out[c])})
+
+
+def prepare_partitions(ddf, artifact, client=None):
+    '''
+    Apply the (broadcast) artifact to every partition. Output columns and float widths are
+    those of the single-process path after the write policy and collapse_sparse_columns.
+    '''
+    # StandardScaler rejects empty input, so the meta is built from Dask's fake rows.
+    meta = _prepare_partition(ddf._meta_nonempty, artifact).iloc[:0]
+    return ddf.map_partitions(_prepare_partition, broadcast(artifact, client), meta=meta)
+
+
+def global_dtype_plan(ddf, exclude=(), client=None, num_workers=None):
+    '''
+    dtype_policy decisions taken once from global min/max, so every partition (and every
+    Parquet part written from it) gets the same schema. Object columns are left as is.
+    '''
+    numeric = [c for c in ddf.columns if c not in exclude and pd.api.types.is_numeric_dtype(ddf._meta[c])]
+    if not numeric:
+        return {}
+    lows, highs = compute(ddf[numeric].min(), ddf[numeric].max(), client=client, num_workers=num_workers)
+    plan = {}
+    for col in numeric:
+        if pd.api.types.is_float_dtype(ddf._meta[col]):
+            plan[col] = np.float32
+        elif lows[col] >= 0 and highs[col] <= 1:
+            plan[col] = np.uint8
+        else:
+            plan[col] = next(t for t in (np.int8, np.int16, np.int32, np.int64)
+                             if np.iinfo(t).min <= lows[col] and highs[col] <= np.iinfo(t).max)
+    return plan
+
+
+def _transform_partition(partition, plan, dtypes):
+    inputs = {c: t for c, t in dtypes.items() if c in partition.columns}
+    out, _ = evaluate_features(plan, partition.astype(inputs))
+    return out.astype(dtypes)
+
+
+def transform_partitions(ddf, plan, dtypes=None, client=None, num_workers=None):
+    '''
+    Evaluate the (broadcast) feature plan on every partition. Without dtypes, one extra
+    min/max pass over the transformed data decides the dtype policy for input and derived
+    columns alike, exactly as the single-process load/write policies would.
+    '''
+    if dtypes is None:
+        untyped = transform_partitions(ddf, plan, {}, client=client)
+        dtypes = global_dtype_plan(untyped, exclude=("customerid",), client=client, num_workers=num_workers)
+    meta = _transform_partition(ddf._meta_nonempty, plan, dtypes).iloc[:0]
+    return ddf.map_partitions(_transform_partition, broadcast(plan, client), dtypes, meta=meta)
+
+
+def _write_partition(partition, root, partition_col, bucket_fn, part, row_group_size, compression):
+    if partition.empty:
+        return 0
+    write_partitioned_dataset(partition, root, bucket_fn(partition["customerid"].to_numpy()), partition_col,
+                              row_group_size=row_group_size, compression=compression, part=part)
+    return len(partition)
+
+
+def write_partitions(ddf, root, partition_col, bucket_fn, row_group_size, compression, client=None, num_workers=None):
+    '''
+    Each Dask partition writes its own part-NNNNN.parquet into every bucket it touches.
+    Returns the list of written files.
+    '''
+    try:
+        tasks = [dask.delayed(_write_partition)(part, root, partition_col, bucket_fn, i, row_group_size, compression)
+                 for i, part in enumerate(ddf.to_delayed())]
+        rows = sum(compute(*tasks, client=client, num_workers=num_workers))
+        written = sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(root)
+                         for name in names if name.endswith(".parquet"))
+        logging.info(f"Dask wrote {rows} rows to {len(written)} Parquet parts under {root}.")
+        return written
+    except Exception as e:
+        raise CustomException(e, sys)
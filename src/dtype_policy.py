@@ -0,0 +1,67 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from exception import CustomException
+from logger import logging
+
+# Object columns with fewer distinct values than this share of rows become categoricals.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def memory_usage_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def is_flag_column(series):
+    '''
+    One-hot / yes-no flags: bool columns, or integer columns holding only 0 and 1.
+    '''
+    if pd.api.types.is_bool_dtype(series):
+        return True
+    if pd.api.types.is_integer_dtype(series):
+        return bool(series.isin([0, 1]).all())
+    return False
+
+
+def apply_dtype_policy(df, stage, exclude=()):
+    '''
+    Shrink a frame to the pipeline's dtype policy:
+      - flags (bool or 0/1 integers) -> uint8
+      - other integers               -> smallest integer type that holds them
+      - floats                       -> float32
+      - low-cardinality strings      -> category (high-cardinality ids stay object)
+    Columns listed in exclude are left alone. Logs a before/after memory report for the stage.
+    '''
+    try:
+        before = memory_usage_mb(df)
+        converted = {}
+        for col in df.columns:
+            if col in exclude:
+                continue
+            series = df[col]
+            if isinstance(series.dtype, pd.SparseDtype):
+                continue  # already compact; casting would densify it
+            if is_flag_column(series):
+                converted[col] = series.astype(np.uint8)
+            elif pd.api.types.is_integer_dtype(series):
+                converted[col] = pd.to_numeric(series, downcast="integer")
+            elif pd.api.types.is_float_dtype(series):
+                converted[col] = series.astype(np.float32)
+            elif pd.api.types.is_object_dtype(series):
+                if series.nunique(dropna=True) < CATEGORY_MAX_UNIQUE_RATIO * max(len(series), 1):
+                    converted[col] = series.astype("category")
+        if converted:
+            df = df.assign(**converted)
+        after = memory_usage_mb(df)
+        log_memory_report(stage, before, after, df.shape)
+        return df
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def log_memory_report(stage, before_mb, after_mb, shape):
+    ratio = before_mb / after_mb if after_mb else 0
+    logging.info(f"[memory] {stage}: {before_mb:.2f} MB -> {after_mb:.2f} MB "
+                 f"({ratio:.1f}x smaller) for frame of shape {shape}")
+    return {"stage": stage, "before_mb": before_mb, "after_mb": after_mb, "ratio": ratio}
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from exception import CustomException
+from logger import logging
+
+EDA_MODES = ("off", "sampled", "full")
+
+
+def is_binary(series):
+    return len(series.dropna().unique()) == 2
+
+
+def render_plot(kind, data, col, target_var, out_path):
+    '''
+    Render a single EDA plot to disk. Runs inside a worker process, so matplotlib and
+    seaborn are imported here with a non-interactive backend.
+    '''
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(6, 4))
+    if kind == "hist":
+        sns.histplot(data=data, x=col, hue=target_var, kde=True)
+        plt.title(f"Histogram of {col} by {target_var}")
+    elif kind == "box":
+        sns.boxplot(x=target_var, y=col, data=data)
+        plt.title(f"Box Plot of {col} by {target_var}")
+    else:
+        sns.countplot(data=data, x=col, hue=target_var)
+        plt.title(f"Count Plot of {col} by {target_var}")
+    plt.tight_layout()
+    plt.savefig(out_path)
+    plt.close()
+    return out_path
+
+
+def write_summary_statistics(data, out_path):
+    summary_stats = data.describe(include="all")
+    summary_stats.to_csv(out_path)
+    return out_path
+
+
+def plot_jobs(df, plots_dir, target_var="Churn"):
+    '''
+    Build one job per plot. Each job only carries the column it plots and the target,
+    so workers do not receive the whole frame.
+    '''
+    # Identify numeric columns (assume "SeniorCitizen" is already categorical)
+    num_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    if "SeniorCitizen" in num_columns:
+        num_columns.remove("SeniorCitizen")
+
+    jobs = []
+    for col in num_columns:
+        data = df[[col, target_var]]
+        if is_binary(df[col]):
+            jobs.append(("count", data, col, target_var, os.path.join(plots_dir, f"count_{col}.png")))
+        else:
+            jobs.append(("hist", data, col, target_var, os.path.join(plots_dir, f"hist_{col}.png")))
+            jobs.append(("box", data, col, target_var, os.path.join(plots_dir, f"box_{col}.png")))
+    return jobs
+
+
+def iter_chunks(df, chunk_size=100000):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def _update_reservoir(state, chunk, sample_size, rng):
+    '''
+    Vectorized Algorithm R step: the t-th row seen replaces a random slot with
+    probability sample_size / t. Returns the new (reservoir, rows_seen) state.
+    '''
+    reservoir, seen = state if state is not None else (chunk.iloc[:0], 0)
+    fill = min(sample_size - len(reservoir), len(chunk))
+    if fill > 0:
+        reservoir = pd.concat([reservoir, chunk.iloc[:fill]])
+    rest = chunk.iloc[fill:]
+    if len(rest):
+        positions = seen + fill + np.arange(1, len(rest) + 1)
+        slots = rng.integers(0, positions)
+        hit = np.nonzero(slots < sample_size)[0]
+        # When several rows land on the same slot the last one wins, as in the sequential algorithm.
+        hit_slots, last = np.unique(slots[hit][::-1], return_index=True)
+        hit_rows = hit[::-1][last]
+        take = np.arange(sample_size)
+        take[hit_slots] = sample_size + np.arange(len(hit_rows))
+        reservoir = pd.concat([reservoir, rest.iloc[hit_rows]]).iloc[take]
+    return reservoir, seen + len(chunk)
+
+
+def reservoir_sample(chunks, sample_size, seed=42, stratify_col=None):
+    '''
+    Draw a uniform sample of sample_size rows from a stream of DataFrame chunks in one pass.
+
+    With stratify_col set, a reservoir is kept per stratum and the final sample is
+    allocated proportionally to each stratum's share of the rows seen.
+    Returns (sample, population_rows).
+    '''
+    rng = np.random.default_rng(seed)
+    reservoirs = {}
+    population = 0
+    for chunk in chunks:
+        population += len(chunk)
+        groups = [(None, chunk)] if stratify_col is None else chunk.groupby(stratify_col, dropna=False, sort=False)
+        for stratum, group in groups:
+            reservoirs[stratum] = _update_reservoir(reservoirs.get(stratum), group, sample_size, rng)
+
+    if not reservoirs:
+        return pd.DataFrame(), 0
+    if stratify_col is None:
+        return reservoirs[None][0].reset_index(drop=True), population
+
+    # Largest remainder allocation so the strata add up to the requested size.
+    strata = list(reservoirs)
+    target = min(sample_size, population)
+    shares = np.array([reservoirs[s][1] for s in strata]) * target / population
+    alloc = np.floor(shares).astype(int)
+    alloc[np.argsort(shares - alloc)[::-1][:target - alloc.sum()]] += 1
+    parts = []
+    for stratum, n in zip(strata, alloc):
+        reservoir = reservoirs[stratum][0]
+        n = min(n, len(reservoir))
+        parts.append(reservoir.iloc[np.sort(rng.choice(len(reservoir), size=n, replace=False))])
+    return pd.concat(parts).reset_index(drop=True), population
+
+
+class EDARun:
+    '''
+    Handle for EDA work running in the background. Call wait() before the process exits.
+    '''
+
+    def __init__(self, plots_dir, executor, futures):
+        self.plots_dir = plots_dir
+        self.executor = executor
+        self.futures = futures
+
+    def wait(self):
+        failed = 0
+        for future in self.futures:
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                logging.error(f"EDA job failed: {e}")
+        self.executor.shutdown()
+        logging.info(f"EDA outputs saved in: {self.plots_dir} ({len(self.futures) - failed} ok, {failed} failed)")
+        return failed == 0
+
+
+def start_eda(df, eda_folder, mode="full", sample_size=100000, seed=42, stratify_col=None,
+              max_workers=None, target_var="Churn", sample_info=None):
+    '''
+    Submit summary statistics and plots to a process pool and return immediately.
+
+    mode="off" skips EDA, "sampled" renders on a reservoir sample of sample_size rows
+    (optionally stratified by stratify_col) and "full" uses every row. The sampling
+    parameters are written to sample_info.json next to the plots; callers that already
+    sampled df (e.g. while streaming) pass their own sample_info and mode="full".
+    Returns an EDARun handle, or None when EDA is off.
+    '''
+    try:
+        if mode not in EDA_MODES:
+            raise ValueError(f"EDA mode must be one of {EDA_MODES}.")
+        if mode == "off":
+            logging.info("EDA disabled, skipping plots and summary statistics.")
+            return None
+
+        eda_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        plots_dir = os.path.join(eda_folder, f"eda_plots_raw_{eda_timestamp}")
+        os.makedirs(plots_dir, exist_ok=True)
+
+        data = df
+        sample_info = sample_info or {"mode": mode, "population_rows": len(df), "sample_rows": len(df)}
+        if mode == "sampled":
+            data, population = reservoir_sample(iter_chunks(df), sample_size, seed=seed, stratify_col=stratify_col)
+            sample_info.update({"sample_rows": len(data), "requested_sample_size": sample_size,
+                                "seed": seed, "stratify_col": stratify_col, "population_rows": population})
+        with open(os.path.join(plots_dir, "sample_info.json"), "w") as f:
+            json.dump(sample_info, f, indent=4)
+        logging.info(f"Starting {mode} EDA on {len(data)} rows in the background.")
+
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        futures = [executor.submit(write_summary_statistics, data,
+                                   os.path.join(plots_dir, f"summary_statistics_{eda_timestamp}.csv"))]
+        for job in plot_jobs(data, plots_dir, target_var):
+            futures.append(executor.submit(render_plot, *job))
+        return EDARun(plots_dir, executor, futures)
+    except Exception as e:
+        raise CustomException(e, sys)
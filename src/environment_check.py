@@ -0,0 +1,157 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import subprocess
+from datetime import datetime
+from importlib import metadata
+
+from exception import CustomException
+from logger import logging
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+stamp_folder = os.path.join(repo_root, "artifacts", "environment")
+
+# ENVIRONMENT_CHECK decides what a component does about its requirements file at startup:
+#   check    compare the installed packages with the file once per environment and log
+#            what differs (default)
+#   strict   same, but refuse to start when something differs
+#   install  pip install the file when something differs, then check again
+#   off      skip the check
+ENVIRONMENT_CHECK_MODES = ("check", "strict", "install", "off")
+
+
+def _normalize(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirements(requirements_path):
+    '''
+    {normalized name: pinned version or None} of a pip requirements file. Only exact pins
+    (==) are compared by version; other specifiers only require the package.
+    '''
+    requirements = {}
+    with open(requirements_path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].split(";", 1)[0].strip()
+            if not line or line.startswith("-"):
+                continue
+            match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(\[[^\]]*\])?\s*(==\s*([^,\s]+))?", line)
+            if match:
+                requirements[_normalize(match.group(1))] = match.group(4)
+    return requirements
+
+
+def installed_packages():
+    installed = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            installed.setdefault(_normalize(name), dist.version)
+    return installed
+
+
+def check_requirements(requirements_path):
+    '''
+    Packages of the requirements file that are missing or installed at another version
+    than pinned: {name: {"required": version, "installed": version or None}}.
+    '''
+    installed = installed_packages()
+    mismatches = {}
+    for name, pinned in parse_requirements(requirements_path).items():
+        version = installed.get(name)
+        if version is None or (pinned is not None and version != pinned):
+            mismatches[name] = {"required": pinned, "installed": version}
+    return mismatches
+
+
+def environment_fingerprint(requirements_path):
+    '''
+    Changes when the requirements file, the interpreter or the installed packages change
+    (installing or removing a package touches its site-packages directory).
+    '''
+    digest = hashlib.sha256()
+    with open(requirements_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    for path in sys.path:
+        if os.path.basename(path) in ("site-packages", "dist-packages") and os.path.isdir(path):
+            digest.update(f"{path}:{os.stat(path).st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _stamp_path(requirements_path):
+    name = os.path.splitext(os.path.basename(requirements_path))[0]
+    return os.path.join(stamp_folder, f"{name}_{environment_fingerprint(requirements_path)}.json")
+
+
+def verify_environment(requirements_path, install=False):
+    '''
+    Check the environment against a requirements file, reusing the stamp of an earlier
+    check of the same file in the same, unchanged environment. With install=True a pip
+    install is run (once) when packages differ. Returns the mismatches.
+    '''
+    try:
+        stamp_path = _stamp_path(requirements_path)
+        if os.path.exists(stamp_path):
+            with open(stamp_path, "r") as f:
+                return json.load(f)["mismatches"]
+
+        mismatches = check_requirements(requirements_path)
+        if mismatches and install:
+            logging.info(f"{len(mismatches)} package(s) differ from {requirements_path}; installing it.")
+            subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True)
+            mismatches = check_requirements(requirements_path)
+            stamp_path = _stamp_path(requirements_path)
+
+        os.makedirs(stamp_folder, exist_ok=True)
+        with open(stamp_path, "w") as f:
+            json.dump({"requirements": requirements_path, "executable": sys.executable,
+                       "checked_at": datetime.now().isoformat(timespec="seconds"), "mismatches": mismatches}, f,
+                      indent=2)
+        logging.info(f"Checked the environment against {requirements_path}: {len(mismatches)} mismatch(es).")
+        return mismatches
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def ensure_environment(requirements_file, mode=None):
+    '''
+    Startup check of a component, replacing the pip install every run used to do. The
+    file is resolved against the repository root; mode defaults to ENVIRONMENT_CHECK.
+    After the first run in an environment this costs a stat of site-packages and the
+    hash of the requirements file.
+    '''
+    try:
+        mode = (mode or os.getenv("ENVIRONMENT_CHECK", "check")).lower()
+        if mode not in ENVIRONMENT_CHECK_MODES:
+            raise ValueError(f"ENVIRONMENT_CHECK must be one of {ENVIRONMENT_CHECK_MODES}, got {mode}.")
+        if mode == "off":
+            return {}
+        requirements_path = requirements_file if os.path.isabs(requirements_file) else os.path.join(
+            repo_root, requirements_file)
+        mismatches = verify_environment(requirements_path, install=mode == "install")
+        if mismatches:
+            names = sorted(mismatches)
+            summary = f"{len(names)} package(s) differ ({', '.join(names[:10])}{', ...' if len(names) > 10 else ''})"
+            if mode == "strict":
+                raise RuntimeError(f"Environment does not match {requirements_file}: {summary}")
+            logging.warning(f"Environment does not match {requirements_file}: {summary}")
+        return mismatches
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    # Check (or with --install, prepare) the environment once up front, e.g. when the
+    # image or virtualenv is built, so component startups find a stamp:
+    #   python src/environment_check.py [--install] requirements.txt [requirements_mlFlow.txt ...]
+    install = "--install" in sys.argv
+    files = [arg for arg in sys.argv[1:] if arg != "--install"] or ["requirements.txt"]
+    for requirements_file in files:
+        result = ensure_environment(requirements_file, "install" if install else "check")
+        print(f"{requirements_file}: {len(result)} mismatch(es)")
+        for name, entry in sorted(result.items()):
+            print(f"  {name}: required {entry['required'] or 'any'}, installed {entry['installed']}")
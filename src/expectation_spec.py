@@ -0,0 +1,130 @@
+import sys
+
+from exception import CustomException
+from logger import logging
+
+YES_NO = ["Yes", "No"]
+INTERNET_ADDON = ["No", "Yes", "No internet service"]
+
+# One declarative spec per source, shared by the manual and the Great Expectations
+# validators:
+#   row_count  (low, high) bounds on the number of rows
+#   ranges     {column: (low, high)}, inclusive, nulls ignored
+#   not_null   columns without missing values
+#   in_set     {column: allowed values}, nulls ignored
+#   unique     columns whose non-null values must not repeat
+EXPECTATION_SPECS = {
+    "kaggle": {
+        "row_count": (1, 15000),
+        "ranges": {"SeniorCitizen": (0, 1), "tenure": (0, 100), "MonthlyCharges": (0, 500),
+                   "TotalCharges": (0, 10000)},
+        "not_null": ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"],
+        "in_set": {
+            "gender": ["Male", "Female"], "Partner": YES_NO, "Dependents": YES_NO, "PhoneService": YES_NO,
+            "MultipleLines": ["No phone service", "No", "Yes"], "InternetService": ["DSL", "Fiber optic", "No"],
+            "OnlineSecurity": INTERNET_ADDON, "OnlineBackup": INTERNET_ADDON, "DeviceProtection": INTERNET_ADDON,
+            "TechSupport": INTERNET_ADDON, "StreamingTV": INTERNET_ADDON, "StreamingMovies": INTERNET_ADDON,
+            "Contract": ["Month-to-month", "One year", "Two year"], "PaperlessBilling": YES_NO,
+            "PaymentMethod": ["Electronic check", "Mailed check", "Bank transfer (automatic)",
+                              "Credit card (automatic)"],
+            "Churn": ["No", "Yes"],
+        },
+        "unique": ["customerID"],
+    },
+    # RDS extract (Churn is 0/1 there)
+    "rds": {
+        "row_count": (1, 15000),
+        "ranges": {"SeniorCitizen": (0, 1), "tenure": (0, 100), "Churn": (0, 1)},
+        "not_null": ["SeniorCitizen", "tenure", "Churn"],
+        "in_set": {
+            "gender": ["Male", "Female"], "Partner": YES_NO, "Dependents": YES_NO, "PhoneService": YES_NO,
+            "MultipleLines": ["Yes", "No", "No phone service"], "InternetService": ["DSL", "Fiber optic", "No"],
+            "OnlineSecurity": INTERNET_ADDON, "OnlineBackup": INTERNET_ADDON,
+        },
+        "unique": ["customerID"],
+    },
+}
+# The validators and the merger call the RDS extract "local" as well.
+EXPECTATION_SPECS["local"] = EXPECTATION_SPECS["rds"]
+
+EMPTY_SPEC = {"row_count": None, "ranges": {}, "not_null": [], "in_set": {}, "unique": []}
+
+
+def get_spec(source):
+    return EXPECTATION_SPECS.get(source, EMPTY_SPEC)
+
+
+def profile_arguments(spec):
+    '''
+    Keyword arguments for profiler.profile_frame (and StreamingProfiler) that make one
+    profiling pass compute everything evaluate() needs: range columns are profiled as
+    numeric with out-of-range counts and set columns get invalid counts. Streamed
+    profiles should also pass key_columns=spec["unique"] so duplicates stay exact.
+    '''
+    return {"numeric_columns": list(spec["ranges"]), "expected_ranges": dict(spec["ranges"]),
+            "expected_sets": dict(spec["in_set"])}
+
+
+def _result(expectation_type, column, success, unexpected_count=None, observed_value=None):
+    return {"expectation_type": expectation_type, "column": column, "success": bool(success),
+            "unexpected_count": unexpected_count, "observed_value": observed_value}
+
+
+def evaluate(spec, profile):
+    '''
+    Evaluate every expectation of spec against a DataProfile built with
+    profile_arguments(spec); no further pass over the data is made. Returns one dict per
+    expectation (expectation_type, column, success, unexpected_count, observed_value) in
+    spec order. Expectations on a missing column fail with unexpected_count None.
+    '''
+    try:
+        results = []
+        if spec["row_count"] is not None:
+            low, high = spec["row_count"]
+            results.append(_result("expect_table_row_count_to_be_between", None, low <= profile.rows <= high,
+                                   observed_value=profile.rows))
+
+        def add(expectation_type, column, count):
+            if column not in profile:
+                results.append(_result(expectation_type, column, False))
+            else:
+                unexpected = count(profile[column])
+                results.append(_result(expectation_type, column, unexpected == 0, unexpected))
+
+        for col in spec["ranges"]:
+            add("expect_column_values_to_be_between", col, lambda p: p.out_of_range)
+        for col in spec["not_null"]:
+            add("expect_column_values_to_not_be_null", col, lambda p: p.null_count)
+        for col in spec["in_set"]:
+            # invalid_count includes the nulls; in-set checks ignore them
+            add("expect_column_values_to_be_in_set", col, lambda p: p.invalid_count - p.null_count)
+        for col in spec["unique"]:
+            # rows repeating an earlier value
+            add("expect_column_values_to_be_unique", col, lambda p: p.valid_count - p.distinct)
+
+        failed = sum(1 for r in results if not r["success"])
+        logging.info(f"Evaluated {len(results)} expectations, {failed} failed.")
+        return results
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def ge_expectations(spec):
+    '''
+    The spec as (expectation_type, kwargs) pairs for Great Expectations, in evaluate() order.
+    '''
+    expectations = []
+    if spec["row_count"] is not None:
+        low, high = spec["row_count"]
+        expectations.append(("expect_table_row_count_to_be_between", {"min_value": low, "max_value": high}))
+    for col, (low, high) in spec["ranges"].items():
+        expectations.append(("expect_column_values_to_be_between",
+                             {"column": col, "min_value": low, "max_value": high}))
+    for col in spec["not_null"]:
+        expectations.append(("expect_column_values_to_not_be_null", {"column": col}))
+    for col, values in spec["in_set"].items():
+        expectations.append(("expect_column_values_to_be_in_set", {"column": col, "value_set": list(values)}))
+    for col in spec["unique"]:
+        expectations.append(("expect_column_values_to_be_unique", {"column": col}))
+    return expectations
+
@@ -0,0 +1,126 @@
+import ast
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from exception import CustomException
+from logger import logging
+
+try:
+    import numexpr as ne
+except ImportError:  # optional: plain NumPy evaluation is used without it
+    ne = None
+
+# Functions an expression may call besides its inputs.
+EXPRESSION_FUNCTIONS = {"where": np.where}
+
+
+def expression_names(expression):
+    '''
+    Column names referenced by an expression (function names excluded).
+    '''
+    tree = ast.parse(expression, mode="eval")
+    called = {node.func.id for node in ast.walk(tree) if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)}
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)} - called
+
+
+class FeaturePlan:
+    '''
+    Validated, dependency-ordered evaluation plan for a list of feature specs.
+    Each spec is a dict with name, expression, inputs and dtype.
+    '''
+
+    def __init__(self, steps, source_columns):
+        self.steps = steps
+        self.source_columns = source_columns
+
+
+def compile_features(specs, available_columns):
+    '''
+    Check the specs and order them so derived inputs are computed before they are used.
+    Raises ValueError for duplicate names, duplicate inputs, inputs missing from the data,
+    expressions that use undeclared columns and dependency cycles.
+    '''
+    try:
+        available_columns = set(available_columns)
+        names = [spec["name"] for spec in specs]
+        duplicates = {n for n in names if names.count(n) > 1}
+        if duplicates:
+            raise ValueError(f"Features defined more than once: {sorted(duplicates)}")
+
+        by_name = {}
+        for spec in specs:
+            inputs = spec["inputs"]
+            repeated = {c for c in inputs if inputs.count(c) > 1}
+            if repeated:
+                raise ValueError(f"Feature '{spec['name']}' lists inputs more than once: {sorted(repeated)}")
+            used = expression_names(spec["expression"])
+            if used != set(inputs):
+                raise ValueError(f"Feature '{spec['name']}' expression uses {sorted(used)} "
+                                 f"but declares inputs {sorted(inputs)}")
+            missing = [c for c in inputs if c not in available_columns and c not in names]
+            if missing:
+                raise ValueError(f"Feature '{spec['name']}' needs columns not in the data: {missing}")
+            by_name[spec["name"]] = spec
+
+        ordered, visiting = [], set()
+
+        def visit(name):
+            if any(step["name"] == name for step in ordered):
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through feature '{name}'")
+            visiting.add(name)
+            for dep in by_name[name]["inputs"]:
+                if dep in by_name:
+                    visit(dep)
+            visiting.discard(name)
+            ordered.append(by_name[name])
+
+        for name in names:
+            visit(name)
+
+        source_columns = sorted({c for spec in specs for c in spec["inputs"] if c not in by_name})
+        return FeaturePlan(ordered, source_columns)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _as_array(values):
+    if values.dtype == bool or values.dtype.kind == "f":
+        return values
+    # numexpr has no small/unsigned integer kernels
+    return values.astype(np.int32 if values.dtype.kind in "iu" else np.float64)
+
+
+def evaluate_features(plan, df):
+    '''
+    Evaluate the plan on df and return a new frame with all derived columns attached in one
+    concat. Every source column is converted to an array once and shared by all features;
+    each output array is allocated once and cast straight to its declared dtype.
+    Returns (frame, cost_report) where the report has per-feature seconds and bytes.
+    '''
+    try:
+        arrays = {col: _as_array(df[col].to_numpy()) for col in plan.source_columns}
+        outputs, report = {}, []
+        for spec in plan.steps:
+            start = time.perf_counter()
+            local_dict = {c: arrays[c] for c in spec["inputs"]}
+            if ne is not None:
+                result = ne.evaluate(spec["expression"], local_dict=local_dict)
+            else:
+                result = eval(spec["expression"], {"__builtins__": {}, **EXPRESSION_FUNCTIONS}, local_dict)
+            result = np.asarray(result).astype(spec["dtype"], copy=False)
+            arrays[spec["name"]] = _as_array(result)
+            outputs[spec["name"]] = result
+            report.append({"feature": spec["name"], "seconds": time.perf_counter() - start, "bytes": result.nbytes})
+
+        derived = pd.DataFrame(outputs, index=df.index)
+        existing = [c for c in outputs if c in df.columns]
+        out = pd.concat([df.drop(columns=existing) if existing else df, derived], axis=1)
+        for row in report:
+            logging.info(f"[features] {row['feature']}: {row['seconds'] * 1000:.2f} ms, {row['bytes']} bytes")
+        return out, report
+    except Exception as e:
+        raise CustomException(e, sys)
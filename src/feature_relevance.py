@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from exception import CustomException
+from logger import logging
+
+RELEVANCE_MODES = ("off", "corr", "mi")
+TARGET_VALUES = {"Yes": 1, "No": 0}
+# Columns converted to float64 at a time by target_correlations
+CORRELATION_BLOCK_COLUMNS = 64
+
+
+def target_vector(series):
+    '''
+    Target as float64 with NaN for missing/unknown labels; Yes/No labels are mapped to 1/0.
+    '''
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.to_numpy(dtype=np.float64)
+    return series.astype(object).map(TARGET_VALUES).to_numpy(dtype=np.float64)
+
+
+def numeric_feature_columns(df, target):
+    return [c for c in df.columns
+            if c != target and not isinstance(df[c].dtype, pd.SparseDtype)
+            and (pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c]))]
+
+
+def target_correlations(df, target="churn", block_size=CORRELATION_BLOCK_COLUMNS):
+    '''
+    Pearson correlation of every numeric column with the target, instead of the full k x k
+    matrix. Missing values are excluded pairwise, as in DataFrame.corr(). The per-column
+    sums are matrix-vector products over blocks of block_size columns, so apart from one
+    block the state is O(k). Constant columns get NaN.
+    '''
+    try:
+        y = target_vector(df[target])
+        labelled = ~np.isnan(y)
+        y = y[labelled]
+        y = y - y.mean() if len(y) else y
+        ones = np.ones(len(y))
+        cols = numeric_feature_columns(df, target)
+        corr = np.full(len(cols), np.nan)
+        for start in range(0, len(cols), block_size):
+            block_cols = cols[start:start + block_size]
+            # Centered on the column means, missing values zeroed, so they drop out of the sums
+            X = df[block_cols].to_numpy(dtype=np.float64)[labelled]
+            missing = np.isnan(X)
+            with np.errstate(invalid="ignore"):
+                X -= np.nanmean(X, axis=0) if len(X) else 0.0
+            X[missing] = 0.0
+            present = ~missing
+
+            n = np.maximum(present.T @ ones, 1)
+            sum_x, sum_y = X.T @ ones, present.T @ y
+            sum_xy, sum_yy = X.T @ y, present.T @ (y * y)
+            X **= 2
+            sum_xx = X.T @ ones
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cov = sum_xy - sum_x * sum_y / n
+                var = (sum_xx - sum_x ** 2 / n) * (sum_yy - sum_y ** 2 / n)
+                corr[start:start + len(block_cols)] = cov / np.sqrt(var)
+        return pd.Series(corr, index=cols, name=target).sort_values(ascending=False)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def mutual_information(df, target="churn", sample_size=50000, seed=42):
+    '''
+    Mutual information of every numeric column with the target, estimated on a random
+    sample of rows. 0/1 flag columns are treated as discrete features.
+    '''
+    try:
+        from sklearn.feature_selection import mutual_info_classif
+
+        y = target_vector(df[target])
+        labelled = df.loc[~np.isnan(y)]
+        if len(labelled) > sample_size:
+            labelled = labelled.sample(n=sample_size, random_state=seed)
+        cols = numeric_feature_columns(labelled, target)
+        X = labelled[cols].astype(np.float64)
+        X = X.fillna(X.median())
+        discrete = np.array([bool(X[c].isin([0, 1]).all()) for c in cols])
+        mi = mutual_info_classif(X.to_numpy(), target_vector(labelled[target]).astype(int),
+                                 discrete_features=discrete, random_state=seed)
+        return pd.Series(mi, index=cols, name=target).sort_values(ascending=False)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _as_dict(series):
+    # NaN (constant columns) is not valid JSON
+    return {col: (None if np.isnan(v) else round(float(v), 6)) for col, v in series.items()}
+
+
+def feature_relevance_report(frames, target="churn", mode="corr", sample_size=50000, seed=42):
+    '''
+    Relevance of each column to the target for one or more named frames
+    (e.g. {"before": df, "after": df_new}). mode "corr" computes target correlations,
+    "mi" adds mutual information on a sample.
+    '''
+    try:
+        if mode not in RELEVANCE_MODES:
+            raise ValueError(f"Unknown feature relevance mode '{mode}', expected one of {RELEVANCE_MODES}")
+        report = {"target": target, "mode": mode, "frames": {}}
+        for name, df in frames.items():
+            entry = {"rows": len(df), "correlation": _as_dict(target_correlations(df, target))}
+            if mode == "mi":
+                entry["mutual_information"] = _as_dict(mutual_information(df, target, sample_size, seed))
+                entry["mi_sample_rows"] = min(len(df), sample_size)
+            report["frames"][name] = entry
+        return report
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def save_relevance_report(report, output_dir, top=10):
+    '''
+    Write the report as feature_relevance_<timestamp>.json plus feature_relevance_latest.json
+    and log the strongest correlations per frame.
+    '''
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(output_dir, f"feature_relevance_{timestamp}.json")
+        for target_path in (path, os.path.join(output_dir, "feature_relevance_latest.json")):
+            with open(target_path, "w") as f:
+                json.dump(report, f, indent=2)
+        for name, entry in report["frames"].items():
+            corr = pd.Series(entry["correlation"], dtype=np.float64).dropna()
+            strongest = corr.reindex(corr.abs().sort_values(ascending=False).index)[:top]
+            logging.info(f"[relevance] {name}: " + ", ".join(f"{c}={v:+.3f}" for c, v in strongest.items()))
+        logging.info(f"Feature relevance report written to {path}")
+        return path
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,162 @@
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from io import BytesIO
+
+from dedup_index import hash_keys
+from exception import CustomException
+from logger import logging
+from parquet_writer import write_parquet_file
+
+# Hive-style layout of the incremental transformed dataset. Every customer always lands
+# in the same bucket, so an update only touches the buckets its customers hash to.
+DATASET_PREFIX = "transformed/dataset/"
+PARTITION_COLUMN = "customer_bucket"
+PART_FILE_NAME = "part-00000.parquet"
+DEFAULT_BUCKETS = 64
+
+# Row hashes of the last incremental run. Kept outside transformed/ so the Redshift
+# loader never picks it up as the latest transformed object.
+STATE_KEY = "state/transformation/row_hashes.parquet"
+STATE_COLUMNS = ["customerid", "row_hash", PARTITION_COLUMN]
+
+# Same fixed key idea as the dedup index: hashes must be stable across runs.
+ROW_HASH_KEY = "dm4ml_rowhash_k0"
+
+
+def customer_buckets(keys, n_buckets=DEFAULT_BUCKETS):
+    return (hash_keys(keys) % np.uint64(n_buckets)).astype(np.int16)
+
+
+def partition_key(bucket):
+    return f"{DATASET_PREFIX}{PARTITION_COLUMN}={int(bucket):03d}/{PART_FILE_NAME}"
+
+
+def canonical_values(df):
+    '''
+    The frame with dtype-policy choices undone, so equal values hash equally whatever width
+    the policy picked in a run: integers, flags and bools as float64, floats rounded to
+    float32 (the policy's float width) then widened, everything else as strings.
+    '''
+    canonical = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.SparseDtype):
+            series = series.sparse.to_dense()
+        if pd.api.types.is_float_dtype(series):
+            canonical[col] = series.astype(np.float32).astype(np.float64)
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+            canonical[col] = series.astype(np.float64)
+        else:
+            canonical[col] = series.astype(object).where(series.notna(), None).astype(str)
+    return pd.DataFrame(canonical, index=df.index)
+
+
+def row_content_hashes(df, key_column="customerid"):
+    '''
+    64-bit hash of every column except the key, per row, on canonical dtypes so the hash
+    does not change when the dtype policy picks another width (int8 vs int16, float32 vs
+    float64) for the same values.
+    '''
+    value_cols = sorted(c for c in df.columns if c != key_column)
+    return pd.util.hash_pandas_object(canonical_values(df[value_cols]), index=False,
+                                      hash_key=ROW_HASH_KEY).to_numpy()
+
+
+def empty_state():
+    return pd.DataFrame({"customerid": pd.Series(dtype=object),
+                         "row_hash": pd.Series(dtype=np.uint64),
+                         PARTITION_COLUMN: pd.Series(dtype=np.int16)})
+
+
+def find_changed_rows(df, state, n_buckets=DEFAULT_BUCKETS, key_column="customerid"):
+    '''
+    Compare df against the stored row hashes.
+    Returns (delta, new_state): delta holds the new or changed rows with their bucket
+    attached, new_state is the state with those rows' hashes upserted.
+    '''
+    try:
+        current = pd.DataFrame({
+            "customerid": df[key_column].astype(str).str.strip().to_numpy(),
+            "row_hash": row_content_hashes(df, key_column),
+            PARTITION_COLUMN: customer_buckets(df[key_column], n_buckets),
+        })
+        # A customer listed twice in one file keeps its last row, as in the merger's upsert mode.
+        last = ~current["customerid"].duplicated(keep="last").to_numpy()
+
+        previous = state.set_index("customerid")["row_hash"]
+        stored = previous.reindex(current["customerid"]).to_numpy()
+        changed = last & (pd.isna(stored) | (stored != current["row_hash"].to_numpy()))
+
+        delta = df.loc[changed].copy()
+        delta[PARTITION_COLUMN] = current.loc[changed, PARTITION_COLUMN].to_numpy()
+
+        updates = current.loc[changed]
+        new_state = pd.concat([state[~state["customerid"].isin(updates["customerid"])], updates],
+                              ignore_index=True)
+        logging.info(f"Incremental diff: {int(changed.sum())} new or changed rows out of {len(df)}, "
+                     f"{delta[PARTITION_COLUMN].nunique()} of {n_buckets} buckets affected.")
+        return delta, new_state
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def merge_partition(existing, updates, key_column="customerid"):
+    '''
+    Replace the rows of existing whose key appears in updates and append the new ones.
+    '''
+    if existing is None or existing.empty:
+        return updates.reset_index(drop=True)
+    # Keep the partition's schema stable: the delta may have been downcast differently.
+    shared = [c for c in updates.columns if c in existing.columns and updates[c].dtype != existing[c].dtype]
+    if shared:
+        updates = updates.astype({c: existing[c].dtype for c in shared})
+    keep = ~existing[key_column].astype(str).str.strip().isin(updates[key_column].astype(str).str.strip())
+    return pd.concat([existing[keep], updates], ignore_index=True)
+
+
+def read_parquet_object(s3_client, bucket, key):
+    '''
+    Read a Parquet object into a DataFrame, or None if it does not exist yet.
+    '''
+    try:
+        obj = s3_client.get_object(Bucket=bucket, Key=key)
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    return pq.read_table(BytesIO(obj["Body"].read())).to_pandas()
+
+
+def write_parquet_object(s3_client, bucket, key, df):
+    buffer = BytesIO()
+    write_parquet_file(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    s3_client.put_object(Bucket=bucket, Key=key, Body=buffer.getvalue())
+
+
+def load_state(s3_client, bucket):
+    state = read_parquet_object(s3_client, bucket, STATE_KEY)
+    if state is None:
+        logging.info("No incremental transformation state found; every row counts as new.")
+        return empty_state()
+    return state
+
+
+def apply_delta(s3_client, bucket, transformed_delta, key_column="customerid"):
+    '''
+    Merge transformed delta rows into their partitions. Only affected partitions are read
+    and rewritten; everything else in the dataset is left untouched.
+    Returns the list of rewritten keys.
+    '''
+    try:
+        written = []
+        for bucket_id, updates in transformed_delta.groupby(PARTITION_COLUMN, sort=True):
+            key = partition_key(bucket_id)
+            updates = updates.drop(columns=[PARTITION_COLUMN])
+            merged = merge_partition(read_parquet_object(s3_client, bucket, key), updates, key_column)
+            write_parquet_object(s3_client, bucket, key, merged)
+            written.append(key)
+            logging.info(f"Rewrote s3://{bucket}/{key} with {len(updates)} updated rows ({len(merged)} total).")
+        return written
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,86 @@
+import os
+import sys
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from exception import CustomException
+from logger import logging
+
+DEFAULT_ROW_GROUP_SIZE = 128_000
+DEFAULT_COMPRESSION = "zstd"
+
+# Writer settings shared by every Parquet file the pipeline produces. Column statistics let
+# Redshift Spectrum / pyarrow skip row groups; dictionary encoding keeps the 0/1 flags and
+# the low-cardinality strings small.
+PARQUET_WRITE_OPTIONS = {"use_dictionary": True, "write_statistics": True}
+
+
+def write_parquet_file(table, where, compression=DEFAULT_COMPRESSION, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    pq.write_table(table, where, compression=compression, row_group_size=row_group_size, **PARQUET_WRITE_OPTIONS)
+
+
+def partition_path(root, partition_col, value, part=0):
+    return os.path.join(root, f"{partition_col}={int(value):03d}", f"part-{part:05d}.parquet")
+
+
+def write_partitioned_dataset(df, root, partition_values, partition_col,
+                              row_group_size=DEFAULT_ROW_GROUP_SIZE, compression=DEFAULT_COMPRESSION, part=0):
+    '''
+    Write df as a Hive-partitioned Parquet dataset under root, one file per partition value:
+    root/<partition_col>=NNN/part-<part>.parquet. partition_values gives each row's partition
+    and is not stored in the files (readers take it from the path). Parallel writers use
+    different part numbers to share a root.
+
+    Each file is written by a ParquetWriter one row group at a time, so at most one row
+    group is converted to Arrow at once. All files share the schema of the full frame.
+    df may also be a pyarrow Table (Arrow engine), in which case rows are taken directly.
+    Returns the list of written file paths.
+    '''
+    try:
+        if isinstance(df, pa.Table):
+            schema = df.schema
+            take_rows = lambda rows: df.take(pa.array(rows))
+        else:
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            take_rows = lambda rows: pa.Table.from_pandas(df.iloc[rows], schema=schema, preserve_index=False)
+        partition_values = np.asarray(partition_values)
+        order = np.argsort(partition_values, kind="stable")
+        sorted_values = partition_values[order]
+        boundaries = np.flatnonzero(np.diff(sorted_values)) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [len(order)]])
+
+        written = []
+        for start, end in zip(starts, ends):
+            if start == end:
+                continue
+            path = partition_path(root, partition_col, sorted_values[start], part)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            rows = order[start:end]
+            with pq.ParquetWriter(path, schema, compression=compression, **PARQUET_WRITE_OPTIONS) as writer:
+                for offset in range(0, len(rows), row_group_size):
+                    writer.write_table(take_rows(rows[offset:offset + row_group_size]), row_group_size=row_group_size)
+            written.append(path)
+        logging.info(f"Wrote {len(order)} rows to {len(written)} partitions under {root} "
+                     f"({compression}, row groups of {row_group_size}).")
+        return written
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def upload_dataset(s3_client, bucket, root, prefix, paths):
+    '''
+    Upload the dataset files to s3://bucket/prefix keeping their path relative to root.
+    upload_file streams each part from disk with multipart uploads.
+    '''
+    try:
+        keys = []
+        for path in paths:
+            key = prefix + os.path.relpath(path, root).replace(os.sep, "/")
+            s3_client.upload_file(path, bucket, key)
+            keys.append(key)
+        logging.info(f"Uploaded {len(keys)} dataset parts to s3://{bucket}/{prefix}")
+        return keys
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,193 @@
+import os
+import sys
+import glob
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from exception import CustomException
+from logger import logging
+from utils import save_object, load_object
+from sparse_encoding import sparse_block
+
+# Bump when the artifact layout changes so old artifacts are rejected instead of misread.
+ARTIFACT_VERSION = 2
+TARGET_COL = "Churn"
+ID_COL = "customerID"
+COLUMN_RENAMES = {"PaymentMethod_Credit_card_(automatic)": "PaymentMethod_Credit_card_automatic"}
+
+
+def normalize_column_name(name):
+    '''
+    Same naming as the original get_dummies output: spaces to underscores, fixed renames, lower case.
+    '''
+    name = name.replace(" ", "_")
+    return COLUMN_RENAMES.get(name, name).lower()
+
+
+class PreprocessingArtifact:
+    '''
+    Everything learned while fitting the preparation step: imputation values, the fitted
+    StandardScaler, the one-hot vocabulary per categorical column and the final column order.
+    '''
+
+    def __init__(self, base_cols, numeric_cols, categorical_cols, fill_values, scaler, vocabularies, sparse_cols=()):
+        self.version = ARTIFACT_VERSION
+        self.created_at = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Non-encoded columns (numeric, id, target) in input order, as get_dummies keeps them.
+        self.base_cols = base_cols
+        self.numeric_cols = numeric_cols
+        self.categorical_cols = categorical_cols
+        self.fill_values = fill_values
+        self.scaler = scaler
+        self.vocabularies = vocabularies
+        # Categoricals encoded as sparse one-hot blocks (cardinality above the fit threshold).
+        self.sparse_cols = list(sparse_cols)
+        # category -> position in the vocabulary; position 0 is the dropped (drop_first) level.
+        self.category_index = {col: {cat: i for i, cat in enumerate(vocab)} for col, vocab in vocabularies.items()}
+        self.dummy_columns = {
+            col: [normalize_column_name(f"{col}_{cat}") for cat in vocab[1:]] for col, vocab in vocabularies.items()
+        }
+        self.output_columns = (
+            [normalize_column_name(c) for c in base_cols]
+            + [c for col in categorical_cols for c in self.dummy_columns[col]]
+        )
+
+
+def fit_preprocessor(df, sparse_threshold=None, dense_cols=()):
+    '''
+    Learn the preparation parameters from the merged data. Numeric columns are median
+    imputed and standardized, object columns are mode imputed and one-hot encoded with
+    the first (alphabetical) level dropped, exactly as pd.get_dummies(drop_first=True).
+
+    Categoricals with more than sparse_threshold levels are encoded sparse, except the
+    ones listed in dense_cols (e.g. columns feeding Feast).
+    '''
+    try:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+        for col in (TARGET_COL, ID_COL):
+            if col in categorical_cols:
+                categorical_cols.remove(col)
+            if col in numeric_cols:
+                numeric_cols.remove(col)
+        base_cols = [c for c in df.columns if c not in categorical_cols]
+
+        fill_values = {}
+        for col in numeric_cols:
+            fill_values[col] = df[col].median()
+        for col in categorical_cols:
+            modes = df[col].mode()
+            fill_values[col] = modes[0] if len(modes) else None
+
+        # sklearn is imported only when fitting, so modules that just read with the
+        # preprocessing helpers (the validators through csv_reader) start without it.
+        from sklearn.preprocessing import StandardScaler
+
+        filled = df[numeric_cols].fillna({c: fill_values[c] for c in numeric_cols})
+        scaler = StandardScaler().fit(filled)
+
+        vocabularies = {}
+        for col in categorical_cols:
+            vocabularies[col] = sorted(df[col].fillna(fill_values[col]).dropna().unique().tolist())
+
+        sparse_cols = []
+        if sparse_threshold:
+            sparse_cols = [c for c in categorical_cols
+                           if len(vocabularies[c]) > sparse_threshold and c not in dense_cols]
+
+        artifact = PreprocessingArtifact(base_cols, numeric_cols, categorical_cols, fill_values, scaler,
+                                         vocabularies, sparse_cols)
+        logging.info(f"Preprocessor fitted: {len(numeric_cols)} numeric, {len(categorical_cols)} categorical "
+                     f"({len(sparse_cols)} sparse), {len(artifact.output_columns)} output columns.")
+        return artifact
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def category_codes(series, index_map, fill_value):
+    '''
+    Map a column to vocabulary positions (-1 for unseen values). Categorical columns are
+    looked up once per category instead of once per row.
+    '''
+    fill_code = index_map.get(fill_value, -1)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.array([index_map.get(cat, -1) for cat in series.cat.categories], dtype=np.int64)
+        raw = series.cat.codes.to_numpy()
+        return np.where(raw >= 0, lookup[np.maximum(raw, 0)], fill_code)
+    # Only missing values take the fill value's code; unseen values stay -1.
+    if fill_value is not None:
+        series = series.fillna(fill_value)
+    return series.map(index_map).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def transform_with_artifact(df, artifact):
+    '''
+    Apply a fitted artifact without refitting anything. Categories are looked up in the
+    precomputed category->index maps; unseen categories get all-zero flags. Flags are
+    uint8 (SparseDtype for the artifact's sparse columns) and columns always come out in
+    artifact.output_columns order.
+    '''
+    try:
+        missing = [c for c in artifact.base_cols + artifact.categorical_cols if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columns missing for preprocessing artifact v{artifact.version}: {missing}")
+
+        n_rows = len(df)
+        numeric = df[artifact.numeric_cols].fillna({c: artifact.fill_values[c] for c in artifact.numeric_cols})
+        scaled = artifact.scaler.transform(numeric)
+
+        base = df[artifact.base_cols].reset_index(drop=True)
+        base[artifact.numeric_cols] = scaled
+        blocks = [base]
+        for col in artifact.categorical_cols:
+            codes = category_codes(df[col], artifact.category_index[col], artifact.fill_values[col])
+            unseen = int((codes < 0).sum())
+            if unseen:
+                logging.info(f"{unseen} rows of {col} have categories not in the artifact vocabulary.")
+            if col in artifact.sparse_cols:
+                blocks.append(sparse_block(codes, artifact.dummy_columns[col]))
+                continue
+            flags = np.zeros((n_rows, len(artifact.dummy_columns[col])), dtype=np.uint8)
+            rows = np.nonzero(codes > 0)[0]
+            flags[rows, codes[rows] - 1] = 1
+            blocks.append(pd.DataFrame(flags, columns=artifact.dummy_columns[col]))
+
+        out = pd.concat(blocks, axis=1)
+        out.columns = artifact.output_columns
+        return out
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def save_preprocessing_artifact(artifact, artifact_dir):
+    '''
+    Save the artifact under a versioned, timestamped name and refresh the "latest" copy.
+    '''
+    file_name = f"preprocessor_v{artifact.version}_{artifact.created_at}.pkl"
+    artifact_path = os.path.join(artifact_dir, file_name)
+    save_object(artifact_path, artifact)
+    save_object(os.path.join(artifact_dir, "preprocessor_latest.pkl"), artifact)
+    logging.info(f"Preprocessing artifact saved: {artifact_path}")
+    return artifact_path
+
+
+def load_preprocessing_artifact(artifact_dir, artifact_path=None):
+    '''
+    Load a specific artifact, or the latest one saved in artifact_dir.
+    '''
+    try:
+        artifact_path = artifact_path or os.path.join(artifact_dir, "preprocessor_latest.pkl")
+        if not os.path.exists(artifact_path):
+            candidates = sorted(glob.glob(os.path.join(artifact_dir, "preprocessor_v*.pkl")))
+            if not candidates:
+                raise FileNotFoundError(f"No preprocessing artifact found in {artifact_dir}")
+            artifact_path = candidates[-1]
+        artifact = load_object(artifact_path)
+        if getattr(artifact, "version", None) != ARTIFACT_VERSION:
+            raise ValueError(f"Artifact {artifact_path} has version {getattr(artifact, 'version', None)}, "
+                             f"expected {ARTIFACT_VERSION}. Refit with PREPROCESSING_MODE=fit.")
+        logging.info(f"Loaded preprocessing artifact: {artifact_path}")
+        return artifact
+    except Exception as e:
+        raise CustomException(e, sys)
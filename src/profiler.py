@@ -0,0 +1,434 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from exception import CustomException
+from logger import logging
+from sketches import HyperLogLog, TDigest, hash_values
+
+
+class ColumnProfile:
+    '''
+    Everything the validation report needs to know about one column.
+
+    null_count is taken on the column as read; the numeric statistics (valid_count,
+    distinct, min/max, quartiles, outliers, out_of_range) on its numeric view, i.e. after
+    pd.to_numeric(errors="coerce") for columns validated as numeric. For text columns
+    unique_values lists the values (missing included) in order of appearance.
+
+    Profiles built by StreamingProfiler set approximate when distinct, the quartiles and
+    the IQR outlier count come from sketches; unique_values and invalid_values are then
+    capped samples.
+    '''
+
+    def __init__(self, name, kind, null_count):
+        self.name = name
+        self.kind = kind
+        self.null_count = int(null_count)
+        self.valid_count = 0
+        self.distinct = 0
+        self.unique_values = None
+        self.min = self.max = self.q1 = self.q3 = np.nan
+        self.iqr_outliers = 0
+        self.out_of_range = None
+        self.invalid_count = None
+        self.invalid_values = None
+        self.approximate = False
+
+    @property
+    def is_binary(self):
+        return self.distinct <= 2
+
+    @property
+    def cardinality(self):
+        # Distinct values with missing counted as one more value, as len(Series.unique()).
+        return self.distinct + (1 if self.null_count else 0)
+
+
+class DataProfile:
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+
+    def __getitem__(self, col):
+        return self.columns[col]
+
+    def __contains__(self, col):
+        return col in self.columns
+
+    def of_kind(self, kind):
+        return [name for name, profile in self.columns.items() if profile.kind == kind]
+
+
+def _sorted_quantile(ordered, valid, q):
+    '''
+    Linear-interpolated quantile of each column of a NaN-last sorted matrix, with the same
+    arithmetic as np.quantile (and so Series.quantile) on the non-missing values.
+    '''
+    previous, following, gamma = _quantile_positions(valid, q)
+    columns = np.arange(ordered.shape[1])
+    return _lerp(ordered[previous, columns], ordered[following, columns], gamma)
+
+
+def _quantile_positions(n, q):
+    virtual = n * q + (1 - q) - 1
+    previous = np.clip(np.floor(virtual).astype(np.int64), 0, None)
+    following = np.minimum(previous + 1, np.maximum(n - 1, 0))
+    return previous, following, virtual - previous
+
+
+def _lerp(a, b, gamma):
+    diff_b_a = b - a
+    return np.where(gamma >= 0.5, b - diff_b_a * (1 - gamma), a + diff_b_a * gamma)
+
+
+def _profile_numeric(values, profiles, ranges):
+    '''
+    All numeric columns at once: one column-wise sort gives the distinct counts, min/max and
+    quartiles, and the IQR and range checks are broadcast over the whole matrix.
+    '''
+    valid = (~np.isnan(values)).sum(axis=0)
+    ordered = np.sort(values, axis=0)  # NaN sorts last
+    changes = ordered[1:] != ordered[:-1]
+    in_valid_part = np.arange(len(values) - 1)[:, None] < (valid - 1)[None, :]
+    distinct = np.where(valid > 0, 1 + (changes & in_valid_part).sum(axis=0), 0)
+
+    has_values = valid > 0
+    with np.errstate(invalid="ignore"):
+        q1 = np.where(has_values, _sorted_quantile(ordered, valid, 0.25), np.nan)
+        q3 = np.where(has_values, _sorted_quantile(ordered, valid, 0.75), np.nan)
+        iqr = q3 - q1
+        lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    outliers = ((values < lower) | (values > upper)).sum(axis=0)
+
+    low = np.array([ranges.get(p.name, (np.nan, np.nan))[0] for p in profiles], dtype=np.float64)
+    high = np.array([ranges.get(p.name, (np.nan, np.nan))[1] for p in profiles], dtype=np.float64)
+    out_of_range = ((values < low) | (values > high)).sum(axis=0)
+
+    last = np.maximum(valid - 1, 0)
+    minimum = np.where(has_values, ordered[0], np.nan)
+    maximum = np.where(has_values, ordered[last, np.arange(values.shape[1])], np.nan)
+    for i, profile in enumerate(profiles):
+        profile.valid_count = int(valid[i])
+        profile.distinct = int(distinct[i])
+        profile.min, profile.max = float(minimum[i]), float(maximum[i])
+        profile.q1, profile.q3 = float(q1[i]), float(q3[i])
+        profile.iqr_outliers = int(outliers[i])
+        if profile.name in ranges:
+            profile.out_of_range = int(out_of_range[i])
+
+
+def _profile_text(series, profile, expected_values):
+    '''
+    One hash pass for the unique values (in order of appearance, missing included);
+    cardinality and the invalid values come from those instead of from the rows.
+    '''
+    uniques = series.unique()
+    profile.unique_values = uniques.tolist()
+    profile.valid_count = int(len(series) - profile.null_count)
+    profile.distinct = int(len(uniques) - pd.isna(uniques).sum())
+    if expected_values is not None:
+        profile.invalid_count = int((~series.isin(expected_values)).sum())
+        candidates = pd.Series(profile.unique_values, dtype=object)
+        profile.invalid_values = candidates[~candidates.isin(expected_values)].tolist()
+
+
+def profile_frame(data, numeric_columns=(), expected_ranges=None, expected_sets=None):
+    '''
+    Profile every column of data in one pass.
+
+    numeric_columns are validated as numeric and coerced with pd.to_numeric first (data
+    itself is not modified); other columns are profiled by dtype: numbers as numeric,
+    object/category as text. expected_ranges {col: (low, high)} adds out-of-range counts,
+    expected_sets {col: values} invalid counts and the invalid values themselves.
+    '''
+    try:
+        expected_ranges = expected_ranges or {}
+        expected_sets = expected_sets or {}
+
+        profiles = {}
+        numeric = {}
+        plain = set()
+        for col in data.columns:
+            series = data[col]
+            if col in numeric_columns:
+                numeric[col] = pd.to_numeric(series, errors="coerce")
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                numeric[col] = series
+                plain.add(col)
+            kind = "numeric" if col in numeric else (
+                "text" if pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype)
+                else "other")
+            # Plain numeric columns get their null counts from the numeric matrix below.
+            null_count = 0 if col in plain else series.isna().sum()
+            profiles[col] = ColumnProfile(col, kind, null_count)
+
+        if numeric:
+            # Column-major so the per-column sort and reductions walk contiguous memory.
+            values = np.empty((len(data), len(numeric)), dtype=np.float64, order="F")
+            for i, series in enumerate(numeric.values()):
+                values[:, i] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            for i, col in enumerate(numeric):
+                if col in plain:
+                    profiles[col].null_count = int(np.isnan(values[:, i]).sum())
+            _profile_numeric(values, [profiles[c] for c in numeric], expected_ranges)
+        for col, profile in profiles.items():
+            if profile.kind == "text" or col in expected_sets:
+                _profile_text(data[col], profile, expected_sets.get(col))
+
+        logging.info(f"Profiled {len(data)} rows x {len(profiles)} columns "
+                     f"({len(numeric)} numeric) in one pass.")
+        return DataProfile(len(data), profiles)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+class _NumericAccumulator:
+    '''
+    Null/valid counts, min/max and range violations exactly; distinct values and quartiles
+    exactly from value counts while there are at most exact_limit distinct values, from a
+    HyperLogLog and a t-digest beyond that.
+    '''
+
+    def __init__(self, value_range, exact_limit):
+        self.value_range = value_range
+        self.exact_limit = exact_limit
+        self.null_count = 0
+        self.valid = 0
+        self.out_of_range = 0
+        self.counts = pd.Series(dtype=np.int64)
+        self.hll = HyperLogLog()
+        self.digest = TDigest()
+
+    def update(self, raw, values):
+        self.null_count += int(raw.isna().sum())
+        values = values[~np.isnan(values)]
+        self.valid += len(values)
+        if self.value_range is not None:
+            low, high = self.value_range
+            self.out_of_range += int(((values < low) | (values > high)).sum())
+        self.hll.update(values)
+        self.digest.update(values)
+        if self.counts is not None:
+            self.counts = self.counts.add(pd.Series(values).value_counts(), fill_value=0)
+            if len(self.counts) > self.exact_limit:
+                self.counts = None
+
+    def merge(self, other):
+        self.null_count += other.null_count
+        self.valid += other.valid
+        self.out_of_range += other.out_of_range
+        self.hll.merge(other.hll)
+        self.digest.merge(other.digest)
+        if self.counts is not None and other.counts is not None:
+            self.counts = self.counts.add(other.counts, fill_value=0)
+        if self.counts is None or other.counts is None or len(self.counts) > self.exact_limit:
+            self.counts = None
+
+    def fill(self, profile):
+        profile.null_count = self.null_count
+        profile.valid_count = self.valid
+        if self.value_range is not None:
+            profile.out_of_range = self.out_of_range
+        if not self.valid:
+            return
+        profile.min, profile.max = float(self.digest.min), float(self.digest.max)
+        if self.counts is not None:
+            counts = self.counts.sort_index()
+            values = counts.index.to_numpy(dtype=np.float64)
+            cumulative = counts.to_numpy().cumsum()
+            profile.distinct = len(counts)
+            quartiles = []
+            for q in (0.25, 0.75):
+                previous, following, gamma = _quantile_positions(self.valid, q)
+                a = values[np.searchsorted(cumulative, previous, side="right")]
+                b = values[np.searchsorted(cumulative, following, side="right")]
+                quartiles.append(float(_lerp(a, b, gamma)))
+            profile.q1, profile.q3 = quartiles
+            iqr = profile.q3 - profile.q1
+            outside = (values < profile.q1 - 1.5 * iqr) | (values > profile.q3 + 1.5 * iqr)
+            profile.iqr_outliers = int(counts.to_numpy()[outside].sum())
+        else:
+            profile.approximate = True
+            profile.distinct = self.hll.count()
+            profile.q1, profile.q3 = self.digest.quantile(0.25), self.digest.quantile(0.75)
+            iqr = profile.q3 - profile.q1
+            below = self.digest.cdf(profile.q1 - 1.5 * iqr)
+            above = 1 - self.digest.cdf(np.nextafter(profile.q3 + 1.5 * iqr, np.inf))
+            profile.iqr_outliers = int(round((below + above) * self.valid))
+
+
+class _TextAccumulator:
+    '''
+    Null and invalid-value counts exactly; the unique values in order of appearance up to
+    exact_limit (then a HyperLogLog for the cardinality) and at most sample_limit example
+    invalid values.
+    '''
+
+    def __init__(self, expected_values, exact_limit, sample_limit, exact_keys=False):
+        self.expected_values = expected_values
+        self.exact_limit = exact_limit
+        self.sample_limit = sample_limit
+        # Key columns keep sorted 64-bit hashes of their distinct values so duplicate counts
+        # stay exact (8 bytes per key, as in dedup_index).
+        self.key_hashes = [] if exact_keys else None
+        self.null_count = 0
+        self.uniques = {}
+        self.overflow = False
+        self.hll = HyperLogLog()
+        self.invalid_count = 0
+        self.invalid_sample = {}
+
+    def _add_uniques(self, values):
+        for value in values:
+            key = _key(value)
+            if key not in self.uniques and len(self.uniques) >= self.exact_limit:
+                self.overflow = True
+                break
+            self.uniques.setdefault(key, value)
+
+    def _add_invalid(self, values):
+        for value in values:
+            if len(self.invalid_sample) >= self.sample_limit:
+                break
+            self.invalid_sample.setdefault(_key(value), value)
+
+    def _add_keys(self, hashes):
+        new = np.unique(hashes)
+        for seen in self.key_hashes:
+            positions = np.minimum(np.searchsorted(seen, new), len(seen) - 1)
+            new = new[seen[positions] != new]
+        if len(new):
+            self.key_hashes.append(new)
+        if len(self.key_hashes) > 8:
+            self.key_hashes = [np.unique(np.concatenate(self.key_hashes))]
+
+    def update(self, series):
+        missing = series.isna()
+        self.null_count += int(missing.sum())
+        present = series[~missing].astype(object).to_numpy()
+        self.hll.update(present)
+        if self.key_hashes is not None:
+            self._add_keys(hash_values(present))
+        uniques = series.unique().tolist()
+        if not self.overflow:
+            self._add_uniques(uniques)
+        if self.expected_values is not None:
+            self.invalid_count += int((~series.isin(self.expected_values)).sum())
+            candidates = pd.Series(uniques, dtype=object)
+            self._add_invalid(candidates[~candidates.isin(self.expected_values)].tolist())
+
+    def merge(self, other):
+        self.null_count += other.null_count
+        self.hll.merge(other.hll)
+        self.overflow = self.overflow or other.overflow
+        if not self.overflow:
+            self._add_uniques(other.uniques.values())
+        self.invalid_count += other.invalid_count
+        self._add_invalid(other.invalid_sample.values())
+        if self.key_hashes is not None:
+            for hashes in other.key_hashes:
+                self._add_keys(hashes)
+
+    def fill(self, profile, rows):
+        profile.null_count = self.null_count
+        profile.valid_count = rows - self.null_count
+        profile.unique_values = list(self.uniques.values())
+        if self.key_hashes is not None:
+            profile.distinct = sum(len(hashes) for hashes in self.key_hashes)
+        elif self.overflow:
+            profile.approximate = True
+            profile.distinct = self.hll.count()
+        else:
+            profile.distinct = sum(1 for value in profile.unique_values if not pd.isna(value))
+        if self.expected_values is not None:
+            profile.invalid_count = self.invalid_count
+            profile.invalid_values = list(self.invalid_sample.values())
+
+
+def _key(value):
+    # All missing markers (None, nan, NaT) collapse to one key, as in Series.unique().
+    return "__missing__" if pd.isna(value) else value
+
+
+class StreamingProfiler:
+    '''
+    The DataProfile of profile_frame built batch by batch with bounded memory, for files
+    too large to load at once. Column kinds are fixed by the first batch. Distinct counts
+    of key_columns are kept exact for duplicate checks. Profilers fed different parts of a
+    file can be merged.
+    '''
+
+    def __init__(self, numeric_columns=(), expected_ranges=None, expected_sets=None, key_columns=(),
+                 exact_limit=1000, sample_limit=20):
+        self.numeric_columns = set(numeric_columns)
+        self.key_columns = set(key_columns)
+        self.expected_ranges = expected_ranges or {}
+        self.expected_sets = expected_sets or {}
+        self.exact_limit = exact_limit
+        self.sample_limit = sample_limit
+        self.rows = 0
+        self.kinds = {}
+        self.numeric = {}
+        self.text = {}
+        self.others = {}
+
+    def _start(self, batch):
+        for col in batch.columns:
+            series = batch[col]
+            if col in self.numeric_columns or (pd.api.types.is_numeric_dtype(series)
+                                               and not pd.api.types.is_bool_dtype(series)):
+                self.kinds[col] = "numeric"
+                self.numeric[col] = _NumericAccumulator(self.expected_ranges.get(col), self.exact_limit)
+            elif pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+                self.kinds[col] = "text"
+            else:
+                self.kinds[col] = "other"
+                self.others[col] = 0
+            if self.kinds[col] == "text" or col in self.expected_sets:
+                self.text[col] = _TextAccumulator(self.expected_sets.get(col), self.exact_limit, self.sample_limit,
+                                                  exact_keys=col in self.key_columns)
+
+    def update(self, batch):
+        try:
+            if not self.kinds:
+                self._start(batch)
+            self.rows += len(batch)
+            for col, acc in self.numeric.items():
+                values = pd.to_numeric(batch[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                acc.update(batch[col], values)
+            for col, acc in self.text.items():
+                acc.update(batch[col])
+            for col in self.others:
+                self.others[col] += int(batch[col].isna().sum())
+            return self
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def merge(self, other):
+        if not self.kinds:
+            self.kinds = other.kinds
+            self.numeric, self.text, self.others = other.numeric, other.text, other.others
+        else:
+            for col, acc in other.numeric.items():
+                self.numeric[col].merge(acc)
+            for col, acc in other.text.items():
+                self.text[col].merge(acc)
+            for col, nulls in other.others.items():
+                self.others[col] += nulls
+        self.rows += other.rows
+        return self
+
+    def result(self):
+        profiles = {}
+        for col, kind in self.kinds.items():
+            profile = ColumnProfile(col, kind, self.others.get(col, 0))
+            if col in self.text:
+                self.text[col].fill(profile, self.rows)
+            if col in self.numeric:
+                self.numeric[col].fill(profile)
+            profiles[col] = profile
+        sketched = [col for col, profile in profiles.items() if profile.approximate]
+        logging.info(f"Streaming profile over {self.rows} rows x {len(profiles)} columns; "
+                     f"sketched columns: {sketched or 'none'}.")
+        return DataProfile(self.rows, profiles)
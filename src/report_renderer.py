@@ -0,0 +1,144 @@
+import os
+import sys
+import glob
+import html
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from exception import CustomException
+from logger import logging
+
+REPORT_FORMATS = ("pdf", "html")
+
+
+def write_result(report_dir, source, file_name, validation_details, resolution_details):
+    '''
+    Write the validation and resolution details as a compact JSON result and return its
+    path. This is the only report output produced during validation; the PDF and HTML
+    versions are rendered from it later (render_reports).
+    '''
+    try:
+        os.makedirs(report_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        result_path = os.path.join(report_dir, f"validation_report_{source}_{file_name}_{timestamp}.json")
+        result = {"source": source, "file_name": file_name, "generated_at": timestamp,
+                  "issues": validation_details, "resolutions": resolution_details}
+        with open(result_path, "w") as f:
+            json.dump(result, f, separators=(",", ":"), default=str)
+        logging.info(f"Validation result written: {result_path}")
+        return result_path
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _lines(details):
+    for key, value in details.items():
+        if isinstance(value, dict):
+            for subkey, detail in value.items():
+                yield f"{key} - {subkey}: {detail}"
+        else:
+            yield f"{key}: {value}"
+
+
+def render_pdf(result, out_path):
+    # reportlab is only needed by the rendering step, not by validation itself.
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(out_path, pagesize=letter)
+    width, height = letter
+    x_margin = 50
+    y = height - 50
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(x_margin, y, f"Validation Report for {result['source']} - {result['file_name']}")
+    y -= 30
+    for title, details in (("Issues:", result["issues"]), ("Resolutions:", result["resolutions"])):
+        if title == "Resolutions:":
+            y -= 20
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(x_margin, y, title)
+        y -= 20
+        c.setFont("Helvetica", 10)
+        for line in _lines(details):
+            c.drawString(x_margin, y, line)
+            y -= 15
+            if y < 50:
+                c.showPage()
+                y = height - 50
+                c.setFont("Helvetica", 10)
+    c.save()
+
+
+def render_html(result, out_path):
+    sections = []
+    for title, details in (("Issues", result["issues"]), ("Resolutions", result["resolutions"])):
+        items = "\n".join(f"<li>{html.escape(line)}</li>" for line in _lines(details))
+        sections.append(f"<h2>{title}</h2>\n<ul>\n{items}\n</ul>")
+    heading = html.escape(f"Validation Report for {result['source']} - {result['file_name']}")
+    with open(out_path, "w") as f:
+        f.write(f"<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>{heading}</title></head>\n"
+                f"<body>\n<h1>{heading}</h1>\n" + "\n".join(sections) + "\n</body>\n</html>\n")
+
+
+def render_report(result_path, formats=("pdf",)):
+    '''
+    Render one JSON result next to it in each of the given formats and return the paths.
+    Top-level so it can run in a worker process.
+    '''
+    with open(result_path, "r") as f:
+        result = json.load(f)
+    renderers = {"pdf": render_pdf, "html": render_html}
+    paths = []
+    for fmt in formats:
+        out_path = f"{os.path.splitext(result_path)[0]}.{fmt}"
+        renderers[fmt](result, out_path)
+        paths.append(out_path)
+    return paths
+
+
+def render_reports(result_paths, formats=("pdf",), max_workers=None):
+    '''
+    Render many JSON results in a process pool. A report that fails to render is logged
+    and skipped; returns {result_path: [rendered paths]} for the ones that succeeded.
+    '''
+    try:
+        unknown = set(formats) - set(REPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Report formats must be among {REPORT_FORMATS}, got {sorted(unknown)}.")
+        rendered = {}
+        if not result_paths:
+            return rendered
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {path: executor.submit(render_report, path, tuple(formats)) for path in result_paths}
+            for path, future in futures.items():
+                try:
+                    rendered[path] = future.result()
+                except Exception as e:
+                    logging.error(f"Rendering {path} failed: {e}")
+        logging.info(f"Rendered {len(rendered)} of {len(result_paths)} validation reports as {', '.join(formats)}.")
+        return rendered
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def pending_results(report_dir, formats=("pdf",)):
+    '''
+    JSON results in report_dir that are missing at least one of the rendered formats.
+    '''
+    pending = []
+    for path in sorted(glob.glob(os.path.join(report_dir, "*.json"))):
+        stem = os.path.splitext(path)[0]
+        if any(not os.path.exists(f"{stem}.{fmt}") for fmt in formats):
+            pending.append(path)
+    return pending
+
+
+if __name__ == "__main__":
+    # Batch step for deferred rendering:
+    #   python src/report_renderer.py [report_dir] [pdf,html]
+    report_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "artifacts", "validation_reports")
+    formats = tuple(sys.argv[2].split(",")) if len(sys.argv) > 2 else ("pdf",)
+    render_reports(pending_results(report_dir, formats), formats)
@@ -0,0 +1,177 @@
+import os
+import sys
+import math
+import numpy as np
+from statistics import NormalDist
+from concurrent.futures import ThreadPoolExecutor
+
+from exception import CustomException
+from logger import logging
+from csv_reader import read_source_csv
+
+SAMPLING_STRATEGIES = ("stratified", "uniform")
+# Relative error tolerated on the row count estimated from the sampled bytes.
+ROW_COUNT_MARGIN = 0.1
+# Duplicates in a sample say little about the whole file (both copies of a key rarely
+# land in it), so uniqueness can only fail on a sample, never pass.
+NOT_ESTIMABLE = ("expect_column_values_to_be_unique",)
+
+
+def wilson_interval(failures, n, confidence=0.95):
+    '''
+    Wilson score interval for a failure rate observed as failures out of n rows.
+    '''
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = failures / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class SamplingPlan:
+    '''
+    How much of an object sampled validation reads and how its estimates are judged.
+
+    sample_bytes are read as `blocks` byte ranges: with the "stratified" strategy one
+    random block from each of `blocks` equal slices of the file (so every part of a
+    time-ordered drop is represented), with "uniform" any blocks. A check passes when the
+    confidence interval of its failure rate lies below threshold - margin and fails when
+    it lies above threshold + margin; otherwise the file is validated in full.
+    '''
+
+    def __init__(self, sample_bytes=8 << 20, blocks=32, strategy="stratified", threshold=0.01, margin=0.002,
+                 confidence=0.95, seed=None):
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Sampling strategy must be one of {SAMPLING_STRATEGIES}.")
+        self.sample_bytes = sample_bytes
+        self.blocks = blocks
+        self.strategy = strategy
+        self.threshold = threshold
+        self.margin = margin
+        self.confidence = confidence
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv("VALIDATION_SAMPLE_SEED")
+        return cls(sample_bytes=int(os.getenv("VALIDATION_SAMPLE_BYTES", str(8 << 20))),
+                   blocks=int(os.getenv("VALIDATION_SAMPLE_BLOCKS", "32")),
+                   strategy=os.getenv("VALIDATION_SAMPLE_STRATEGY", "stratified").lower(),
+                   threshold=float(os.getenv("VALIDATION_FAILURE_THRESHOLD", "0.01")),
+                   margin=float(os.getenv("VALIDATION_ESCALATION_MARGIN", "0.002")),
+                   confidence=float(os.getenv("VALIDATION_CONFIDENCE", "0.95")),
+                   seed=int(seed) if seed is not None else None)
+
+    def describe(self):
+        return {"strategy": self.strategy, "sample_bytes": self.sample_bytes, "blocks": self.blocks,
+                "threshold": self.threshold, "margin": self.margin, "confidence": self.confidence}
+
+
+def _get_range(s3_client, bucket, key, start, end):
+    return s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")["Body"].read()
+
+
+def _complete_lines(data, starts_line, ends_file):
+    # data may begin and end inside a row; keep only the rows it holds entirely.
+    if not starts_line:
+        data = data[data.find(b"\n") + 1:] if b"\n" in data else b""
+    if not ends_file:
+        data = data[:data.rfind(b"\n") + 1]
+    return data
+
+
+def sample_s3_csv(s3_client, bucket, key, source, plan):
+    '''
+    Read a sample of the rows of a CSV object with byte-range requests (fetched
+    concurrently) and parse it with the source's schema. Returns (sample, estimated_rows),
+    the row count being extrapolated from the bytes per sampled row, or (None, None)
+    when the object is too small for sampling to save anything.
+
+    Rows are assumed not to contain quoted line breaks, which holds for the raw churn
+    extracts.
+    '''
+    try:
+        size = s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        block = plan.sample_bytes // plan.blocks
+        head = _get_range(s3_client, bucket, key, 0, min(size, 64 << 10) - 1)
+        if b"\n" not in head:
+            return None, None
+        header = head[:head.index(b"\n") + 1]
+        start = len(header)
+        slots = (size - start) // block if block else 0
+        if slots <= plan.blocks:
+            logging.info(f"{key} is {size} bytes; sampling would read most of it, validating in full.")
+            return None, None
+
+        rng = np.random.default_rng(plan.seed)
+        if plan.strategy == "stratified":
+            chosen = [int(rng.choice(stratum)) for stratum in np.array_split(np.arange(slots), plan.blocks)]
+        else:
+            chosen = sorted(int(slot) for slot in rng.choice(slots, size=plan.blocks, replace=False))
+
+        def fetch(slot):
+            lo = start + slot * block
+            hi = size - 1 if slot == slots - 1 else lo + block - 1
+            # One byte before the block tells whether it starts on a row boundary.
+            data = _get_range(s3_client, bucket, key, lo - 1, hi)
+            return _complete_lines(data[1:], data[:1] == b"\n", hi == size - 1)
+
+        with ThreadPoolExecutor(max_workers=min(8, plan.blocks)) as executor:
+            parts = list(executor.map(fetch, chosen))
+        sampled_bytes = sum(len(part) for part in parts)
+        sample = read_source_csv(header + b"".join(parts), source)
+        if sample.empty:
+            return None, None
+        estimated_rows = int(round(len(sample) * (size - start) / sampled_bytes))
+        logging.info(f"Sampled {len(sample)} rows ({sampled_bytes} of {size} bytes, {plan.strategy}) "
+                     f"from {key}; about {estimated_rows} rows in total.")
+        return sample, estimated_rows
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def assess_checks(checks, sample_rows, estimated_rows, plan, row_count=None):
+    '''
+    Turn expectation results computed on a sample (expectation_spec.evaluate format; a
+    check may carry its own element_count) into estimates for the whole file. Each check
+    gets the estimated failure rate, its Wilson interval and a decision: "pass", "fail",
+    "escalate" (too close to the threshold to tell) or "not_estimable".
+    '''
+    assessments = []
+    for check in checks:
+        entry = dict(check)
+        expectation_type = check["expectation_type"]
+        if expectation_type == "expect_table_row_count_to_be_between":
+            entry["estimate"] = estimated_rows
+            low, high = row_count if row_count is not None else (None, None)
+            near_bound = any(bound is not None and abs(estimated_rows - bound) <= ROW_COUNT_MARGIN * estimated_rows
+                             for bound in (low, high))
+            if near_bound:
+                entry["decision"] = "escalate"
+            else:
+                inside = (low is None or estimated_rows >= low) and (high is None or estimated_rows <= high)
+                entry["decision"] = "pass" if inside else "fail"
+        elif check["unexpected_count"] is None:
+            entry["decision"] = "fail"  # the sample has the header, so the column is missing
+        elif expectation_type in NOT_ESTIMABLE:
+            entry["decision"] = "fail" if check["unexpected_count"] > 0 else "not_estimable"
+        else:
+            n = check.get("element_count", sample_rows)
+            failures = check["unexpected_count"]
+            entry["estimate"] = failures / n if n else 0.0
+            entry["ci_low"], entry["ci_high"] = wilson_interval(failures, n, plan.confidence)
+            if entry["ci_low"] > plan.threshold + plan.margin:
+                entry["decision"] = "fail"
+            elif entry["ci_high"] < plan.threshold - plan.margin:
+                entry["decision"] = "pass"
+            else:
+                entry["decision"] = "escalate"
+        assessments.append(entry)
+    return assessments
+
+
+def needs_full_scan(assessments):
+    return any(entry["decision"] == "escalate" for entry in assessments)
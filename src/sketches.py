@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values):
+    '''
+    Stable 64-bit hashes of a batch of values (numbers, strings or categoricals). Missing
+    values must be dropped by the caller.
+    '''
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype.kind in "iub":
+        values = values.astype(np.float64)  # 1 and 1.0 hash alike, as they compare equal
+    elif values.dtype.kind != "f":
+        values = values.astype(object)
+    return pd.util.hash_array(values, categorize=False)
+
+
+class HyperLogLog:
+    '''
+    Mergeable distinct-count sketch with 2**precision one-byte registers (16 KiB at the
+    default precision, ~0.8% standard error).
+    '''
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values) == 0:
+            return self
+        hashes = hash_values(values)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes << np.uint64(p)
+        # Position of the first set bit of the remaining 64 - p bits; frexp is exact on the
+        # top 53 bits, and a run of zeros beyond them is capped at the maximum rank.
+        _, exponent = np.frexp((rest >> np.uint64(11)).astype(np.float64))
+        rank = np.where(exponent > 0, 54 - exponent, 64 - p + 1)
+        rank = np.minimum(rank, 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+class TDigest:
+    '''
+    Mergeable quantile sketch (merging t-digest with the arcsine scale function). At most
+    about `compression` centroids are kept, small near the tails and larger in the middle,
+    so extreme quantiles stay accurate. Batches and other digests are folded in by
+    re-clustering the combined centroids.
+    '''
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = ~np.isnan(values)
+        values, weights = values[keep], weights[keep]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        # Every cluster spans at most one unit of k = compression / (2 pi) * asin(2q - 1).
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * midpoints - 1, -1, 1))
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        cluster = np.concatenate([[0], np.cumsum(np.diff(cluster) != 0)])
+        cluster_weights = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=means * weights) / cluster_weights
+        self.weights = cluster_weights
+        self.count = total
+
+    def _centers(self):
+        return np.cumsum(self.weights) - self.weights / 2
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        target = q * self.count
+        centers = self._centers()
+        points = np.concatenate([[0.0], centers, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(target, points, values))
+
+    def cdf(self, x):
+        '''
+        Estimated fraction of the values strictly below x.
+        '''
+        if self.count == 0:
+            return np.nan
+        if x <= self.min:
+            return 0.0
+        if x > self.max:
+            return 1.0
+        points = np.concatenate([[0.0], self._centers(), [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(x, values, points)) / self.count
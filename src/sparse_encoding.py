@@ -0,0 +1,108 @@
+import sys
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from exception import CustomException
+from logger import logging
+
+# Suffix of the single integer column a sparse one-hot block is collapsed to on disk.
+CODE_SUFFIX = "__code"
+
+# Categoricals behind the Feast feature view; these always stay dense whatever their cardinality.
+FEAST_BOUND_COLUMNS = [
+    "gender", "SeniorCitizen", "Partner", "Dependents", "PhoneService", "MultipleLines",
+    "InternetService", "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport",
+    "StreamingTV", "StreamingMovies", "Contract", "PaperlessBilling", "PaymentMethod",
+]
+
+
+def code_column(col):
+    return f"{col.replace(' ', '_').lower()}{CODE_SUFFIX}"
+
+
+def code_columns(artifact):
+    '''
+    The <col>__code columns collapse_sparse_columns writes for an artifact (none without one).
+    '''
+    return [code_column(col) for col in artifact.sparse_cols] if artifact is not None else []
+
+
+def is_sparse_column(series):
+    return isinstance(series.dtype, pd.SparseDtype)
+
+
+def onehot_csr(codes, n_flags):
+    '''
+    CSR one-hot matrix from vocabulary positions. Position 0 (the dropped level) and -1
+    (unseen) produce an all-zero row, matching the dense drop_first encoding.
+    '''
+    rows = np.nonzero(codes > 0)[0]
+    data = np.ones(len(rows), dtype=np.uint8)
+    return sp.csr_matrix((data, (rows, codes[rows] - 1)), shape=(len(codes), n_flags), dtype=np.uint8)
+
+
+def sparse_block(codes, columns):
+    return pd.DataFrame.sparse.from_spmatrix(onehot_csr(codes, len(columns)), columns=columns)
+
+
+def collapse_sparse_columns(df, artifact):
+    '''
+    Replace each sparse one-hot block with one int32 code column (<col>__code) so CSV and
+    Parquet writes stay proportional to rows, not rows x categories. 0 means the dropped
+    level or an unseen category.
+    '''
+    try:
+        for col in artifact.sparse_cols:
+            flags = artifact.dummy_columns[col]
+            block = df[flags].sparse.to_coo().tocsr()
+            codes = np.zeros(len(df), dtype=np.int32)
+            rows, cols = block.nonzero()
+            codes[rows] = cols + 1
+            df = df.drop(columns=flags)
+            df[code_column(col)] = codes
+        return df
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def expand_code_columns(df, artifact):
+    '''
+    Inverse of collapse_sparse_columns: turn <col>__code columns back into sparse one-hot blocks.
+    '''
+    try:
+        for col in artifact.sparse_cols:
+            code_col = code_column(col)
+            if code_col not in df.columns:
+                continue
+            codes = df[code_col].fillna(0).to_numpy(dtype=np.int64)
+            block = sparse_block(codes, artifact.dummy_columns[col])
+            block.index = df.index
+            df = pd.concat([df.drop(columns=[code_col]), block], axis=1)
+        return df
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def to_model_matrix(X, artifact=None):
+    '''
+    Feature matrix for sklearn. Frames without sparse columns are returned unchanged;
+    otherwise dense and sparse columns are stacked into one CSR matrix (LogisticRegression
+    and RandomForestClassifier both accept CSR input).
+    '''
+    try:
+        if artifact is not None:
+            X = expand_code_columns(X, artifact)
+        sparse_cols = [c for c in X.columns if is_sparse_column(X[c])]
+        if not sparse_cols:
+            return X
+        dense_cols = [c for c in X.columns if c not in sparse_cols]
+        matrix = sp.hstack([
+            sp.csr_matrix(X[dense_cols].to_numpy(dtype=np.float32)),
+            X[sparse_cols].sparse.to_coo().tocsr().astype(np.float32),
+        ], format="csr")
+        logging.info(f"Model matrix: {len(dense_cols)} dense + {len(sparse_cols)} sparse columns, "
+                     f"{matrix.nnz} non-zeros.")
+        return matrix
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,140 @@
+import sys
+import numpy as np
+
+from exception import CustomException
+from logger import logging
+from profiler import ColumnProfile, DataProfile
+
+NUMERIC_SQL_TYPES = ("smallint", "integer", "bigint", "numeric", "decimal", "real", "double precision")
+TEXT_SQL_TYPES = ("text", "character varying", "character", "varchar", "char")
+# Same coercion as pd.to_numeric(errors="coerce") for text columns validated as numeric.
+NUMBER_PATTERN = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def table_columns(conn, table):
+    '''
+    (column name, data type) of a Postgres table in column order.
+    '''
+    cur = conn.cursor()
+    cur.execute("SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_name = %s ORDER BY ordinal_position", (table,))
+    columns = [(name, data_type) for name, data_type in cur.fetchall()]
+    cur.close()
+    return columns
+
+
+def _fetch_one(conn, query, params):
+    cur = conn.cursor()
+    cur.execute(query, params)
+    row = cur.fetchone()
+    cur.close()
+    return row
+
+
+def profile_table(conn, table, columns=None, numeric_columns=(), expected_ranges=None, expected_sets=None,
+                  value_limit=1000):
+    '''
+    The DataProfile of profiler.profile_frame for a Postgres table, computed by aggregate
+    queries in the database so only summary numbers are transferred.
+
+    columns maps the names used in the report to the table's columns (default: the table's
+    own names). Null, distinct, min/max, quartile (percentile_cont, the same linear
+    interpolation as pandas), range and set checks are computed in one scan; the IQR
+    outlier counts and the value lists (unique values of text columns, invalid values of
+    set columns, at most value_limit each) in a second one. Value lists come back sorted
+    rather than in order of appearance.
+    '''
+    try:
+        expected_ranges = expected_ranges or {}
+        expected_sets = expected_sets or {}
+        types = dict(table_columns(conn, table))
+        columns = columns or {name: name for name in types}
+        source = quote_identifier(table)
+
+        kinds, exprs = {}, {}
+        for name, column in columns.items():
+            data_type = types[column]
+            quoted = quote_identifier(column)
+            if data_type in NUMERIC_SQL_TYPES:
+                kinds[name], exprs[name] = "numeric", f"{quoted}::double precision"
+            elif name in numeric_columns:
+                kinds[name] = "numeric"
+                exprs[name] = (f"CASE WHEN {quoted}::text ~ '{NUMBER_PATTERN}' "
+                               f"THEN trim({quoted}::text)::double precision END")
+            else:
+                kinds[name] = "text" if data_type in TEXT_SQL_TYPES else "other"
+                exprs[name] = quoted
+
+        # --- First scan: counts, quartiles, range and set checks ---
+        select, params, fields = ["count(*)"], [], []
+        for name, column in columns.items():
+            quoted, expr = quote_identifier(column), exprs[name]
+            select.append(f"count({quoted})")
+            fields.append((name, "present"))
+            if kinds[name] == "numeric":
+                select += [f"count({expr})", f"count(DISTINCT {expr})", f"min({expr})", f"max({expr})",
+                           f"percentile_cont(0.25) WITHIN GROUP (ORDER BY {expr})",
+                           f"percentile_cont(0.75) WITHIN GROUP (ORDER BY {expr})"]
+                fields += [(name, "valid_count"), (name, "distinct"), (name, "min"), (name, "max"),
+                           (name, "q1"), (name, "q3")]
+                if name in expected_ranges:
+                    select.append(f"count(*) FILTER (WHERE {expr} < %s OR {expr} > %s)")
+                    params += list(expected_ranges[name])
+                    fields.append((name, "out_of_range"))
+            elif kinds[name] == "text":
+                select.append(f"count(DISTINCT {quoted})")
+                fields.append((name, "distinct"))
+            if name in expected_sets:
+                placeholders = ", ".join(["%s"] * len(expected_sets[name]))
+                select.append(f"count(*) FILTER (WHERE {quoted} IS NULL OR {quoted}::text NOT IN ({placeholders}))")
+                params += [str(value) for value in expected_sets[name]]
+                fields.append((name, "invalid_count"))
+        row = _fetch_one(conn, f"SELECT {', '.join(select)} FROM {source}", params)
+        rows = int(row[0])
+
+        profiles = {name: ColumnProfile(name, kinds[name], 0) for name in columns}
+        for (name, field), value in zip(fields, row[1:]):
+            profile = profiles[name]
+            if field == "present":
+                profile.null_count = rows - int(value)
+                profile.valid_count = int(value)
+            elif field in ("min", "max", "q1", "q3"):
+                setattr(profile, field, float(value) if value is not None else np.nan)
+            else:
+                setattr(profile, field, int(value))
+
+        # --- Second scan: IQR outliers and value lists ---
+        select, params, fields = [], [], []
+        for name, column in columns.items():
+            profile, quoted, expr = profiles[name], quote_identifier(column), exprs[name]
+            if kinds[name] == "numeric" and profile.valid_count:
+                iqr = profile.q3 - profile.q1
+                select.append(f"count(*) FILTER (WHERE {expr} < %s OR {expr} > %s)")
+                params += [profile.q1 - 1.5 * iqr, profile.q3 + 1.5 * iqr]
+                fields.append((name, "iqr_outliers"))
+            if kinds[name] == "text" or name in expected_sets:
+                select.append(f"(array_agg(DISTINCT {quoted}))[1:%s]")
+                params.append(value_limit)
+                fields.append((name, "unique_values"))
+            if name in expected_sets:
+                placeholders = ", ".join(["%s"] * len(expected_sets[name]))
+                select.append(f"(array_agg(DISTINCT {quoted}) FILTER "
+                              f"(WHERE {quoted} IS NULL OR {quoted}::text NOT IN ({placeholders})))[1:%s]")
+                params += [str(value) for value in expected_sets[name]] + [value_limit]
+                fields.append((name, "invalid_values"))
+        if select:
+            row = _fetch_one(conn, f"SELECT {', '.join(select)} FROM {source}", params)
+            for (name, field), value in zip(fields, row):
+                if field == "iqr_outliers":
+                    profiles[name].iqr_outliers = int(value)
+                else:
+                    setattr(profiles[name], field, list(value or []))
+
+        logging.info(f"Profiled table {table} ({rows} rows x {len(profiles)} columns) in the database.")
+        return DataProfile(rows, profiles)
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,176 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from exception import CustomException
+from logger import logging
+from preprocessing import PreprocessingArtifact, TARGET_COL, ID_COL
+
+
+class WelfordAccumulator:
+    '''
+    Per-column count, mean and sum of squared deviations (M2), updated batch by batch with
+    the parallel form of Welford's algorithm (Chan et al.). Accumulators built on different
+    chunks or workers can be merged in any order.
+    '''
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.count = np.zeros(len(self.columns))
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+
+    def update(self, batch):
+        values = batch[self.columns].to_numpy(dtype=np.float64)
+        count = (~np.isnan(values)).sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / np.maximum(count, 1), 0.0)
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+        self._combine(count, mean, m2)
+        return self
+
+    def merge(self, other):
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators over different columns.")
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        safe_total = np.maximum(total, 1)
+        self.mean = self.mean + delta * count / safe_total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe_total
+        self.count = total
+
+
+class CategoryCounter:
+    '''
+    Mergeable per-column value counts, used for the one-hot vocabulary and mode imputation.
+    '''
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.counts = {col: pd.Series(dtype=np.int64) for col in self.columns}
+
+    def update(self, batch):
+        for col in self.columns:
+            self.counts[col] = self.counts[col].add(batch[col].value_counts(dropna=True), fill_value=0)
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            self.counts[col] = self.counts[col].add(other.counts[col], fill_value=0)
+        return self
+
+    def mode(self, col):
+        counts = self.counts[col]
+        if counts.empty:
+            return None
+        # Same tie-break as Series.mode()[0]: the smallest of the most frequent values.
+        return sorted(counts[counts == counts.max()].index)[0]
+
+
+class PreparationStats:
+    '''
+    Everything the preparation step needs from one pass over the data.
+    '''
+
+    def __init__(self, base_cols, numeric_cols, categorical_cols):
+        self.base_cols = base_cols
+        self.numeric_cols = numeric_cols
+        self.categorical_cols = categorical_cols
+        self.rows = 0
+        self.numeric = WelfordAccumulator(numeric_cols)
+        self.categorical = CategoryCounter(categorical_cols)
+
+    @classmethod
+    def for_frame(cls, df):
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+        for col in (TARGET_COL, ID_COL):
+            for cols in (numeric_cols, categorical_cols):
+                if col in cols:
+                    cols.remove(col)
+        base_cols = [c for c in df.columns if c not in categorical_cols]
+        return cls(base_cols, numeric_cols, categorical_cols)
+
+    @classmethod
+    def for_columns(cls, columns, numeric_cols):
+        '''
+        Column kinds fixed up front (e.g. from a pinned csv_reader schema) instead of read
+        off one chunk's dtypes, where a column blank in that chunk would look non-numeric.
+        '''
+        numeric_cols = [c for c in columns if c in numeric_cols and c not in (TARGET_COL, ID_COL)]
+        categorical_cols = [c for c in columns if c not in numeric_cols and c not in (TARGET_COL, ID_COL)]
+        base_cols = [c for c in columns if c not in categorical_cols]
+        return cls(base_cols, numeric_cols, categorical_cols)
+
+    def update(self, batch):
+        self.rows += len(batch)
+        self.numeric.update(batch)
+        self.categorical.update(batch)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.numeric.merge(other.numeric)
+        self.categorical.merge(other.categorical)
+        return self
+
+    def track(self, chunks):
+        '''
+        Update the stats from a stream of chunks while passing the chunks through, so other
+        consumers (e.g. EDA sampling) can share the same pass.
+        '''
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+
+def scaler_from_moments(columns, mean, var, rows):
+    '''
+    A StandardScaler in the fitted state for the given per-column mean and (population)
+    variance, equivalent to calling fit() on data with those moments.
+    '''
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    scaler.n_features_in_ = len(columns)
+    scaler.feature_names_in_ = np.asarray(columns, dtype=object)
+    scaler.n_samples_seen_ = rows
+    scaler.mean_ = np.asarray(mean, dtype=np.float64).copy()
+    scaler.var_ = np.asarray(var, dtype=np.float64)
+    scale = np.sqrt(scaler.var_)
+    scaler.scale_ = np.where(scale == 0, 1.0, scale)
+    return scaler
+
+
+def artifact_from_stats(stats, sparse_threshold=None, dense_cols=()):
+    '''
+    Build a PreprocessingArtifact from streamed stats, without refitting on the full frame.
+
+    Numeric gaps are filled with the column mean (an exact streaming median would need the
+    whole column). Filling with the mean leaves the mean unchanged and adds zero deviation,
+    so the scaler statistics equal those of StandardScaler fitted on the filled data.
+    '''
+    try:
+        acc = stats.numeric
+        fill_values = {col: acc.mean[i] for i, col in enumerate(acc.columns)}
+        for col in stats.categorical_cols:
+            fill_values[col] = stats.categorical.mode(col)
+
+        scaler = scaler_from_moments(acc.columns, acc.mean, acc.m2 / max(stats.rows, 1), stats.rows)
+
+        vocabularies = {col: sorted(stats.categorical.counts[col].index.tolist()) for col in stats.categorical_cols}
+        sparse_cols = []
+        if sparse_threshold:
+            sparse_cols = [c for c in stats.categorical_cols
+                           if len(vocabularies[c]) > sparse_threshold and c not in dense_cols]
+        artifact = PreprocessingArtifact(stats.base_cols, stats.numeric_cols, stats.categorical_cols,
+                                         fill_values, scaler, vocabularies, sparse_cols)
+        logging.info(f"Preprocessor built from streamed stats over {stats.rows} rows: "
+                     f"{len(artifact.output_columns)} output columns.")
+        return artifact
+    except Exception as e:
+        raise CustomException(e, sys)
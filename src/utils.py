@@ -21,6 +21,11 @@ credentials_path = os.path.join(project_root, '..', "config", "credentials.yaml"
 from exception import CustomException
 from logger import logging
 
+# Names given to the columns of the RDS customers table, in table order, when it is
+# extracted to CSV (write_csv) or profiled in place (validation_manual).
+RDS_EXTRACT_COLUMNS = ["customerID", "gender", "SeniorCitizen", "Partner", "Dependents", "tenure", "PhoneService",
+                       "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup", "Churn"]
+
 def save_object(file_path, object_name):
     '''
     This function is responsible for saving the object in the file
@@ -120,13 +125,20 @@ def write_csv(rows, cursor, file_path, file_name):
         with open(csv_file, "w", newline="") as file:
             writer = csv.writer(file)
             # column_names = [desc[0] for desc in cursor.description]
-            column_names = ["customerID", "gender", "SeniorCitizen", "Partner", "Dependents", "tenure", "PhoneService",
-                            "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup", "Churn"]
-            writer.writerow(column_names)
+            writer.writerow(RDS_EXTRACT_COLUMNS)
             writer.writerows(rows)
     except Exception as e:
         logging.error(f"Failure while writing from RDS to local path: {str(e)}")
 
+def connect_to_rds():
+    load_dotenv()
+    return pg8000.connect(
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST")
+    )
+
 def connect_rds_to_pull_csv(local_file_path, file_name):
     try:
         #load_dotenv(r"C:\Users\gaura\Downloads\Sem_II\DM4ML\Assignment\end-to-end-data-management-pipeline\.env")
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+from exception import CustomException
+from logger import logging
+
+
+def expectation_hash(*definitions):
+    '''
+    Short stable hash of expectation definitions (anything JSON serializable). Any change
+    to the expectations, or to whatever else is passed in, gives a new hash.
+    '''
+    payload = json.dumps(definitions, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ValidationCache:
+    '''
+    Validation results on disk, one JSON file per (object key, ETag, expectation hash).
+
+    A raw object is only revalidated when its content (ETag) or the expectations change,
+    so pipeline retries and re-runs get the stored result and report path back at once.
+    Entries whose report file has since been deleted count as misses. Files are written
+    to a temporary name and renamed, so concurrent workers never read partial entries.
+    '''
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key, etag, expectations):
+        name = hashlib.sha256(f"{key}\0{etag}\0{expectations}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def get(self, key, etag, expectations):
+        if not etag:
+            return None
+        path = self._path(key, etag, expectations)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            entry = json.load(f)
+        if entry.get("report_path") and not os.path.exists(entry["report_path"]):
+            return None
+        logging.info(f"Validation cache hit for {key} (ETag {etag}, validated {entry['validated_at']}).")
+        return entry
+
+    def put(self, key, etag, expectations, result, report_path=None):
+        try:
+            if not etag:
+                return None
+            entry = {"key": key, "etag": etag, "expectation_hash": expectations, "result": result,
+                     "report_path": report_path, "validated_at": datetime.now().isoformat(timespec="seconds")}
+            path = self._path(key, etag, expectations)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f, indent=2, default=str)
+            os.replace(tmp_path, path)
+            return entry
+        except Exception as e:
+            raise CustomException(e, sys)